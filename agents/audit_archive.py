@@ -0,0 +1,124 @@
+"""
+agents/audit_archive.py — Immutable segment files for archived audit rows.
+
+The audit writer keeps activity_log small by rolling its oldest rows into
+segment files instead of deleting them (agents/logger.py owns when and the
+signed manifest; this module owns the file format).
+
+Segment layout:
+    [block 0][block 1]...[footer JSON][footer length: 8 bytes BE][MAGIC]
+
+Each block is a zlib-compressed run of up to BLOCK_ROWS rows, one JSON array
+per line, in id order. The footer holds the id range, the hash of the
+previous segment file (so segments form their own hash chain), the audit
+chain hashes at both boundaries, and a block index — a lookup decompresses
+one block, not the whole file.
+
+Files are written to a temp name, fsynced, renamed into place and made
+read-only. Readers mmap them with ACCESS_READ.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+
+MAGIC = b"ENGRAMSG"
+BLOCK_ROWS = 1024
+_FOOTER_LEN = struct.Struct(">Q")
+
+# Row columns, in order, as stored in each line.
+COLUMNS = (
+    "id", "timestamp_wall", "actor_id", "action_type", "resource_id",
+    "matter_id", "details", "details_hash", "prev_entry_hash", "entry_hash",
+)
+
+
+def write_segment(path: str, rows: list[tuple], prev_segment_sha256: str) -> str:
+    """Write rows (COLUMNS order, ascending id) as a segment; return its SHA-256."""
+    blocks = []
+    body = bytearray()
+    for start in range(0, len(rows), BLOCK_ROWS):
+        chunk = rows[start:start + BLOCK_ROWS]
+        data = zlib.compress("\n".join(json.dumps(list(r)) for r in chunk).encode(), 6)
+        blocks.append([len(body), len(data), chunk[0][0], chunk[-1][0]])
+        body += data
+    footer = json.dumps({
+        "version": 1,
+        "first_id": rows[0][0],
+        "last_id": rows[-1][0],
+        "count": len(rows),
+        "prev_segment_sha256": prev_segment_sha256,
+        "chain_head_before": rows[0][8],
+        "chain_head": rows[-1][9],
+        "blocks": blocks,
+    }).encode()
+    body += footer + _FOOTER_LEN.pack(len(footer)) + MAGIC
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.chmod(tmp, 0o444)
+    os.replace(tmp, path)
+    dir_fd = os.open(os.path.dirname(path), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+    return hashlib.sha256(body).hexdigest()
+
+
+class SegmentReader:
+    """Read-only, memory-mapped view of one segment file. Use as a context manager."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        tail = len(MAGIC) + _FOOTER_LEN.size
+        if len(self._mm) < tail or self._mm[-len(MAGIC):] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an audit segment")
+        (footer_len,) = _FOOTER_LEN.unpack(self._mm[-tail:-len(MAGIC)])
+        self.footer: dict = json.loads(self._mm[-tail - footer_len:-tail])
+
+    def __enter__(self) -> "SegmentReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+    def sha256(self) -> str:
+        return hashlib.sha256(self._mm).hexdigest()
+
+    def _block(self, offset: int, length: int) -> list[list]:
+        with memoryview(self._mm)[offset:offset + length] as view:
+            text = zlib.decompress(view).decode()
+        return [json.loads(line) for line in text.split("\n")]
+
+    def rows(self, first_id: int | None = None, last_id: int | None = None):
+        """Yield rows (lists in COLUMNS order) with first_id <= id <= last_id."""
+        for offset, length, block_first, block_last in self.footer["blocks"]:
+            if first_id is not None and block_last < first_id:
+                continue
+            if last_id is not None and block_first > last_id:
+                break
+            for row in self._block(offset, length):
+                if (first_id is None or row[0] >= first_id) and (last_id is None or row[0] <= last_id):
+                    yield row
+
+    def row(self, entry_id: int) -> list | None:
+        return next(self.rows(entry_id, entry_id), None)
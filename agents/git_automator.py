@@ -1,11 +1,10 @@
-import asyncio
 import logging
 import os
 import re
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 from core.auth import get_current_user
-from core.network_gateway import gateway
+from core.network_gateway import async_gateway
 from core.user_registry import User
 
 logger = logging.getLogger(__name__)
@@ -59,8 +58,8 @@ async def generate_commit(request: GitRequest, _: User = Depends(get_current_use
     {request.diff[:4000]}
     """
 
-    res = await asyncio.to_thread(
-        gateway.post, "ollama", "/api/chat",
+    res = await async_gateway.post(
+        "ollama", "/api/chat",
         json={"model": LLM_MODEL, "messages": [{"role": "user", "content": prompt}], "stream": False},
         timeout=60,
     )
@@ -87,8 +86,8 @@ async def generate_pr(request: GitRequest, _: User = Depends(get_current_user)):
     {request.diff[:6000]}
     """
 
-    res = await asyncio.to_thread(
-        gateway.post, "ollama", "/api/chat",
+    res = await async_gateway.post(
+        "ollama", "/api/chat",
         json={"model": LLM_MODEL, "messages": [{"role": "user", "content": prompt}], "stream": False},
         timeout=60,
     )
@@ -1,31 +1,27 @@
 import base64
 import logging
 import os
-import sqlite3
 import datetime
 from datetime import timezone
 from googleapiclient.discovery import build
 from email.mime.text import MIMEText
 from agents.auth import get_google_credentials
+from core.sqlite_db import ensure_schema, get_connection
 
 logger = logging.getLogger(__name__)
 
 _current_dir = os.path.dirname(os.path.abspath(__file__))
 _root_dir = os.path.dirname(_current_dir)
 _DBS_DIR = os.path.join(_root_dir, "data", "dbs")
-_PROCESSED_DB = os.path.join(_DBS_DIR, "processed_emails.db")
+_PROCESSED_DB = os.getenv("PROCESSED_EMAILS_DB_PATH") or os.path.join(_DBS_DIR, "processed_emails.db")
 
 
 def _init_processed_db() -> None:
-    os.makedirs(_DBS_DIR, exist_ok=True)
-    conn = sqlite3.connect(_PROCESSED_DB, check_same_thread=False)
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute(
+    ensure_schema(
+        _PROCESSED_DB,
         "CREATE TABLE IF NOT EXISTS processed_emails "
-        "(email_id TEXT PRIMARY KEY, draft_id TEXT, processed_at TEXT)"
+        "(email_id TEXT PRIMARY KEY, draft_id TEXT, processed_at TEXT)",
     )
-    conn.commit()
-    conn.close()
 
 
 _init_processed_db()
@@ -34,11 +30,9 @@ _init_processed_db()
 def is_email_processed(email_id: str) -> bool:
     """Return True if this email has already been acted on."""
     try:
-        conn = sqlite3.connect(_PROCESSED_DB, check_same_thread=False)
-        row = conn.execute(
+        row = get_connection(_PROCESSED_DB).execute(
             "SELECT 1 FROM processed_emails WHERE email_id = ?", (email_id,)
         ).fetchone()
-        conn.close()
         return row is not None
     except Exception as e:
         logger.error(f"processed_emails lookup failed: {e}")
@@ -53,13 +47,11 @@ def record_processed_email(email_id: str, draft_id: str) -> None:
     steps fail.
     """
     try:
-        conn = sqlite3.connect(_PROCESSED_DB, check_same_thread=False)
-        conn.execute(
-            "INSERT OR IGNORE INTO processed_emails (email_id, draft_id, processed_at) VALUES (?, ?, ?)",
-            (email_id, draft_id, datetime.datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
-        )
-        conn.commit()
-        conn.close()
+        with get_connection(_PROCESSED_DB) as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO processed_emails (email_id, draft_id, processed_at) VALUES (?, ?, ?)",
+                (email_id, draft_id, datetime.datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+            )
     except Exception as e:
         logger.error(f"Failed to record processed email {email_id}: {e}")
 
@@ -1,12 +1,22 @@
+import abc
+import atexit
 import json
 import os
+import queue
 import socket
 import sqlite3
+import struct
 import datetime
+from concurrent.futures import Future
 from datetime import timezone
 import hashlib
 import hmac
 import threading
+from collections import deque
+
+from agents import audit_archive
+from core import merkle
+from core.sqlite_db import get_connection
 
 # ── Runtime configuration ──────────────────────────────────────────────────────
 # AUDIT_SOCKET_PATH: when set, this process is a *client* — all writes and reads
@@ -14,6 +24,13 @@ import threading
 # itself should have AUDIT_SOCKET_PATH unset (so it writes directly to the DB).
 AUDIT_SOCKET_PATH: str = os.getenv("AUDIT_SOCKET_PATH", "")
 
+# AUDIT_FIRE_AND_FORGET=1: log_agent_action returns as soon as the entry is in
+# a bounded in-process queue (AUDIT_QUEUE_SIZE batches) instead of waiting for
+# the commit. A background thread drains the queue; callers only block when it
+# is full. Queued entries are flushed at interpreter exit.
+_FIRE_AND_FORGET: bool = os.getenv("AUDIT_FIRE_AND_FORGET", "0") == "1"
+_QUEUE_SIZE: int = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+
 # AUDIT_HMAC_SECRET is only required for direct-write mode (audit_writer).
 # In socket-client mode (os_layer, workers) the secret lives exclusively in
 # audit_writer — no other container ever computes or sees it.
@@ -50,36 +67,27 @@ def _can_write_db() -> bool:
 # Sentinel hash used as prev_entry_hash for the very first row.
 _GENESIS_HASH = "0" * 64
 
-# Module-level lock — ensures the read-last-hash → compute-id → insert sequence
-# is atomic even when multiple workers call log_agent_action concurrently.
-_write_lock = threading.Lock()
+_GROUP_COMMIT_MAX = 256    # entries per transaction / per forwarded batch
+_WRITE_TIMEOUT = 30.0      # seconds a synchronous caller waits for its commit
 
-_PRUNE_INTERVAL = 100      # check row count every N inserts
-_PRUNE_MAX_ROWS = 50_000   # keep at most this many rows in the live table
+# Every AUDIT_CHECKPOINT_INTERVAL rows the writer signs the chain head into
+# audit_checkpoints; default verification only re-walks rows after the newest.
+_CHECKPOINT_INTERVAL: int = int(os.getenv("AUDIT_CHECKPOINT_INTERVAL", "1000"))
 
+# Rollover: once the live table holds _LIVE_MAX_ROWS + _SEGMENT_ROWS rows, its
+# oldest _SEGMENT_ROWS move into an immutable segment file (agents/audit_archive.py)
+# recorded in audit_segments. Checked every _ARCHIVE_INTERVAL inserts.
+_ARCHIVE_INTERVAL = 100
+_LIVE_MAX_ROWS: int = int(os.getenv("AUDIT_LIVE_MAX_ROWS", "50000"))
+_SEGMENT_ROWS: int = int(os.getenv("AUDIT_SEGMENT_ROWS", "10000"))
+AUDIT_ARCHIVE_DIR: str = os.getenv("AUDIT_ARCHIVE_DIR", "")
 
-def _maybe_prune(conn: sqlite3.Connection, next_id: int) -> None:
-    """Delete oldest rows when the table exceeds _PRUNE_MAX_ROWS.
+_ROW_COLUMNS = ", ".join(audit_archive.COLUMNS)
 
-    Runs every _PRUNE_INTERVAL inserts to amortise the COUNT(*) cost.
-    The chain is still verifiable for all remaining rows (verify_audit_chain
-    handles the case where the first row's prev_entry_hash is non-genesis).
-    """
-    if next_id % _PRUNE_INTERVAL != 0:
-        return
-    row_count: int = conn.execute(
-        "SELECT COUNT(*) FROM activity_log"
-    ).fetchone()[0]
-    if row_count <= _PRUNE_MAX_ROWS:
-        return
-    excess = row_count - _PRUNE_MAX_ROWS
-    cutoff = conn.execute(
-        "SELECT id FROM activity_log ORDER BY id ASC LIMIT 1 OFFSET ?",
-        (excess - 1,),
-    ).fetchone()
-    if cutoff:
-        conn.execute("DELETE FROM activity_log WHERE id <= ?", (cutoff[0],))
-        conn.commit()
+
+def _archive_dir() -> str:
+    """Segment directory — next to the audit DB unless AUDIT_ARCHIVE_DIR is set."""
+    return AUDIT_ARCHIVE_DIR or os.path.join(os.path.dirname(DB_PATH), "audit_segments")
 
 
 def _sha256(text: str) -> str:
@@ -98,6 +106,18 @@ def _compute_entry_hash(
     return hmac.new(_AUDIT_SECRET, message.encode(), hashlib.sha256).hexdigest()
 
 
+def _compute_checkpoint_signature(entry_id: int, entry_hash: str) -> str:
+    message = f"checkpoint|{entry_id}|{entry_hash}"
+    return hmac.new(_AUDIT_SECRET, message.encode(), hashlib.sha256).hexdigest()
+
+
+def _compute_segment_signature(
+    first_id: int, last_id: int, sha256: str, prev_sha256: str, chain_head: str
+) -> str:
+    message = f"segment|{first_id}|{last_id}|{sha256}|{prev_sha256}|{chain_head}"
+    return hmac.new(_AUDIT_SECRET, message.encode(), hashlib.sha256).hexdigest()
+
+
 def init_db() -> None:
     conn = sqlite3.connect(DB_PATH, check_same_thread=False)
     conn.execute("PRAGMA journal_mode=WAL")
@@ -109,6 +129,10 @@ def init_db() -> None:
     }
     if "entry_hash" not in existing_cols:
         conn.execute("DROP TABLE IF EXISTS activity_log")
+        conn.execute("DROP TABLE IF EXISTS audit_checkpoints")
+        conn.execute("DROP TABLE IF EXISTS audit_merkle_nodes")
+        conn.execute("DROP TABLE IF EXISTS audit_merkle_base")
+        conn.execute("DROP TABLE IF EXISTS audit_segments")
 
     conn.execute("""
         CREATE TABLE IF NOT EXISTS activity_log (
@@ -127,9 +151,16 @@ def init_db() -> None:
     conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_activity_log_id ON activity_log(id DESC)"
     )
+    # One (column, id) index per query_logs filter: an equality filter plus the
+    # id keyset cursor is a single index range scan, already in id order.
+    for column in ("actor_id", "action_type", "matter_id", "resource_id", "timestamp_wall"):
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_activity_log_{column} ON activity_log({column}, id)"
+        )
 
     # Prevent in-place edits of audit rows — RAISE(ABORT) rolls back the statement.
-    # DELETE is intentionally allowed for managed TTL pruning (_maybe_prune).
+    # DELETE is intentionally allowed: rows leave the live table once archived
+    # into a segment (_maybe_archive).
     conn.execute("""
         CREATE TRIGGER IF NOT EXISTS prevent_update
         BEFORE UPDATE ON activity_log
@@ -138,6 +169,67 @@ def init_db() -> None:
         END
     """)
 
+    # Signed chain heads: signature = HMAC(secret, "checkpoint|id|entry_hash").
+    # Forging one needs the secret; deleting one only makes verify walk further.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS audit_checkpoints (
+            entry_id    INTEGER PRIMARY KEY,
+            entry_hash  TEXT    NOT NULL,
+            created_at  TEXT    NOT NULL,
+            signature   TEXT    NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS prevent_checkpoint_update
+        BEFORE UPDATE ON audit_checkpoints
+        BEGIN
+            SELECT RAISE(ABORT, 'audit checkpoints are append-only');
+        END
+    """)
+
+    # Merkle tree over entry hashes (core/merkle.py): perfect-subtree nodes,
+    # leaf index = activity_log.id - audit_merkle_base.first_id. Not archived
+    # with activity_log, so proofs stay available for archived entries.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS audit_merkle_nodes (
+            level  INTEGER NOT NULL,
+            idx    INTEGER NOT NULL,
+            hash   BLOB    NOT NULL,
+            PRIMARY KEY (level, idx)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS audit_merkle_base (first_id INTEGER NOT NULL)"
+    )
+    # Manifest of archived segments, oldest first. Each row is HMAC-signed and
+    # carries the previous file's hash and the chain head at its last entry.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS audit_segments (
+            first_id     INTEGER PRIMARY KEY,
+            last_id      INTEGER NOT NULL,
+            file         TEXT    NOT NULL,
+            sha256       TEXT    NOT NULL,
+            prev_sha256  TEXT    NOT NULL,
+            chain_head   TEXT    NOT NULL,
+            created_at   TEXT    NOT NULL,
+            signature    TEXT    NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS prevent_segment_change
+        BEFORE UPDATE ON audit_segments
+        BEGIN
+            SELECT RAISE(ABORT, 'audit segments are append-only');
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS prevent_merkle_update
+        BEFORE UPDATE ON audit_merkle_nodes
+        BEGIN
+            SELECT RAISE(ABORT, 'audit merkle tree is append-only');
+        END
+    """)
+
     conn.commit()
     conn.close()
 
@@ -148,34 +240,487 @@ if not AUDIT_SOCKET_PATH and _can_write_db():
     init_db()
 
 
-def _socket_call(msg: dict) -> dict:
-    """Send a request to audit_writer via Unix socket and return the JSON response.
+# ── Batching queue ─────────────────────────────────────────────────────────────
+
+class _BatchQueue(abc.ABC):
+    """Bounded FIFO drained by one daemon thread, up to _GROUP_COMMIT_MAX
+    entries per process() call.
+
+    submit() takes a list of entries and returns a Future that resolves once
+    the batch containing them has been processed. An empty list is a barrier:
+    it resolves after everything queued before it.
+    """
+
+    name = "audit-queue"
+
+    def __init__(self, maxsize: int) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def process(self, entries: list[dict]):
+        """Handle one drained batch; the return value is passed to after_batch."""
+
+    def after_batch(self, result) -> None:
+        """Follow-up work run after waiters are released (still before the next batch)."""
+
+    def submit(self, entries: list[dict]) -> Future:
+        future: Future = Future()
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+        self._queue.put((entries, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            while size < _GROUP_COMMIT_MAX:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+            entries = [e for item_entries, _ in batch for e in item_entries]
+            error: Exception | None = None
+            result = None
+            if entries:
+                try:
+                    result = self.process(entries)
+                except Exception as e:
+                    error = e
+                    print(f"[logger] Audit {self.name} failed for {len(entries)} entries: {e}")
+            for _, future in batch:
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+            if result is not None:
+                try:
+                    self.after_batch(result)
+                except Exception as e:
+                    print(f"[logger] Audit {self.name} follow-up failed: {e}")
+
+
+class _GroupCommitQueue(_BatchQueue):
+    """Direct mode: every drained batch becomes one transaction (one fsync)."""
+    name = "audit-group-commit"
+
+    def process(self, entries: list[dict]) -> tuple[int, int]:
+        return _commit_entries(entries)
+
+    def after_batch(self, id_range: tuple[int, int]) -> None:
+        _maybe_archive(*id_range)
+
+
+class _ForwardQueue(_BatchQueue):
+    """Socket mode, fire-and-forget: batches go to audit_writer as one request."""
+    name = "audit-forwarder"
+
+    def process(self, entries: list[dict]) -> None:
+        _forward_entries(entries)
+
+
+_commit_queue = _GroupCommitQueue(_QUEUE_SIZE)
+_forward_queue = _ForwardQueue(_QUEUE_SIZE)
 
-    Connection-per-request: open → send all bytes → SHUT_WR (signals EOF to
-    server) → read all reply bytes → close. Simple and deadlock-free.
+# Paths whose schema this process has already checked (init_db runs once each).
+_initialised_paths: set[str] = set()
+_merkle_disabled_paths: set[str] = set()
+
+
+def build_entry(
+    agent_name: str,
+    action_type: str,
+    details: str,
+    resource_id: str = "",
+    matter_id: str = "",
+) -> dict:
+    """An audit entry as queued for commit, stamped with the current UTC time."""
+    return {
+        "timestamp": datetime.datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        "agent_name": agent_name,
+        "action_type": action_type,
+        "details": details,
+        "resource_id": resource_id,
+        "matter_id": matter_id,
+    }
+
+
+def _commit_entries(entries: list[dict]) -> tuple[int, int]:
+    """Append entries in order, chaining HMACs, in a single transaction.
+    Returns the (first_id, last_id) range written.
+
+    BEGIN IMMEDIATE takes the write lock before the chain head is read, so the
+    read-last-hash → compute-ids → insert sequence is atomic even against
+    another process writing the same file.
     """
+    conn = get_connection(DB_PATH)
+    if DB_PATH not in _initialised_paths:
+        init_db()
+        try:
+            _merkle_backfill(conn)
+        except Exception as e:
+            # The chain itself is still written and verifiable; only proofs are lost.
+            print(f"[logger] Audit merkle tree disabled for {DB_PATH}: {e}")
+            _merkle_disabled_paths.add(DB_PATH)
+        _initialised_paths.add(DB_PATH)
+    conn.execute("BEGIN IMMEDIATE")
     try:
-        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
-            s.connect(AUDIT_SOCKET_PATH)
-            s.sendall(json.dumps(msg).encode())
-            s.shutdown(socket.SHUT_WR)
-            data = b""
+        head = conn.execute(
+            "SELECT id, entry_hash FROM activity_log ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        last_id, prev_hash = (head[0], head[1]) if head else (0, _GENESIS_HASH)
+        first_id = last_id + 1
+
+        # Ids are assigned here, not by SQLite, so each can be part of its own
+        # hash — the prevent_update trigger blocks any post-insert UPDATE that
+        # would otherwise set the final entry_hash.
+        rows = []
+        for entry in entries:
+            last_id += 1
+            entry_hash = _compute_entry_hash(
+                last_id, entry["timestamp"], entry["agent_name"], entry["action_type"],
+                entry["resource_id"], prev_hash,
+            )
+            rows.append((
+                last_id, entry["timestamp"], entry["agent_name"], entry["action_type"],
+                entry["resource_id"], entry["matter_id"], entry["details"],
+                _sha256(entry["details"]), prev_hash, entry_hash,
+            ))
+            prev_hash = entry_hash
+
+        conn.executemany(
+            """
+            INSERT INTO activity_log
+                (id, timestamp_wall, actor_id, action_type, resource_id,
+                 matter_id, details, details_hash, prev_entry_hash, entry_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        if DB_PATH not in _merkle_disabled_paths:
+            _merkle_append(conn, first_id, [row[9] for row in rows])
+        if last_id // _CHECKPOINT_INTERVAL != (first_id - 1) // _CHECKPOINT_INTERVAL:
+            conn.execute(
+                "INSERT INTO audit_checkpoints (entry_id, entry_hash, created_at, signature) "
+                "VALUES (?, ?, ?, ?)",
+                (last_id, prev_hash, entries[-1]["timestamp"],
+                 _compute_checkpoint_signature(last_id, prev_hash)),
+            )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return first_id, last_id
+
+
+def _merkle_getter(conn: sqlite3.Connection) -> merkle.NodeGetter:
+    def get_node(level: int, idx: int) -> bytes:
+        row = conn.execute(
+            "SELECT hash FROM audit_merkle_nodes WHERE level = ? AND idx = ?", (level, idx)
+        ).fetchone()
+        if row is None:
+            raise LookupError(f"missing merkle node ({level}, {idx})")
+        return row[0]
+    return get_node
+
+
+def _merkle_size(conn: sqlite3.Connection) -> int:
+    return conn.execute(
+        "SELECT COALESCE(MAX(idx) + 1, 0) FROM audit_merkle_nodes WHERE level = 0"
+    ).fetchone()[0]
+
+
+def _merkle_base(conn: sqlite3.Connection) -> int | None:
+    row = conn.execute("SELECT first_id FROM audit_merkle_base").fetchone()
+    return row[0] if row else None
+
+
+def _merkle_append(conn: sqlite3.Connection, first_id: int, entry_hashes: list[str]) -> None:
+    """Add leaves for rows first_id.. to the tree. Caller holds the write transaction."""
+    base = _merkle_base(conn)
+    if base is None:
+        base = first_id
+        conn.execute("INSERT INTO audit_merkle_base (first_id) VALUES (?)", (base,))
+    nodes = merkle.append_nodes(
+        _merkle_getter(conn), first_id - base, [merkle.leaf_hash(h) for h in entry_hashes]
+    )
+    conn.executemany(
+        "INSERT INTO audit_merkle_nodes (level, idx, hash) VALUES (?, ?, ?)", nodes
+    )
+
+
+def _merkle_backfill(conn: sqlite3.Connection, chunk: int = 1000) -> None:
+    """Bring the tree level with activity_log — for logs that predate it."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        base = _merkle_base(conn)
+        if base is None:
+            base = conn.execute("SELECT MIN(id) FROM activity_log").fetchone()[0]
+        next_id = base + _merkle_size(conn) if base is not None else None
+        while next_id is not None:
+            rows = conn.execute(
+                "SELECT id, entry_hash FROM activity_log WHERE id >= ? ORDER BY id LIMIT ?",
+                (next_id, chunk),
+            ).fetchall()
+            if not rows:
+                break
+            if rows[0][0] != next_id:
+                raise RuntimeError(f"audit rows from id {next_id} are gone; merkle tree cannot be built")
+            _merkle_append(conn, next_id, [r[1] for r in rows])
+            next_id = rows[-1][0] + 1
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _maybe_archive(first_id: int, last_id: int) -> None:
+    """Roll the oldest live rows into segments once the table is over its bound.
+
+    Runs on the writer thread after a batch's waiters are released. Live size
+    is last_id - MIN(id) + 1 (ids are contiguous) — an index lookup, no COUNT(*).
+    """
+    if last_id // _ARCHIVE_INTERVAL == (first_id - 1) // _ARCHIVE_INTERVAL:
+        return
+    conn = get_connection(DB_PATH)
+    while True:
+        live_first = conn.execute("SELECT MIN(id) FROM activity_log").fetchone()[0]
+        if live_first is None or last_id - live_first + 1 < _LIVE_MAX_ROWS + _SEGMENT_ROWS:
+            return
+        _archive_segment(conn, live_first, live_first + _SEGMENT_ROWS - 1)
+
+
+def _archive_segment(conn: sqlite3.Connection, first_id: int, last_id: int) -> None:
+    """Write rows [first_id, last_id] to a segment file, then record it and
+    drop the rows in one transaction. The file is durable before any delete."""
+    rows = conn.execute(
+        f"SELECT {_ROW_COLUMNS} FROM activity_log WHERE id BETWEEN ? AND ? ORDER BY id",
+        (first_id, last_id),
+    ).fetchall()
+    if not rows:
+        return
+    last_id = rows[-1][0]
+    prev = conn.execute(
+        "SELECT sha256 FROM audit_segments ORDER BY first_id DESC LIMIT 1"
+    ).fetchone()
+    prev_sha256 = prev[0] if prev else _GENESIS_HASH
+    name = f"{first_id:012d}-{last_id:012d}.seg"
+    sha256 = audit_archive.write_segment(
+        os.path.join(_archive_dir(), name), [tuple(r) for r in rows], prev_sha256
+    )
+    chain_head = rows[-1][9]
+    with conn:
+        conn.execute(
+            "INSERT INTO audit_segments (first_id, last_id, file, sha256, prev_sha256, "
+            "chain_head, created_at, signature) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (first_id, last_id, name, sha256, prev_sha256, chain_head,
+             datetime.datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+             _compute_segment_signature(first_id, last_id, sha256, prev_sha256, chain_head)),
+        )
+        conn.execute("DELETE FROM activity_log WHERE id BETWEEN ? AND ?", (first_id, last_id))
+
+
+def read_archived_row(conn: sqlite3.Connection, entry_id: int) -> list | None:
+    """Look up an archived row (COLUMNS order) via the manifest; None if not archived."""
+    seg = conn.execute(
+        "SELECT file FROM audit_segments WHERE first_id <= ? AND last_id >= ?",
+        (entry_id, entry_id),
+    ).fetchone()
+    if seg is None:
+        return None
+    with audit_archive.SegmentReader(os.path.join(_archive_dir(), seg[0])) as reader:
+        return reader.row(entry_id)
+
+
+def enqueue_entries(entries: list[dict]) -> Future:
+    """Direct mode: queue entries for the group-commit writer.
+
+    The Future resolves when they are committed. Entries queued by different
+    threads are chained in queue order.
+    """
+    return _commit_queue.submit(entries)
+
+
+# ── Socket protocol ────────────────────────────────────────────────────────────
+# Every request and reply is a 4-byte big-endian length followed by a UTF-8
+# JSON object. A connection carries any number of requests; the server answers
+# them in the order received, so requests can be pipelined.
+
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+
+def encode_frame(msg: dict) -> bytes:
+    body = json.dumps(msg).encode()
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("audit socket closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv_frame(sock: socket.socket) -> dict:
+    (size,) = FRAME_HEADER.unpack(_recv_exact(sock, FRAME_HEADER.size))
+    if size > MAX_FRAME_BYTES:
+        raise ConnectionError(f"audit frame too large: {size} bytes")
+    return json.loads(_recv_exact(sock, size))
+
+
+class _AuditSocketClient:
+    """One persistent, pipelined connection to audit_writer, shared by all threads.
+
+    A request's frame is written and its Future appended to the pending deque
+    under the same lock, so the deque is in wire order; a reader thread pairs
+    each reply with the oldest pending Future. If the connection drops, every
+    pending request fails and the next call reconnects.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._sock: socket.socket | None = None
+        self._pending: deque[Future] = deque()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._pending = deque()
+        threading.Thread(
+            target=self._read_loop, args=(sock, self._pending),
+            name="audit-socket-reader", daemon=True,
+        ).start()
+        return sock
+
+    def _read_loop(self, sock: socket.socket, pending: deque) -> None:
+        try:
             while True:
-                chunk = s.recv(4096)
-                if not chunk:
-                    break
-                data += chunk
-            return json.loads(data)
+                reply = _recv_frame(sock)
+                with self._lock:
+                    future = pending.popleft()
+                future.set_result(reply)
+        except Exception as e:
+            self._drop(sock, pending, e)
+
+    def _drop(self, sock: socket.socket, pending: deque, error: Exception) -> None:
+        with self._lock:
+            if self._sock is sock:
+                self._sock = None
+            failed = list(pending)
+            pending.clear()
+        sock.close()
+        for future in failed:
+            if not future.done():
+                future.set_exception(ConnectionError(f"audit socket lost: {error}"))
+
+    def submit(self, msg: dict) -> Future:
+        frame = encode_frame(msg)
+        future: Future = Future()
+        for attempt in (1, 2):
+            with self._lock:
+                sock = self._sock or self._connect()
+                pending = self._pending
+                try:
+                    sock.sendall(frame)
+                except OSError as e:
+                    error = e
+                else:
+                    pending.append(future)
+                    return future
+            # A stale connection (audit_writer restarted): drop it, retry once.
+            self._drop(sock, pending, error)
+            if attempt == 2:
+                raise error
+        return future
+
+    def call(self, msg: dict, timeout: float = _WRITE_TIMEOUT) -> dict:
+        return self.submit(msg).result(timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)   # reader thread sees EOF and fails pending
+            except OSError:
+                pass  # already dropped by the peer
+
+
+_socket_client: _AuditSocketClient | None = None
+_socket_client_lock = threading.Lock()
+
+
+def _get_socket_client() -> _AuditSocketClient:
+    global _socket_client
+    with _socket_client_lock:
+        if _socket_client is None or _socket_client.path != AUDIT_SOCKET_PATH:
+            _socket_client = _AuditSocketClient(AUDIT_SOCKET_PATH)
+        return _socket_client
+
+
+def _reset_after_fork() -> None:
+    """Threads don't survive fork(): give a child fresh queues and no socket."""
+    global _commit_queue, _forward_queue, _socket_client, _socket_client_lock
+    _commit_queue = _GroupCommitQueue(_QUEUE_SIZE)
+    _forward_queue = _ForwardQueue(_QUEUE_SIZE)
+    _socket_client = None
+    _socket_client_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _socket_call(msg: dict) -> dict:
+    """Send a request to audit_writer over the shared connection and return its reply."""
+    try:
+        return _get_socket_client().call(msg)
     except Exception as e:
         print(f"[logger] Audit socket error: {e}")
         return {}
 
 
-def _get_last_entry_hash(conn: sqlite3.Connection) -> str:
-    row = conn.execute(
-        "SELECT entry_hash FROM activity_log ORDER BY id DESC LIMIT 1"
-    ).fetchone()
-    return row[0] if row else _GENESIS_HASH
+def _forward_entries(entries: list[dict]) -> None:
+    reply = _get_socket_client().call({"type": "log_batch", "entries": entries})
+    if not reply.get("ok"):
+        raise RuntimeError(reply.get("error", "audit_writer rejected batch"))
+
+
+def flush_audit_log(timeout: float = 5.0) -> None:
+    """Wait until entries already queued (fire-and-forget mode) are written."""
+    for batch_queue in (_forward_queue, _commit_queue):
+        if batch_queue._thread is not None and batch_queue._thread.is_alive():
+            try:
+                batch_queue.submit([]).result(timeout)
+            except Exception:
+                pass
+
+
+def _shutdown_audit_log() -> None:
+    """At exit: flush queued entries, then close the audit_writer connection."""
+    flush_audit_log()
+    if _socket_client is not None:
+        _socket_client.close()
+
+
+atexit.register(_shutdown_audit_log)
 
 
 def log_agent_action(
@@ -190,74 +735,62 @@ def log_agent_action(
 
     Signature is backward-compatible — all existing callers pass only
     (agent_name, action_type, details) and continue to work unchanged.
+
+    Returns once the entry is committed, or once it is queued when
+    AUDIT_FIRE_AND_FORGET is on. Never raises.
     """
     if AUDIT_SOCKET_PATH:
-        _socket_call({
-            "type": "log",
+        msg = {
             "agent_name": agent_name,
             "action_type": action_type,
             "details": details,
             "resource_id": resource_id,
             "matter_id": matter_id,
-        })
+        }
+        if _FIRE_AND_FORGET:
+            _forward_queue.submit([msg])
+        else:
+            _socket_call({"type": "log", **msg})
         return
 
     try:
-        with _write_lock:
-            init_db()
-            conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-            conn.execute("PRAGMA journal_mode=WAL")
-
-            timestamp = datetime.datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-            prev_hash = _get_last_entry_hash(conn)
-
-            # Pre-compute the next id so we can include it in the hash before
-            # inserting — necessary because the prevent_update trigger blocks any
-            # post-insert UPDATE that would otherwise set the final entry_hash.
-            next_id: int = conn.execute(
-                "SELECT COALESCE(MAX(id), 0) + 1 FROM activity_log"
-            ).fetchone()[0]
-
-            details_hash = _sha256(details)
-            entry_hash = _compute_entry_hash(
-                next_id, timestamp, agent_name, action_type, resource_id, prev_hash
-            )
-
-            conn.execute(
-                """
-                INSERT INTO activity_log
-                    (id, timestamp_wall, actor_id, action_type, resource_id,
-                     matter_id, details, details_hash, prev_entry_hash, entry_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    next_id, timestamp, agent_name, action_type, resource_id,
-                    matter_id, details, details_hash, prev_hash, entry_hash,
-                ),
-            )
-            conn.commit()
-            _maybe_prune(conn, next_id)
-            conn.close()
+        future = enqueue_entries([
+            build_entry(agent_name, action_type, details, resource_id, matter_id)
+        ])
+        if not _FIRE_AND_FORGET:
+            future.result(_WRITE_TIMEOUT)
     except Exception as e:
         print(f"Logging failed: {e}")
 
 
 def get_recent_logs(limit: int = 20) -> list:
-    """Fetch recent logs for the dashboard. Returns same tuple shape as before.
-
-    Uses immutable read-only URI so this works on the dashboard's read-only
-    data/dbs mount without SQLite needing to touch any lock files.
-    """
+    """Fetch recent logs for the dashboard. Returns same tuple shape as before."""
     if AUDIT_SOCKET_PATH:
         result = _socket_call({"type": "recent", "limit": limit})
         return [tuple(r) for r in result.get("logs", [])]
+    return read_recent_logs(limit)
+
+
+def _connect_readonly() -> sqlite3.Connection:
+    """Read-only connection to the audit DB.
+
+    On a read-only mount (the dashboard's data/dbs) this uses an immutable URI
+    so SQLite never touches lock files. Immutable readers skip the WAL, so a
+    writable location (audit_writer, dev) gets a normal read-only connection
+    that sees the latest commits.
+    """
+    immutable = "" if os.access(os.path.dirname(DB_PATH), os.W_OK) else "&immutable=1"
+    return sqlite3.connect(
+        f"file:{DB_PATH}?mode=ro{immutable}", uri=True, check_same_thread=False
+    )
 
+
+def read_recent_logs(limit: int = 20) -> list:
+    """Direct-mode read behind get_recent_logs (also served by audit_writer)."""
     try:
         if not os.path.exists(DB_PATH):
             return []
-        conn = sqlite3.connect(
-            f"file:{DB_PATH}?mode=ro&immutable=1", uri=True, check_same_thread=False
-        )
+        conn = _connect_readonly()
         data = conn.execute(
             "SELECT timestamp_wall, actor_id, action_type, details "
             "FROM activity_log ORDER BY id DESC LIMIT ?",
@@ -269,51 +802,398 @@ def get_recent_logs(limit: int = 20) -> list:
         return []
 
 
-def verify_audit_chain() -> dict:
+# ── Filtered queries ───────────────────────────────────────────────────────────
+
+_QUERY_MAX = 1000   # rows per query_logs page
+_QUERY_FILTERS = ("actor_id", "action_type", "matter_id", "resource_id")
+
+
+def query_logs(
+    filters: dict | None = None,
+    before_id: int | None = None,
+    limit: int = 100,
+    archived: bool = False,
+) -> dict:
     """
-    Walk every row in insertion order and verify the HMAC chain is unbroken.
+    One page of audit entries, newest first.
 
-    Returns {"valid": True, "entries_checked": N} on success, or
-    {"valid": False, "first_failed_id": N} on the first broken link.
+    filters: exact matches on actor_id, action_type, matter_id, resource_id,
+    plus "since" (inclusive) and "until" (exclusive) timestamps in the log's
+    "YYYY-MM-DD HH:MM:SS" UTC format.
+
+    Pagination is a keyset on id: pass the previous page's next_before_id to
+    continue. archived=True also searches archived segments once the live
+    table is exhausted (a scan — segments have no secondary indexes).
+
+    Returns {"logs": [entry, ...], "next_before_id": id | None}, {"error": ...}
+    for a bad request, or {} if the log is unavailable.
     """
+    msg = {
+        "type": "query",
+        "filters": filters or {},
+        "before_id": before_id,
+        "limit": limit,
+        "archived": archived,
+    }
     if AUDIT_SOCKET_PATH:
-        return _socket_call({"type": "verify"})
+        return _socket_call(msg)
+    return query_logs_direct(msg)
+
+
+def iter_logs(filters: dict | None = None, archived: bool = False, page_size: int = _QUERY_MAX):
+    """Every matching entry, newest first, fetched a page at a time."""
+    before_id = None
+    while True:
+        page = query_logs(filters, before_id, page_size, archived)
+        if not page or "error" in page:
+            raise RuntimeError(page.get("error", "audit log unavailable"))
+        yield from page["logs"]
+        before_id = page["next_before_id"]
+        if before_id is None:
+            return
+
+
+def _log_entry(row) -> dict:
+    """A row in audit_archive.COLUMNS order, as returned by query_logs."""
+    return {
+        "id": row[0],
+        "timestamp": row[1],
+        "actor": row[2],
+        "action": row[3],
+        "resource_id": row[4],
+        "matter_id": row[5],
+        "details": row[6],
+        "entry_hash": row[9],
+    }
+
 
+def _archived_matches(conn: sqlite3.Connection, filters: dict, before_id: int | None, limit: int) -> list:
+    """Scan segments newest-first for up to `limit` rows matching filters."""
+    exact = [(audit_archive.COLUMNS.index(c), filters[c]) for c in _QUERY_FILTERS if c in filters]
+    since, until = filters.get("since"), filters.get("until")
+    upper = None if before_id is None else before_id - 1
+    found: list = []
+    segments = conn.execute(
+        "SELECT file FROM audit_segments WHERE ? IS NULL OR first_id <= ? ORDER BY first_id DESC",
+        (upper, upper),
+    ).fetchall()
+    for (name,) in segments:
+        with audit_archive.SegmentReader(os.path.join(_archive_dir(), name)) as reader:
+            rows = list(reader.rows(None, upper))
+        for row in reversed(rows):
+            if any(row[i] != value for i, value in exact):
+                continue
+            if (since and row[1] < since) or (until and row[1] >= until):
+                continue
+            found.append(row)
+            if len(found) == limit:
+                return found
+    return found
+
+
+def query_logs_direct(msg: dict) -> dict:
+    """Direct-mode body of query_logs (also served by audit_writer)."""
     try:
-        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        filters = {k: str(v) for k, v in (msg.get("filters") or {}).items() if v is not None}
+        unknown = set(filters) - set(_QUERY_FILTERS) - {"since", "until"}
+        if unknown:
+            return {"error": f"unknown filter: {sorted(unknown)[0]}"}
+        limit = max(1, min(int(msg.get("limit") or 100), _QUERY_MAX))
+        before_id = msg.get("before_id")
+        before_id = None if before_id is None else int(before_id)
+    except (TypeError, ValueError, AttributeError) as e:
+        return {"error": f"bad query: {e}"}
+
+    clauses, params = [], []
+    for column in _QUERY_FILTERS:
+        if column in filters:
+            clauses.append(f"{column} = ?")
+            params.append(filters[column])
+    if "since" in filters:
+        clauses.append("timestamp_wall >= ?")
+        params.append(filters["since"])
+    if "until" in filters:
+        clauses.append("timestamp_wall < ?")
+        params.append(filters["until"])
+    if before_id is not None:
+        clauses.append("id < ?")
+        params.append(before_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    try:
+        if not os.path.exists(DB_PATH):
+            return {"logs": [], "next_before_id": None}
+        conn = _connect_readonly()
+    except Exception as e:
+        return {"error": str(e)}
+    try:
+        conn.execute("BEGIN")   # live rows and the segment manifest from one snapshot
+        # One extra row tells us whether another page exists.
         rows = conn.execute(
-            "SELECT id, timestamp_wall, actor_id, action_type, resource_id, "
-            "prev_entry_hash, entry_hash FROM activity_log ORDER BY id ASC"
+            f"SELECT {_ROW_COLUMNS} FROM activity_log {where} ORDER BY id DESC LIMIT ?",
+            (*params, limit + 1),
         ).fetchall()
+        if msg.get("archived") and len(rows) <= limit:
+            live_first = conn.execute("SELECT MIN(id) FROM activity_log").fetchone()[0]
+            bound = before_id if live_first is None else min(before_id or live_first, live_first)
+            rows += _archived_matches(conn, filters, bound, limit + 1 - len(rows))
+        return {
+            "logs": [_log_entry(r) for r in rows[:limit]],
+            "next_before_id": rows[limit - 1][0] if len(rows) > limit else None,
+        }
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
         conn.close()
+
+
+def verify_audit_chain(full: bool = False) -> dict:
+    """
+    Verify the HMAC chain is unbroken.
+
+    By default only rows after the newest signed checkpoint are walked (the
+    checkpoint itself is re-checked against its row). full=True walks every
+    row and also checks every checkpoint.
+
+    Returns {"valid": True, "entries_checked": N} on success (plus
+    "checkpoint_id" when verification started from one), or
+    {"valid": False, "first_failed_id": N} on the first broken link.
+    """
+    if AUDIT_SOCKET_PATH:
+        return _socket_call({"type": "verify", "full": full})
+    return verify_chain_direct(full)
+
+
+def verify_chain_direct(full: bool = False) -> dict:
+    """Direct-mode body of verify_audit_chain (also served by audit_writer)."""
+    try:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        try:
+            return _verify_chain(conn, full)
+        finally:
+            conn.close()
     except Exception as e:
         return {"valid": False, "error": str(e)}
 
-    if not rows:
-        return {"valid": True, "entries_checked": 0}
 
-    # If the first row's prev_entry_hash is not the genesis sentinel, the log
-    # was pruned. The chain is still internally consistent from that point — we
-    # verify it from the surviving root rather than failing.
-    first_prev_hash = rows[0][5]
-    pruned = first_prev_hash != _GENESIS_HASH
-    expected_prev = first_prev_hash
+class _ChainWalker:
+    """Checks consecutive rows link and re-hash correctly, across feeds."""
+
+    def __init__(self, expected_prev: str | None, checkpoints: dict[int, str]) -> None:
+        self.expected_prev = expected_prev
+        self.checkpoints = checkpoints
+        self.pruned = False
+        self.checked = 0
+        self.last_id: int | None = None
+
+    def feed(self, rows) -> int | None:
+        """Walk (id, ts, actor, action, resource, prev_hash, entry_hash) rows.
+        Returns the first failing id, or None."""
+        for id_, timestamp, actor_id, action_type, resource_id, prev_hash, stored_hash in rows:
+            if self.expected_prev is None:
+                # If the first row's prev_entry_hash is not the genesis sentinel,
+                # the log was pruned (before archiving existed). The chain is still
+                # internally consistent from that point — verify from the surviving root.
+                self.expected_prev = prev_hash
+                self.pruned = prev_hash != _GENESIS_HASH
+
+            if prev_hash != self.expected_prev:
+                return id_
+
+            computed = _compute_entry_hash(
+                id_, timestamp, actor_id, action_type, resource_id, prev_hash
+            )
+            if computed != stored_hash or self.checkpoints.get(id_, stored_hash) != stored_hash:
+                return id_
+
+            self.expected_prev = stored_hash
+            self.last_id = id_
+            self.checked += 1
+        return None
 
-    for row in rows:
-        id_, timestamp, actor_id, action_type, resource_id, prev_hash, stored_hash = row
 
-        if prev_hash != expected_prev:
-            return {"valid": False, "first_failed_id": id_}
+def _segment_signature_ok(first_id, last_id, sha256, prev_sha256, chain_head, signature) -> bool:
+    return hmac.compare_digest(
+        signature, _compute_segment_signature(first_id, last_id, sha256, prev_sha256, chain_head)
+    )
+
+
+def _verify_segments(conn: sqlite3.Connection, walker: _ChainWalker) -> dict | None:
+    """Walk every archived segment in order. Returns a failure result, or None."""
+    prev_sha256, prev_last = _GENESIS_HASH, None
+    segments = conn.execute(
+        "SELECT first_id, last_id, file, sha256, prev_sha256, chain_head, signature "
+        "FROM audit_segments ORDER BY first_id"
+    ).fetchall()
+    for first_id, last_id, name, sha256, seg_prev, chain_head, signature in segments:
+        failed = {"valid": False, "first_failed_segment": first_id}
+        if not _segment_signature_ok(first_id, last_id, sha256, seg_prev, chain_head, signature):
+            return failed
+        if seg_prev != prev_sha256 or (prev_last is not None and first_id != prev_last + 1):
+            return failed
+        try:
+            reader = audit_archive.SegmentReader(os.path.join(_archive_dir(), name))
+        except (OSError, ValueError) as e:
+            return {**failed, "error": str(e)}
+        with reader:
+            if reader.sha256() != sha256:
+                return failed
+            failed_id = walker.feed((r[0], r[1], r[2], r[3], r[4], r[8], r[9]) for r in reader.rows())
+        if failed_id is not None:
+            return {"valid": False, "first_failed_id": failed_id}
+        if walker.expected_prev != chain_head or walker.last_id != last_id:
+            return failed
+        prev_sha256, prev_last = sha256, last_id
+    return None
+
 
-        computed = _compute_entry_hash(
-            id_, timestamp, actor_id, action_type, resource_id, prev_hash
+def _verify_chain(conn: sqlite3.Connection, full: bool) -> dict:
+    # Checkpoints to cross-check while walking (full), or the one to start from.
+    checkpoints: dict[int, str] = {}
+    start_after, expected_prev = 0, None
+
+    query = "SELECT entry_id, entry_hash, signature FROM audit_checkpoints"
+    if not full:
+        # Checkpoints older than the live table are covered by segment manifests.
+        query += (
+            " WHERE entry_id >= (SELECT COALESCE(MIN(id), 0) FROM activity_log)"
+            " ORDER BY entry_id DESC LIMIT 1"
         )
-        if computed != stored_hash:
-            return {"valid": False, "first_failed_id": id_}
+    for entry_id, entry_hash, signature in conn.execute(query):
+        if not hmac.compare_digest(signature, _compute_checkpoint_signature(entry_id, entry_hash)):
+            return {"valid": False, "first_failed_checkpoint": entry_id}
+        checkpoints[entry_id] = entry_hash
+
+    walker = _ChainWalker(None, checkpoints)
+    segments_checked = 0
+    if full:
+        failure = _verify_segments(conn, walker)
+        if failure:
+            return failure
+        segments_checked = conn.execute("SELECT COUNT(*) FROM audit_segments").fetchone()[0]
+    elif checkpoints:
+        (start_after, expected_prev), = checkpoints.items()
+        row = conn.execute(
+            "SELECT entry_hash FROM activity_log WHERE id = ?", (start_after,)
+        ).fetchone()
+        if row is None or row[0] != expected_prev:
+            return {"valid": False, "first_failed_id": start_after}
+        walker.expected_prev = expected_prev
+    else:
+        # No checkpoint in the live table: anchor on the newest segment's signed head.
+        seg = conn.execute(
+            "SELECT first_id, last_id, sha256, prev_sha256, chain_head, signature "
+            "FROM audit_segments ORDER BY first_id DESC LIMIT 1"
+        ).fetchone()
+        if seg:
+            if not _segment_signature_ok(*seg):
+                return {"valid": False, "first_failed_segment": seg[0]}
+            walker.expected_prev = seg[4]
 
-        expected_prev = stored_hash
+    # Iterate the cursor rather than fetchall() — memory stays flat however
+    # long the log is.
+    rows = conn.execute(
+        "SELECT id, timestamp_wall, actor_id, action_type, resource_id, "
+        "prev_entry_hash, entry_hash FROM activity_log WHERE id > ? ORDER BY id ASC",
+        (start_after,),
+    )
+    failed_id = walker.feed(rows)
+    if failed_id is not None:
+        return {"valid": False, "first_failed_id": failed_id}
 
-    result: dict = {"valid": True, "entries_checked": len(rows)}
-    if pruned:
+    result: dict = {"valid": True, "entries_checked": walker.checked}
+    if walker.pruned:
         result["pruned"] = True
+    if start_after:
+        result["checkpoint_id"] = start_after
+    if segments_checked:
+        result["segments_checked"] = segments_checked
     return result
+
+
+# ── Merkle proofs ──────────────────────────────────────────────────────────────
+
+def merkle_root(tree_size: int | None = None) -> dict:
+    """Root hash of the audit tree at tree_size leaves (default: current size)."""
+    return _merkle_call({"type": "merkle_root", "tree_size": tree_size})
+
+
+def merkle_inclusion_proof(entry_id: int, tree_size: int | None = None) -> dict:
+    """Proof that entry_id is leaf (entry_id - base) of the tree at tree_size."""
+    return _merkle_call({"type": "merkle_inclusion", "entry_id": entry_id, "tree_size": tree_size})
+
+
+def merkle_consistency_proof(old_size: int, new_size: int | None = None) -> dict:
+    """Proof that the tree at old_size is a prefix of the tree at new_size."""
+    return _merkle_call({"type": "merkle_consistency", "old_size": old_size, "new_size": new_size})
+
+
+def _merkle_call(msg: dict) -> dict:
+    if AUDIT_SOCKET_PATH:
+        return _socket_call(msg)
+    return merkle_query_direct(msg)
+
+
+def merkle_query_direct(msg: dict) -> dict:
+    """Direct-mode body of the merkle_* requests (also served by audit_writer).
+
+    Hashes are hex. Every read happens in one transaction, so the size and
+    the nodes come from the same snapshot. Returns {"error": ...} for sizes or
+    entries outside the tree.
+    """
+    try:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    except Exception as e:
+        return {"error": str(e)}
+    try:
+        conn.execute("BEGIN")
+        get_node = _merkle_getter(conn)
+        current = _merkle_size(conn)
+        base = _merkle_base(conn) or 1
+
+        def _size(requested) -> int:
+            size = current if requested is None else int(requested)
+            if not 0 <= size <= current:
+                raise ValueError(f"tree_size must be between 0 and {current}")
+            return size
+
+        kind = msg.get("type")
+        if kind == "merkle_root":
+            size = _size(msg.get("tree_size"))
+            return {"tree_size": size, "root_hash": merkle.root(get_node, size).hex()}
+
+        if kind == "merkle_inclusion":
+            size = _size(msg.get("tree_size"))
+            entry_id = int(msg["entry_id"])
+            index = entry_id - base
+            proof = merkle.inclusion_proof(get_node, index, size)
+            row = conn.execute(
+                "SELECT entry_hash FROM activity_log WHERE id = ?", (entry_id,)
+            ).fetchone()
+            archived = None if row else read_archived_row(conn, entry_id)
+            return {
+                "entry_id": entry_id,
+                "leaf_index": index,
+                "tree_size": size,
+                "entry_hash": row[0] if row else (archived[9] if archived else None),
+                "leaf_hash": get_node(0, index).hex(),
+                "proof": [h.hex() for h in proof],
+                "root_hash": merkle.root(get_node, size).hex(),
+            }
+
+        if kind == "merkle_consistency":
+            new_size = _size(msg.get("new_size"))
+            old_size = int(msg["old_size"])
+            proof = merkle.consistency_proof(get_node, old_size, new_size)
+            return {
+                "old_size": old_size,
+                "new_size": new_size,
+                "old_root": merkle.root(get_node, old_size).hex(),
+                "new_root": merkle.root(get_node, new_size).hex(),
+                "proof": [h.hex() for h in proof],
+            }
+        return {"error": f"unknown merkle request: {kind!r}"}
+    except (ValueError, KeyError, LookupError) as e:
+        return {"error": str(e)}
+    finally:
+        conn.close()
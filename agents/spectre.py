@@ -1,10 +1,9 @@
-import asyncio
 import logging
 import os
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
 from core.auth import get_current_user
-from core.network_gateway import gateway
+from core.network_gateway import async_gateway
 from core.user_registry import User
 
 logger = logging.getLogger(__name__)
@@ -34,8 +33,8 @@ async def spectre_chat(request: CodeRequest, _: User = Depends(get_current_user)
     """
 
     try:
-        res = await asyncio.to_thread(
-            gateway.post, "ollama", "/api/chat",
+        res = await async_gateway.post(
+            "ollama", "/api/chat",
             json={"model": LLM_MODEL, "messages": [{"role": "user", "content": prompt}], "stream": False},
             timeout=60,
         )
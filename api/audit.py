@@ -1,29 +1,140 @@
-from fastapi import APIRouter, Depends, Query
+import json
+from datetime import datetime, timezone
 
-from agents.logger import verify_audit_chain, get_recent_logs
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from agents.logger import (
+    iter_logs,
+    merkle_consistency_proof,
+    merkle_inclusion_proof,
+    merkle_root,
+    query_logs,
+    verify_audit_chain,
+)
 from core.auth import require_admin
-from core.schemas import AuditVerifyResponse
+from core.schemas import (
+    AuditLogsResponse,
+    AuditVerifyResponse,
+    MerkleConsistencyResponse,
+    MerkleInclusionResponse,
+    MerkleRootResponse,
+)
 from core.user_registry import User
 
 router = APIRouter()
 
 
 @router.get("/api/audit/verify", response_model=AuditVerifyResponse)
-def audit_verify(current_user: User = Depends(require_admin)):
-    """Walk the full audit log and verify every HMAC chain link is unbroken."""
-    return verify_audit_chain()
+def audit_verify(
+    full: bool = Query(default=False, description="Walk every row instead of starting at the newest checkpoint"),
+    current_user: User = Depends(require_admin),
+):
+    """Verify the audit HMAC chain — from the newest signed checkpoint, or all of it."""
+    return verify_audit_chain(full=full)
+
+
+def _log_timestamp(value: datetime | None) -> str | None:
+    """A query bound in the log's own format (UTC, second resolution)."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _log_filters(
+    actor: str | None = Query(default=None, description="Exact actor_id"),
+    action_type: str | None = Query(default=None),
+    matter_id: str | None = Query(default=None),
+    resource_id: str | None = Query(default=None),
+    since: datetime | None = Query(default=None, description="Inclusive; naive times are UTC"),
+    until: datetime | None = Query(default=None, description="Exclusive; naive times are UTC"),
+) -> dict:
+    filters = {
+        "actor_id": actor,
+        "action_type": action_type,
+        "matter_id": matter_id,
+        "resource_id": resource_id,
+        "since": _log_timestamp(since),
+        "until": _log_timestamp(until),
+    }
+    return {k: v for k, v in filters.items() if v is not None}
 
 
-@router.get("/api/audit/logs")
+def _page_or_error(page: dict) -> dict:
+    if not page:
+        raise HTTPException(status_code=503, detail="Audit log unavailable.")
+    if "error" in page:
+        raise HTTPException(status_code=400, detail=page["error"])
+    return page
+
+
+@router.get("/api/audit/logs", response_model=AuditLogsResponse)
 def audit_logs(
-    limit: int = Query(default=20, ge=1, le=100),
+    limit: int = Query(default=20, ge=1, le=1000),
+    before_id: int | None = Query(default=None, ge=1, description="next_before_id from the previous page"),
+    archived: bool = Query(default=False, description="Also search archived segments (slower)"),
+    filters: dict = Depends(_log_filters),
     current_user: User = Depends(require_admin),
 ):
-    """Return the most recent audit log entries (newest first)."""
-    rows = get_recent_logs(limit)
-    return {
-        "logs": [
-            {"timestamp": r[0], "actor": r[1], "action": r[2], "details": r[3]}
-            for r in rows
-        ]
-    }
+    """Audit log entries matching the filters, newest first, one keyset page at a time."""
+    return _page_or_error(query_logs(filters, before_id, limit, archived))
+
+
+@router.get("/api/audit/logs/export")
+def audit_logs_export(
+    archived: bool = Query(default=False, description="Also search archived segments (slower)"),
+    filters: dict = Depends(_log_filters),
+    current_user: User = Depends(require_admin),
+):
+    """Every matching entry as NDJSON, newest first, streamed page by page."""
+    # Fail with a status code before the stream starts, not halfway through it.
+    _page_or_error(query_logs(filters, None, 1, archived))
+
+    def _lines():
+        for entry in iter_logs(filters, archived):
+            yield json.dumps(entry) + "\n"
+
+    return StreamingResponse(
+        _lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="audit_log.ndjson"'},
+    )
+
+
+def _proof_or_error(result: dict) -> dict:
+    if not result:
+        raise HTTPException(status_code=503, detail="Audit log unavailable.")
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+
+@router.get("/api/audit/merkle/root", response_model=MerkleRootResponse)
+def audit_merkle_root(
+    tree_size: int | None = Query(default=None, ge=0),
+    current_user: User = Depends(require_admin),
+):
+    """Merkle root over audit entry hashes — publish it, then prove against it."""
+    return _proof_or_error(merkle_root(tree_size))
+
+
+@router.get("/api/audit/merkle/inclusion/{entry_id}", response_model=MerkleInclusionResponse)
+def audit_merkle_inclusion(
+    entry_id: int,
+    tree_size: int | None = Query(default=None, ge=1),
+    current_user: User = Depends(require_admin),
+):
+    """O(log n) proof that an audit entry is in the tree (verify with core.merkle.verify_inclusion)."""
+    return _proof_or_error(merkle_inclusion_proof(entry_id, tree_size))
+
+
+@router.get("/api/audit/merkle/consistency", response_model=MerkleConsistencyResponse)
+def audit_merkle_consistency(
+    old_size: int = Query(ge=1),
+    new_size: int | None = Query(default=None, ge=1),
+    current_user: User = Depends(require_admin),
+):
+    """Proof that the tree at old_size is a prefix of the tree at new_size."""
+    return _proof_or_error(merkle_consistency_proof(old_size, new_size))
@@ -1,27 +1,26 @@
+import asyncio
 import hashlib
 import json
 import logging
 import re
-from typing import Generator
+from typing import AsyncGenerator
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
-from qdrant_client.http import models
 
 from agents.logger import log_agent_action
 from api.matters import _resolve_matter
 from core.auth import get_current_user
-from core.classification_engine import classify, Classification
-from core.deps import COLLECTION_NAME, client, get_embedding, llm, LLM_MODEL
-from core.sanitizer import sanitize
+from core.context_packer import budget_for, pack_context
+from core.answer_cache import fingerprint
+from core.deps import aget_embedding, allm, answer_cache, LLM_MODEL
+from core.retrieval import retrieve_context
 from core.schemas import ChatResponse, UserInput
 from core.user_registry import User
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-MAX_CONTEXT_CHARS = 4000
-
 _URL_RE = re.compile(r"\(?https?://\S+\)?")
 
 
@@ -36,46 +35,41 @@ def _sse(data: dict) -> str:
     return f"data: {json.dumps(data)}\n\n"
 
 
-def _build_context(item: UserInput, current_user, resolved_matter):
+async def _build_context(item: UserInput, current_user, resolved_matter):
     """Shared retrieval + sanitization logic for both streaming and non-streaming paths."""
-    query_vector = get_embedding(item.text)
+    query_vector = await aget_embedding(item.text)
     if not query_vector:
-        return None, None, None, None
+        return None, None, None, None, None
 
     try:
-        must = [models.FieldCondition(key="user_id", match=models.MatchValue(value=current_user.id))]
-        if resolved_matter is not None:
-            must.append(models.FieldCondition(
-                key="matter_id", match=models.MatchValue(value=resolved_matter)
-            ))
-        search_response = client.search(
-            collection_name=COLLECTION_NAME,
-            query_vector=query_vector,
-            query_filter=models.Filter(must=must),
-            limit=10,
-            score_threshold=0.45,
+        # Memories and the query are sanitized as one batch, so a placeholder
+        # means the same value everywhere in the prompt.
+        retrieved = await retrieve_context(
+            query_vector, current_user.id, resolved_matter, limit=10, query=item.text
         )
-        search_hits = search_response.points
     except Exception as e:
         logger.error(f"Search failed: {e}")
-        return None, None, None, None
-
-    simple_sources = []
-    lines = []
-    for hit in search_hits:
-        mem_text = hit.payload.get("memory") or "Unknown info"
-        mem_classification = Classification[hit.payload.get("classification", "PUBLIC")]
-        sanitized_mem = sanitize(mem_text, mem_classification)
-        lines.append(f"- {_strip_urls(sanitized_mem.text)}")
-        simple_sources.append({
-            "memory": mem_text,
-            "score": round(hit.score, 3),
-            "classification": hit.payload.get("classification", "PUBLIC"),
-        })
-    context_str = "\n".join(lines)[:MAX_CONTEXT_CHARS]
-
-    query_classification = classify(item.text)
-    sanitized_query = sanitize(item.text, query_classification)
+        return None, None, None, None, None
+
+    model = item.model or LLM_MODEL
+    search_hits = retrieved.hits
+    sanitized_query = retrieved.query
+    entries = [
+        (f"- {_strip_urls(text or 'Unknown info')}", hit.score)
+        for text, hit in zip(retrieved.texts, search_hits)
+    ]
+
+    # Whole memories, best first, up to the model's token budget.
+    packed = pack_context(entries, budget_for(model))
+    context_str = "\n".join(text for _, text in packed)
+    simple_sources = [
+        {
+            "memory": search_hits[idx].payload.get("memory") or "Unknown info",
+            "score": round(search_hits[idx].score, 3),
+            "classification": retrieved.classifications[idx].name,
+        }
+        for idx, _ in packed
+    ]
 
     if context_str.strip():
         system_prompt = (
@@ -99,26 +93,41 @@ def _build_context(item: UserInput, current_user, resolved_matter):
 
     messages = [
         {"role": "system", "content": system_prompt},
-        {"role": "user", "content": sanitized_query.text},
+        {"role": "user", "content": sanitized_query},
     ]
-    return messages, simple_sources, search_hits, item.model or LLM_MODEL
+    return messages, simple_sources, search_hits, model, query_vector
+
+
+async def _replay(tokens: list[str]) -> AsyncGenerator[str, None]:
+    for token in tokens:
+        yield token
 
 
-def _stream_generator(
-    messages: list[dict],
-    model: str,
+async def _stream_generator(
+    token_source: AsyncGenerator[str, None],
     sources: list,
     user_id: str,
     query_text: str,
     point_ids: str,
-) -> Generator[str, None, None]:
+    on_complete=None,
+) -> AsyncGenerator[str, None]:
+    """SSE framing for a live model stream or a cached replay.
+
+    on_complete(tokens) runs only when the stream finished without error,
+    so a half-generated answer is never cached.
+    """
+    tokens: list[str] = []
     try:
-        for token in llm.stream_chat(messages, model=model):
+        async for token in token_source:
+            tokens.append(token)
             yield _sse({"delta": token, "done": False})
+        if on_complete is not None:
+            on_complete(tokens)
     except Exception as e:
         logger.error(f"Stream generation failed: {e}")
     finally:
-        log_agent_action(
+        await asyncio.to_thread(
+            log_agent_action,
             f"user:{user_id}", "READ",
             f"query_hash={hashlib.sha256(query_text.encode()).hexdigest()}",
             resource_id=point_ids,
@@ -127,10 +136,17 @@ def _stream_generator(
 
 
 @router.post("/chat")
-def chat_with_memory(item: UserInput, current_user: User = Depends(get_current_user)):
-    resolved_matter = _resolve_matter(current_user, item.matter_id)
+async def chat_with_memory(item: UserInput, current_user: User = Depends(get_current_user)):
+    # Matter lookup is SQLite — off the event loop.
+    resolved_matter = await asyncio.to_thread(_resolve_matter, current_user, item.matter_id)
+    # Read before retrieval: a write that lands mid-generation makes put() drop the answer.
+    cache_generation = (
+        answer_cache.generation(current_user.id, resolved_matter or "") if answer_cache is not None else None
+    )
 
-    messages, sources, search_hits, model = _build_context(item, current_user, resolved_matter)
+    messages, sources, search_hits, model, query_vector = await _build_context(
+        item, current_user, resolved_matter
+    )
 
     if messages is None:
         if item.stream:
@@ -143,21 +159,38 @@ def chat_with_memory(item: UserInput, current_user: User = Depends(get_current_u
 
     point_ids = ",".join(str(h.id) for h in search_hits)
 
+    # Same user/matter/model, a near-identical question and the same retrieved
+    # memories → replay the earlier answer instead of generating again.
+    cache_scope = (current_user.id, resolved_matter or "", "chat", model, "")
+    cache_fp = fingerprint(h.id for h in search_hits)
+    cached = answer_cache.get(cache_scope, query_vector, cache_fp) if answer_cache is not None else None
+
+    def _remember(tokens: list[str]) -> None:
+        if answer_cache is not None and tokens:
+            answer_cache.put(cache_scope, query_vector, cache_fp, tokens, cache_generation)
+
     if item.stream:
+        if cached is not None:
+            token_source, on_complete = _replay(cached), None
+        else:
+            token_source, on_complete = allm.stream_chat(messages, model=model), _remember
         return StreamingResponse(
-            _stream_generator(messages, model, sources, current_user.id, item.text, point_ids),
+            _stream_generator(token_source, sources, current_user.id, item.text, point_ids, on_complete),
             media_type="text/event-stream",
             headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
         )
 
-    # Non-streaming path — unchanged behaviour.
-    from fastapi import HTTPException
-    ai_reply = llm.chat(messages=messages, model=model)
-    if ai_reply is None:
-        raise HTTPException(status_code=500, detail="LLM inference failed.")
+    if cached is not None:
+        ai_reply = "".join(cached)
+    else:
+        ai_reply = await allm.chat(messages=messages, model=model)
+        if ai_reply is None:
+            raise HTTPException(status_code=500, detail="LLM inference failed.")
+        _remember([ai_reply])
 
     query_hash = hashlib.sha256(item.text.encode()).hexdigest()
-    log_agent_action(
+    await asyncio.to_thread(
+        log_agent_action,
         f"user:{current_user.id}", "READ", f"query_hash={query_hash}",
         resource_id=point_ids,
     )
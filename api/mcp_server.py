@@ -7,6 +7,7 @@ from datetime import datetime
 from mcp.server.fastmcp import FastMCP
 from qdrant_client.http import models
 
+from core.chunking import collapse_hits
 from core.classification_engine import classify
 from core.deps import COLLECTION_NAME, client, get_embedding
 from core.matter_registry import list_matters_for_user
@@ -43,7 +44,7 @@ def memory_search(query: str, matter_id: str | None = None) -> list[dict]:
             "matter_id": hit.payload.get("matter_id", ""),
             "classification": hit.payload.get("classification", "PUBLIC"),
         }
-        for hit in result.points
+        for hit in collapse_hits(result.points)
     ]
 
 
@@ -1,23 +1,35 @@
+import asyncio
 import hashlib
+import json
 import logging
 import uuid
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from qdrant_client.http import models
 
 from agents.logger import log_agent_action
 from api.matters import _resolve_matter
 from core.auth import get_current_user
+from core.chunking import chunk_text, collapse_hits
 from core.classification_engine import classify
-from core.deps import COLLECTION_NAME, client, get_embedding
-from core.schemas import IngestResponse, UserInput, _VALID_CONTENT_TYPES
+from core.deps import COLLECTION_NAME, aget_embeddings, client, get_embedding, get_embeddings
+from core.llm_client import l2_normalize
+from core.schemas import BulkIngestResponse, IngestResponse, UserInput, _VALID_CONTENT_TYPES
 from core.user_registry import User
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+BULK_BATCH_SIZE = 64               # lines embedded / deduped / written per round-trip
+BULK_MAX_LINE_BYTES = 256 * 1024   # UserInput caps text at 50k chars; leave room for JSON + keys
+DEDUP_SCORE = 0.97                 # cosine similarity above which a new memory is a duplicate
+
+# Chunk children of long documents carry parent_id. Listings and dedup only
+# look at whole memories; legacy points have no parent_id and always match.
+_NOT_A_CHUNK = models.IsEmptyCondition(is_empty=models.PayloadField(key="parent_id"))
+
 
 @router.get("/api/memories")
 def list_memories(
@@ -36,6 +48,7 @@ def list_memories(
         must.append(models.FieldCondition(key="type", match=models.MatchValue(value=type)))
     if classification:
         must.append(models.FieldCondition(key="classification", match=models.MatchValue(value=classification)))
+    must.append(_NOT_A_CHUNK)
 
     points, next_offset = client.scroll(
         collection_name=COLLECTION_NAME,
@@ -80,7 +93,7 @@ def add_memory(item: UserInput, current_user: User = Depends(get_current_user)):
         query_vector=vector,
         query_filter=models.Filter(must=must),
         limit=1,
-        score_threshold=0.97,
+        score_threshold=DEDUP_SCORE,
     )
     if similar.points:
         return {"status": "duplicate_skipped", "id": similar.points[0].id}
@@ -106,32 +119,104 @@ def add_memory(item: UserInput, current_user: User = Depends(get_current_user)):
     return {"status": "memory_saved", "id": point_id}
 
 
+def _dedup_filter(user_id: str, content_type: str, resolved_matter: str | None) -> models.Filter:
+    must = [
+        models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id)),
+        models.FieldCondition(key="type", match=models.MatchValue(value=content_type)),
+        _NOT_A_CHUNK,
+    ]
+    if resolved_matter is not None:
+        must.append(models.FieldCondition(key="matter_id", match=models.MatchValue(value=resolved_matter)))
+    return models.Filter(must=must)
+
+
+def _ingest_point_id(user_id: str, item: UserInput, text_to_embed: str) -> str:
+    """Composite key hash for structured docs; content hash fallback for unstructured."""
+    doc_keys = item.document_keys or {}
+    primary_id = doc_keys.get("claim_number") or doc_keys.get("auth_number") or doc_keys.get("reference")
+    id_source = f"{user_id}:{primary_id}" if primary_id else f"{user_id}:{text_to_embed}"
+    content_hash = hashlib.sha256(id_source.encode()).hexdigest()
+    return str(uuid.UUID(content_hash[:32]))
+
+
+def _chunk_items(
+    parent_id: str,
+    parent_payload: dict,
+    chunks: list[str],
+    vectors: list[list[float]],
+    classification: str,
+) -> list[dict]:
+    """Child points for a chunked document — one per chunk, linked by parent_id.
+
+    Chunks inherit the parent's classification: a chunk without an SSN in it
+    still belongs to a PII document.
+    """
+    base = {k: parent_payload[k] for k in ("user_id", "matter_id", "type", "created_at")}
+    return [
+        {
+            "point_id": str(uuid.UUID(hashlib.sha256(f"{parent_id}:{i}".encode()).hexdigest()[:32])),
+            "vector": vector,
+            "payload": {
+                **base,
+                "memory": chunk,
+                "parent_id": parent_id,
+                "chunk_index": i,
+                "chunk_count": len(chunks),
+            },
+            "classification": classification,
+        }
+        for i, (chunk, vector) in enumerate(zip(chunks, vectors))
+    ]
+
+
+def _delete_chunks(user_id: str, parent_ids: list[str]) -> None:
+    """Drop existing children so a re-ingested, shorter document leaves no strays."""
+    client.delete(
+        collection_name=COLLECTION_NAME,
+        points_selector=models.FilterSelector(filter=models.Filter(must=[
+            models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id)),
+            models.FieldCondition(key="parent_id", match=models.MatchAny(any=parent_ids)),
+        ])),
+    )
+
+
+def _ingest_payload(user_id: str, item: UserInput, text_to_embed: str, resolved_matter: str | None) -> dict:
+    return {
+        "memory": item.text,
+        "embed_text": text_to_embed,
+        "user_id": user_id,
+        "matter_id": resolved_matter or "",
+        "type": item.type,
+        "created_at": item.created_at or str(datetime.now()),
+        **(item.document_keys or {}),
+    }
+
+
 @router.post("/ingest", response_model=IngestResponse)
 def ingest_file(item: UserInput, current_user: User = Depends(get_current_user)):
     resolved_matter = _resolve_matter(current_user, item.matter_id)
 
     text_to_embed = item.embed_text if item.embed_text is not None else item.text
-    vector = get_embedding(text_to_embed)
+    chunks = chunk_text(item.text)
+    if chunks:
+        # Parent vector and every chunk vector in one embedding request.
+        vectors = get_embeddings([text_to_embed, *chunks])
+        vector, chunk_vectors = (vectors[0], vectors[1:]) if vectors else (None, [])
+    else:
+        vector = get_embedding(text_to_embed)
     if not vector:
         raise HTTPException(status_code=500, detail="Embedding failed")
 
     content_type = item.type
 
-    must = [
-        models.FieldCondition(key="user_id", match=models.MatchValue(value=current_user.id)),
-        models.FieldCondition(key="type", match=models.MatchValue(value=content_type)),
-    ]
-    if resolved_matter is not None:
-        must.append(models.FieldCondition(key="matter_id", match=models.MatchValue(value=resolved_matter)))
-
     # Explicit file drops are always intentional — skip semantic dedup.
     if content_type != "file_ingest":
         similar = client.search(
             collection_name=COLLECTION_NAME,
             query_vector=vector,
-            query_filter=models.Filter(must=must),
+            query_filter=_dedup_filter(current_user.id, content_type, resolved_matter),
             limit=1,
-            score_threshold=0.97,
+            score_threshold=DEDUP_SCORE,
         )
         if similar.points:
             return {
@@ -140,33 +225,246 @@ def ingest_file(item: UserInput, current_user: User = Depends(get_current_user))
                 "score": similar.points[0].score,
             }
 
-    # Composite key hash for structured docs; content hash fallback for unstructured.
-    doc_keys = item.document_keys or {}
-    primary_id = doc_keys.get("claim_number") or doc_keys.get("auth_number") or doc_keys.get("reference")
-    id_source = f"{current_user.id}:{primary_id}" if primary_id else f"{current_user.id}:{text_to_embed}"
-    content_hash = hashlib.sha256(id_source.encode()).hexdigest()
-    point_id = str(uuid.UUID(content_hash[:32]))
+    point_id = _ingest_point_id(current_user.id, item, text_to_embed)
+    payload = _ingest_payload(current_user.id, item, text_to_embed, resolved_matter)
 
     data_classification = classify(item.text)
     client.write(
         collection_name=COLLECTION_NAME,
         point_id=point_id,
         vector=vector,
-        payload={
-            "memory": item.text,
-            "embed_text": text_to_embed,
-            "user_id": current_user.id,
-            "matter_id": resolved_matter or "",
-            "type": content_type,
-            "created_at": item.created_at or str(datetime.now()),
-            **doc_keys,
-        },
+        payload=payload,
         classification=data_classification.name,
     )
+    # Even when the text no longer needs chunks: a re-ingest under the same
+    # point_id must not leave the previous version's chunks behind.
+    _delete_chunks(current_user.id, [point_id])
+    if chunks:
+        statuses = client.write_many(
+            COLLECTION_NAME,
+            _chunk_items(point_id, payload, chunks, chunk_vectors, data_classification.name),
+            wait=True,
+        )
+        errors = [status.get("error", "") for status in statuses if status["status"] == "error"]
+        if errors:
+            # The parent alone is unreachable through chunk search — fail loudly.
+            logger.error(f"Chunk write failed for {point_id}: {errors[0]}")
+            raise HTTPException(status_code=500, detail="Chunk write failed")
     log_agent_action(f"user:{current_user.id}", "WRITE", f"type={content_type}", resource_id=point_id)
     return {"status": "raw_data_saved", "id": point_id}
 
 
+def _plan_batch_writes(pending, vectors, chunks, chunk_vectors, results: dict, user_id: str):
+    """Payloads, classifications and in-batch dedup for the lines that survived search dedup.
+
+    Qdrant cannot see the batch's own points yet, so a line is also checked
+    against the earlier lines kept in this batch, with the same filter and
+    DEDUP_SCORE as the dedup search — what sequential /ingest calls would do.
+    A line that reuses an earlier line's point_id without being a duplicate
+    of it is an update: only the last version is written, as it would be
+    after sequential calls. Records duplicates in results; returns
+    (to_write, owners, written_lines, parents), owners being the parent
+    point id of each to_write item.
+    """
+    planned: dict[str, list[dict]] = {}              # parent point id → its point + chunks
+    written_lines: dict[int, tuple[str, str]] = {}   # line → (content type, parent point id)
+    kept: dict[str, tuple[str, str, list[float]]] = {}   # point id → (type, matter, unit vector)
+    for i, (line_no, item, resolved, text_to_embed) in enumerate(pending):
+        if line_no in results:
+            continue
+        point_id = _ingest_point_id(user_id, item, text_to_embed)
+        # Explicit file drops are always intentional — skip semantic dedup.
+        if item.type != "file_ingest":
+            unit = l2_normalize(vectors[i])
+            for kept_id, (kept_type, kept_matter, kept_unit) in kept.items():
+                if kept_type != item.type or (resolved is not None and kept_matter != resolved):
+                    continue
+                score = sum(a * b for a, b in zip(unit, kept_unit))
+                if score >= DEDUP_SCORE:
+                    results[line_no] = {
+                        "line": line_no, "status": "duplicate_skipped", "id": kept_id, "score": score,
+                    }
+                    break
+            if line_no in results:
+                continue
+        # Re-inserting moves an overwritten id to the end, and drops the old
+        # version's vector from later lines' dedup.
+        kept.pop(point_id, None)
+        planned.pop(point_id, None)
+        if item.type != "file_ingest":
+            kept[point_id] = (item.type, resolved or "", unit)
+        payload = _ingest_payload(user_id, item, text_to_embed, resolved)
+        classification = classify(item.text).name
+        items = [{"point_id": point_id, "vector": vectors[i], "payload": payload, "classification": classification}]
+        if chunks[i]:
+            items += _chunk_items(point_id, payload, chunks[i], chunk_vectors[i], classification)
+        planned[point_id] = items
+        written_lines[line_no] = (item.type, point_id)
+    to_write = [point for items in planned.values() for point in items]
+    owners = [point_id for point_id, items in planned.items() for _ in items]
+    return to_write, owners, written_lines, list(planned)
+
+
+async def _ingest_batch(
+    batch: list[tuple[int, bytes]],
+    current_user: User,
+    matter_cache: dict,
+) -> list[dict]:
+    """Run one batch of NDJSON lines through the /ingest pipeline.
+
+    Same per-item semantics as ingest_file, but the dedup searches and the
+    encrypted upsert each go out as a single request for the whole batch, and
+    embeddings in EMBED_MAX_BATCH-sized requests.
+    """
+    results: dict[int, dict] = {}
+    pending: list[tuple[int, UserInput, str | None, str]] = []
+
+    for line_no, raw in batch:
+        try:
+            item = UserInput.model_validate(json.loads(raw))
+        except ValueError as e:
+            results[line_no] = {"line": line_no, "status": "error", "error": f"invalid line: {e}"}
+            continue
+
+        if item.matter_id not in matter_cache:
+            try:
+                matter_cache[item.matter_id] = await asyncio.to_thread(
+                    _resolve_matter, current_user, item.matter_id
+                )
+            except HTTPException as e:
+                matter_cache[item.matter_id] = e
+        resolved = matter_cache[item.matter_id]
+        if isinstance(resolved, HTTPException):
+            results[line_no] = {"line": line_no, "status": "error", "error": resolved.detail}
+            continue
+
+        text_to_embed = item.embed_text if item.embed_text is not None else item.text
+        pending.append((line_no, item, resolved, text_to_embed))
+
+    # Every parent text and every chunk in the batch, EMBED_MAX_BATCH per request.
+    chunks = await asyncio.to_thread(lambda: [chunk_text(item.text) for _, item, _, _ in pending])
+    texts = [t for (*_, text), cs in zip(pending, chunks) for t in (text, *cs)]
+    flat = await aget_embeddings(texts) if pending else []
+    if flat is None:
+        for line_no, *_ in pending:
+            results[line_no] = {"line": line_no, "status": "error", "error": "Embedding failed"}
+        pending, flat = [], []
+    vectors, chunk_vectors, pos = [], [], 0
+    for cs in chunks[:len(pending)]:
+        vectors.append(flat[pos])
+        chunk_vectors.append(flat[pos + 1:pos + 1 + len(cs)])
+        pos += 1 + len(cs)
+
+    # Explicit file drops are always intentional — skip semantic dedup.
+    dedup_idx = [i for i, (_, item, _, _) in enumerate(pending) if item.type != "file_ingest"]
+    if dedup_idx:
+        responses = await asyncio.to_thread(
+            client.search_many,
+            COLLECTION_NAME,
+            [
+                (vectors[i], _dedup_filter(current_user.id, pending[i][1].type, pending[i][2]))
+                for i in dedup_idx
+            ],
+            limit=1,
+            score_threshold=DEDUP_SCORE,
+            with_payload=False,
+        )
+        for i, response in zip(dedup_idx, responses):
+            if response.points:
+                line_no = pending[i][0]
+                hit = response.points[0]
+                results[line_no] = {
+                    "line": line_no, "status": "duplicate_skipped", "id": str(hit.id), "score": hit.score,
+                }
+
+    # Classifying up to BULK_BATCH_SIZE 50k-character texts is CPU work — keep it off the loop.
+    to_write, owners, written_lines, parents = await asyncio.to_thread(
+        _plan_batch_writes, pending, vectors, chunks, chunk_vectors, results, current_user.id
+    )
+
+    if to_write:
+        # Every overwritten parent loses its old chunks, chunked now or not.
+        await asyncio.to_thread(_delete_chunks, current_user.id, parents)
+        # wait=True: the next batch's dedup search must see these points.
+        statuses = await asyncio.to_thread(client.write_many, COLLECTION_NAME, to_write, wait=True)
+        failed: dict[str, str] = {}
+        for parent_id, status in zip(owners, statuses):
+            if status["status"] == "error":
+                failed.setdefault(parent_id, status.get("error", ""))
+        audited = []
+        for line_no, (content_type, point_id) in written_lines.items():
+            if point_id in failed:
+                results[line_no] = {"line": line_no, "status": "error", "error": failed[point_id]}
+            else:
+                results[line_no] = {"line": line_no, "status": "raw_data_saved", "id": point_id}
+                audited.append((content_type, point_id))
+
+        def _audit():
+            for content_type, point_id in audited:
+                log_agent_action(f"user:{current_user.id}", "WRITE", f"type={content_type}", resource_id=point_id)
+        await asyncio.to_thread(_audit)
+
+    return [results[line_no] for line_no, _ in batch]
+
+
+@router.post("/api/ingest/bulk", response_model=BulkIngestResponse)
+async def ingest_bulk(request: Request, current_user: User = Depends(get_current_user)):
+    """Ingest an NDJSON body — one UserInput JSON object per line.
+
+    The body is consumed as a stream and processed BULK_BATCH_SIZE lines at a
+    time, so archives of any size never sit in memory whole. Returns one
+    result per non-blank line (1-based line numbers), in input order.
+    """
+    results: list[dict] = []
+    matter_cache: dict = {}
+    batch: list[tuple[int, bytes]] = []
+    buffer = b""
+    line_no = 0
+    oversized = False
+
+    async def take(raw: bytes) -> None:
+        nonlocal batch, line_no
+        line_no += 1
+        if not raw.strip():
+            return
+        batch.append((line_no, raw))
+        if len(batch) >= BULK_BATCH_SIZE:
+            results.extend(await _ingest_batch(batch, current_user, matter_cache))
+            batch = []
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            if oversized:
+                # Tail of a line that already blew the size cap.
+                oversized = False
+                line_no += 1
+                results.append({"line": line_no, "status": "error", "error": "line too long"})
+                continue
+            if len(raw) > BULK_MAX_LINE_BYTES:
+                line_no += 1
+                results.append({"line": line_no, "status": "error", "error": "line too long"})
+                continue
+            await take(raw)
+        if len(buffer) > BULK_MAX_LINE_BYTES:
+            oversized, buffer = True, b""
+
+    if oversized:
+        line_no += 1
+        results.append({"line": line_no, "status": "error", "error": "line too long"})
+    elif buffer.strip():
+        await take(buffer)
+    if batch:
+        results.extend(await _ingest_batch(batch, current_user, matter_cache))
+
+    results.sort(key=lambda r: r["line"])
+    counts: dict[str, int] = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return {"results": results, "counts": counts}
+
+
 @router.delete("/api/memory/{point_id}")
 def delete_memory_by_id(
     point_id: str,
@@ -195,9 +493,16 @@ def delete_memory_by_id(
     if payload.get("user_id") != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied.")
 
+    # The point and any chunk children of it, in one request.
     client.delete(
         collection_name=COLLECTION_NAME,
-        points_selector=models.PointIdsList(points=[point_id]),
+        points_selector=models.FilterSelector(filter=models.Filter(
+            must=[models.FieldCondition(key="user_id", match=models.MatchValue(value=current_user.id))],
+            should=[
+                models.HasIdCondition(has_id=[point_id]),
+                models.FieldCondition(key="parent_id", match=models.MatchValue(value=point_id)),
+            ],
+        )),
     )
 
     payload_hash = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
@@ -264,7 +569,7 @@ def search_memory(
     )
     results = [
         {"memory": h.payload.get("memory", ""), "score": round(h.score, 3)}
-        for h in hits.points
+        for h in collapse_hits(hits.points)
     ]
     query_hash = hashlib.sha256(query.encode()).hexdigest()
     log_agent_action(f"user:{current_user.id}", "READ", f"query_hash={query_hash}")
@@ -296,7 +601,7 @@ def unified_search(
                 limit=n_results,
                 score_threshold=0.45,
             )
-            for hit in hits.points:
+            for hit in collapse_hits(hits.points):
                 results.append({
                     "source": "personal_memory",
                     "content": hit.payload.get("memory", ""),
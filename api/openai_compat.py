@@ -1,20 +1,22 @@
+import hashlib
 import json
 import logging
 import os
 import time
 import uuid
-from typing import Generator
+from typing import AsyncGenerator
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Security
 from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
-from qdrant_client.http import models
 
+from core.answer_cache import fingerprint
 from core.auth import LOCAL_USER_ID
-from core.classification_engine import classify
-from core.deps import COLLECTION_NAME, LLM_MODEL, client, get_embedding, llm
-from core.sanitizer import sanitize
+from core.context_packer import budget_for, pack_context
+from core.deps import LLM_MODEL, aget_embedding, aget_embeddings, allm, answer_cache
+from core.llm_client import l2_normalize
+from core.retrieval import retrieve_context
 from core.user_registry import User, get_user_by_key
 
 logger = logging.getLogger(__name__)
@@ -23,8 +25,6 @@ router = APIRouter()
 _bearer_scheme = HTTPBearer(auto_error=False)
 _api_key_scheme = APIKeyHeader(name="X-API-Key", auto_error=False)
 
-MAX_CONTEXT_CHARS = 3000
-
 
 def _get_openai_user(
     bearer: HTTPAuthorizationCredentials | None = Security(_bearer_scheme),
@@ -79,42 +79,35 @@ def _chunk(chat_id: str, model: str, delta: dict, finish_reason: str | None = No
     return f"data: {json.dumps(payload)}\n\n"
 
 
-def _build_rag_messages(
+async def _build_rag_messages(
     messages: list[CompletionMessage],
     user_id: str,
     matter_id: str | None,
-) -> list[dict]:
+    model: str | None = None,
+) -> tuple[list[dict], list[float] | None, list[str] | None]:
     """Retrieve relevant memories and inject them into the message list.
 
+    The memory block is packed to the token budget of the model answering.
+    Returns (messages, query_vector, retrieved point ids) — the last two are
+    None when retrieval did not run, which also makes the answer uncacheable.
+
     Returns the original messages unchanged if embedding or search fails —
     the LLM is still called without context rather than raising an error.
     """
     query = next((m.content for m in reversed(messages) if m.role == "user"), None)
     context_str = ""
+    vector = None
+    hit_ids = None
 
     if query:
-        vector = get_embedding(query)
+        vector = await aget_embedding(query)
         if vector:
             try:
-                must = [models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id))]
-                if matter_id:
-                    must.append(models.FieldCondition(
-                        key="matter_id", match=models.MatchValue(value=matter_id)
-                    ))
-                result = client.search(
-                    collection_name=COLLECTION_NAME,
-                    query_vector=vector,
-                    query_filter=models.Filter(must=must),
-                    limit=5,
-                    score_threshold=0.45,
-                )
-                lines = []
-                for hit in result.points:
-                    mem = hit.payload.get("memory", "")
-                    clf = classify(mem)
-                    sanitized = sanitize(mem, clf)
-                    lines.append(f"- {sanitized.text}")
-                context_str = "\n".join(lines)[:MAX_CONTEXT_CHARS]
+                retrieved = await retrieve_context(vector, user_id, matter_id, limit=5)
+                hit_ids = [str(h.id) for h in retrieved.hits]
+                entries = [(f"- {text}", hit.score) for text, hit in zip(retrieved.texts, retrieved.hits)]
+                packed = pack_context(entries, budget_for(model))
+                context_str = "\n".join(text for _, text in packed)
             except Exception as e:
                 logger.warning(f"RAG retrieval failed (non-fatal): {e}")
 
@@ -131,31 +124,65 @@ def _build_rag_messages(
         else:
             augmented.insert(0, {"role": "system", "content": memory_block})
 
-    return augmented
+    return augmented, (vector if hit_ids is not None else None), hit_ids
+
+
+def _conversation_hash(messages: list[CompletionMessage]) -> str:
+    """Hash of everything except the final user turn — the cache scope for /v1.
+
+    The final user turn is matched semantically; the rest of the conversation
+    (system prompt, earlier turns) must match exactly.
+    """
+    last_user = max((i for i, m in enumerate(messages) if m.role == "user"), default=-1)
+    rest = [[m.role, m.content] for i, m in enumerate(messages) if i != last_user]
+    return hashlib.sha256(json.dumps(rest).encode()).hexdigest()
 
 
 # ── Endpoints ─────────────────────────────────────────────────────────────────
 
 @router.post("/v1/chat/completions")
-def chat_completions(
+async def chat_completions(
     request: Request,
     item: CompletionRequest,
     current_user: User = Depends(_get_openai_user),
 ):
     model = item.model or LLM_MODEL
     matter_id = request.headers.get("X-Matter-ID")
-    augmented = _build_rag_messages(item.messages, current_user.id, matter_id)
+    # Read before retrieval: a write that lands mid-generation makes put() drop the answer.
+    cache_generation = (
+        answer_cache.generation(current_user.id, matter_id or "") if answer_cache is not None else None
+    )
+    augmented, query_vector, hit_ids = await _build_rag_messages(
+        item.messages, current_user.id, matter_id, model
+    )
+
+    cached = None
+    if answer_cache is not None and hit_ids is not None:
+        cache_scope = (current_user.id, matter_id or "", "v1", model, _conversation_hash(item.messages))
+        cache_fp = fingerprint(hit_ids)
+        cached = answer_cache.get(cache_scope, query_vector, cache_fp)
+
+    def _remember(tokens: list[str]) -> None:
+        if answer_cache is not None and hit_ids is not None and tokens:
+            answer_cache.put(cache_scope, query_vector, cache_fp, tokens, cache_generation)
 
     if item.stream:
         chat_id = _chat_id()
 
-        def _stream() -> Generator[str, None, None]:
+        async def _stream() -> AsyncGenerator[str, None]:
             yield _chunk(chat_id, model, {"role": "assistant", "content": ""})
-            try:
-                for token in llm.stream_chat(augmented, model=model):
+            if cached is not None:
+                for token in cached:
                     yield _chunk(chat_id, model, {"content": token})
-            except Exception as e:
-                logger.error(f"Stream error: {e}")
+            else:
+                tokens = []
+                try:
+                    async for token in allm.stream_chat(augmented, model=model):
+                        tokens.append(token)
+                        yield _chunk(chat_id, model, {"content": token})
+                    _remember(tokens)
+                except Exception as e:
+                    logger.error(f"Stream error: {e}")
             yield _chunk(chat_id, model, {}, finish_reason="stop")
             yield "data: [DONE]\n\n"
 
@@ -165,9 +192,13 @@ def chat_completions(
             headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
         )
 
-    reply = llm.chat(messages=augmented, model=model)
-    if reply is None:
-        raise HTTPException(status_code=500, detail="LLM inference failed.")
+    if cached is not None:
+        reply = "".join(cached)
+    else:
+        reply = await allm.chat(messages=augmented, model=model)
+        if reply is None:
+            raise HTTPException(status_code=500, detail="LLM inference failed.")
+        _remember([reply])
 
     return {
         "id": _chat_id(),
@@ -184,17 +215,24 @@ def chat_completions(
 
 
 @router.post("/v1/embeddings")
-def embeddings(
+async def embeddings(
     item: EmbeddingRequest,
     current_user: User = Depends(_get_openai_user),
 ):
-    inputs = [item.input] if isinstance(item.input, str) else item.input
-    data = []
-    for i, text in enumerate(inputs):
-        vector = get_embedding(text)
+    if isinstance(item.input, str):
+        vector = await aget_embedding(item.input)
         if vector is None:
-            raise HTTPException(status_code=500, detail=f"Embedding failed for input at index {i}.")
-        data.append({"object": "embedding", "embedding": vector, "index": i})
+            raise HTTPException(status_code=500, detail="Embedding failed for input at index 0.")
+        vectors = [vector]
+    else:
+        vectors = await aget_embeddings(item.input)
+        if vectors is None:
+            raise HTTPException(status_code=500, detail="Batch embedding failed.")
+    # Unit length on both paths — cached vectors may predate normalization in embed().
+    data = [
+        {"object": "embedding", "embedding": l2_normalize(vector), "index": i}
+        for i, vector in enumerate(vectors)
+    ]
 
     return {
         "object": "list",
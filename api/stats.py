@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+
+from core.auth import require_admin
+from core.deps import answer_cache, embedding_cache
+from core.user_registry import User
+
+router = APIRouter()
+
+
+@router.get("/api/stats")
+def runtime_stats(_admin: User = Depends(require_admin)):
+    """In-process cache counters for capacity planning."""
+    return {
+        "embedding_cache": embedding_cache.stats() if embedding_cache is not None else None,
+        "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+    }
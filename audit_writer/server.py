@@ -0,0 +1,174 @@
+"""
+audit_writer/server.py — Sole writer of the tamper-evident audit log.
+
+Runs in direct mode (AUDIT_SOCKET_PATH unset, AUDIT_HMAC_SECRET set) and
+serves every other container over a Unix socket at AUDIT_LISTEN_PATH.
+
+Protocol (see agents/logger.py): each request and reply is a 4-byte
+big-endian length followed by a JSON object. Connections are persistent and
+requests may be pipelined — replies are sent in request order.
+
+    {"type": "log", "agent_name", "action_type", "details",
+     "resource_id", "matter_id"}                → {"ok": true}
+    {"type": "log_batch", "entries": [...]}     → {"ok": true, "count": N}
+    {"type": "recent", "limit": N}              → {"logs": [[ts, actor, action, details], ...]}
+    {"type": "verify", "full": bool}            → verify_audit_chain() result
+    {"type": "query", "filters", "before_id", "limit", "archived"}
+                                                → see agents.logger.query_logs
+    {"type": "merkle_root" | "merkle_inclusion" | "merkle_consistency", ...}
+                                                → see agents.logger.merkle_query_direct
+
+Log requests from all connections feed the logger's group-commit queue, so
+concurrent writers share one transaction; a log reply is only sent after its
+entries are committed. Timestamps are stamped here, not by clients.
+
+A request beginning with "{" instead of a length header is the legacy
+one-shot protocol (raw JSON, then EOF) and gets one raw JSON reply.
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import logger as audit  # noqa: E402
+
+log = logging.getLogger("audit_writer")
+
+LISTEN_PATH = os.getenv("AUDIT_LISTEN_PATH", "/tmp/audit/audit.sock")
+_MAX_IN_FLIGHT = 256   # pipelined requests per connection awaiting a reply
+
+
+def _entry(msg: dict) -> dict:
+    return audit.build_entry(
+        str(msg.get("agent_name", "")),
+        str(msg.get("action_type", "")),
+        str(msg.get("details", "")),
+        str(msg.get("resource_id", "")),
+        str(msg.get("matter_id", "")),
+    )
+
+
+async def _append(entries: list[dict]) -> None:
+    # Enqueued on the loop thread before the first await, so requests keep their
+    # arrival order in the chain. A full queue blocks the loop — that is the
+    # backpressure: no more requests are read until the writer catches up.
+    await asyncio.wrap_future(audit.enqueue_entries(entries))
+
+
+async def _after_queued_writes() -> None:
+    """Reads wait for every write received before them (read-your-writes)."""
+    await asyncio.wrap_future(audit.enqueue_entries([]))
+
+
+async def dispatch(msg: dict) -> dict:
+    """Handle one request. Never raises — errors become {"error": ...} replies."""
+    kind = None
+    try:
+        if not isinstance(msg, dict):
+            return {"error": "request must be a JSON object"}
+        kind = msg.get("type")
+        if kind == "log":
+            await _append([_entry(msg)])
+            return {"ok": True}
+        if kind == "log_batch":
+            entries = [_entry(m) for m in msg.get("entries", [])]
+            await _append(entries)
+            return {"ok": True, "count": len(entries)}
+        if kind == "recent":
+            await _after_queued_writes()
+            rows = await asyncio.to_thread(audit.read_recent_logs, int(msg.get("limit", 20)))
+            return {"logs": [list(r) for r in rows]}
+        if kind == "query":
+            await _after_queued_writes()
+            return await asyncio.to_thread(audit.query_logs_direct, msg)
+        if kind == "verify":
+            await _after_queued_writes()
+            return await asyncio.to_thread(audit.verify_chain_direct, bool(msg.get("full")))
+        if kind in ("merkle_root", "merkle_inclusion", "merkle_consistency"):
+            await _after_queued_writes()
+            return await asyncio.to_thread(audit.merkle_query_direct, msg)
+        return {"error": f"unknown request type: {kind!r}"}
+    except Exception as e:
+        log.error("audit request %r failed: %s", kind, e)
+        return {"error": str(e)}
+
+
+async def _send_replies(replies: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+    connected = True
+    while (task := await replies.get()) is not None:
+        reply = await task   # awaited even if the client is gone, so its writes land
+        if not connected:
+            continue
+        try:
+            writer.write(audit.encode_frame(reply))
+            await writer.drain()
+        except ConnectionError:
+            connected = False
+
+
+async def _handle_legacy(first: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        msg = json.loads(first + await reader.read())
+    except ValueError:
+        msg = {"type": None}
+    reply = await dispatch(msg)
+    writer.write(json.dumps(reply).encode())
+    await writer.drain()
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    replies: asyncio.Queue = asyncio.Queue(maxsize=_MAX_IN_FLIGHT)
+    sender: asyncio.Task | None = None
+    try:
+        first = await reader.readexactly(1)
+        if first == b"{":
+            await _handle_legacy(first, reader, writer)
+            return
+        sender = asyncio.create_task(_send_replies(replies, writer))
+        header = first + await reader.readexactly(3)
+        while True:
+            (size,) = audit.FRAME_HEADER.unpack(header)
+            if size > audit.MAX_FRAME_BYTES:
+                log.warning("dropping connection: %d-byte frame", size)
+                break
+            body = await reader.readexactly(size)
+            try:
+                msg = json.loads(body)
+            except ValueError:
+                msg = {"type": None}
+            await replies.put(asyncio.create_task(dispatch(msg)))
+            header = await reader.readexactly(4)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass  # client closed the connection
+    finally:
+        if sender is not None:
+            await replies.put(None)
+            await sender
+        writer.close()
+
+
+async def serve(path: str = LISTEN_PATH) -> None:
+    if os.path.exists(path):
+        os.unlink(path)   # stale socket from a previous run
+    server = await asyncio.start_unix_server(handle_connection, path=path)
+    os.chmod(path, 0o660)
+    log.info("audit_writer listening on %s (db: %s)", path, audit.DB_PATH)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    if audit.AUDIT_SOCKET_PATH:
+        raise SystemExit("audit_writer must run with AUDIT_SOCKET_PATH unset (direct mode).")
+    try:
+        asyncio.run(serve())
+    finally:
+        audit.flush_audit_log()
+
+
+if __name__ == "__main__":
+    main()
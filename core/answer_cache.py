@@ -0,0 +1,177 @@
+"""
+core/answer_cache.py — Semantic cache of generated chat answers.
+
+A full Llama generation is by far the most expensive step of /chat. When
+the same user asks a near-identical question against an unchanged memory
+set, the previous answer is replayed instead.
+
+An entry matches only when all three hold:
+    1. Same scope — (user_id, matter_id, endpoint kind, model, conversation
+       hash). Users never share entries, and a matter-scoped question never
+       reuses an unscoped answer.
+    2. The query embedding is within `threshold` cosine similarity of the
+       cached query.
+    3. Retrieval returned exactly the same point IDs (the fingerprint) —
+       an answer built from different memories is a different answer.
+
+Answers are Fernet-encrypted in memory with the vault key and expire after
+`ttl_seconds`. EncryptedMemoryClient mutation hooks call invalidate()
+whenever a write or delete touches a user/matter, so an edited memory is
+never answered from stale text even when its point ID is unchanged.
+
+A generation that was already running when invalidate() fired would put()
+an answer built from the old memories after the purge. Each user/matter
+therefore has a generation number, bumped by invalidate(); callers read it
+before retrieval and pass it to put(), which drops the answer if it moved.
+
+Usage:
+    generation = answer_cache.generation(user_id, matter_id or "")
+    ...retrieve...
+    scope = (user_id, matter_id or "", "chat", model, "")
+    tokens = answer_cache.get(scope, query_vector, fingerprint(point_ids))
+    if tokens is None:
+        ...generate...
+        answer_cache.put(scope, query_vector, fingerprint(point_ids), tokens, generation)
+"""
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from cryptography.fernet import Fernet, InvalidToken
+
+
+def fingerprint(point_ids) -> str:
+    """Order-independent hash of the retrieved point IDs."""
+    return hashlib.sha256("\n".join(sorted(str(p) for p in point_ids)).encode()).hexdigest()
+
+
+def _normalise(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class AnswerCache:
+    """Per-scope list of (query vector, fingerprint, encrypted tokens). Thread-safe."""
+
+    def __init__(
+        self,
+        key: bytes,
+        threshold: float = 0.97,
+        ttl_seconds: float = 3600,
+        max_scopes: int = 1024,
+        max_per_scope: int = 32,
+    ) -> None:
+        self._fernet = Fernet(key)
+        self._threshold = threshold
+        self._ttl = ttl_seconds
+        self._max_scopes = max_scopes
+        self._max_per_scope = max_per_scope
+        self._scopes: OrderedDict[tuple, list[tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0, "stale_puts": 0}
+        # Invalidation counts, combined by _generation(): everything, a whole
+        # user, any part of a user, one (user, matter).
+        self._epoch = 0
+        self._user_gen: Counter = Counter()
+        self._user_any_gen: Counter = Counter()
+        self._matter_gen: Counter = Counter()
+
+    def _generation(self, user_id: str, matter_id: str) -> int:
+        # Mirrors invalidate(): unscoped ("") scopes go stale on any
+        # invalidation of their user, matter scopes only on their own matter's.
+        if not matter_id:
+            return self._epoch + self._user_any_gen[user_id]
+        return self._epoch + self._user_gen[user_id] + self._matter_gen[(user_id, matter_id)]
+
+    def generation(self, user_id: str, matter_id: str) -> int:
+        """Current generation of (user_id, matter_id) scopes — read before retrieval, pass to put()."""
+        with self._lock:
+            return self._generation(user_id, matter_id)
+
+    def get(self, scope: tuple, query_vector: list[float], fp: str) -> list[str] | None:
+        """Return the cached answer tokens for a matching query, or None."""
+        query = _normalise(query_vector)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if entries:
+                entries[:] = [e for e in entries if now - e[3] < self._ttl]
+                best, best_sim = None, self._threshold
+                for vector, entry_fp, blob, _ in entries:
+                    if entry_fp != fp:
+                        continue
+                    sim = sum(a * b for a, b in zip(query, vector))
+                    if sim >= best_sim:
+                        best, best_sim = blob, sim
+                if best is not None:
+                    try:
+                        tokens = json.loads(self._fernet.decrypt(best))
+                    except InvalidToken:
+                        tokens = None
+                    if tokens is not None:
+                        self._scopes.move_to_end(scope)
+                        self._counters["hits"] += 1
+                        return tokens
+            self._counters["misses"] += 1
+            return None
+
+    def put(
+        self,
+        scope: tuple,
+        query_vector: list[float],
+        fp: str,
+        tokens: list[str],
+        generation: int | None = None,
+    ) -> None:
+        """Store an answer, unless scope was invalidated since `generation` was read."""
+        blob = self._fernet.encrypt(json.dumps(tokens).encode())
+        with self._lock:
+            if generation is not None and generation != self._generation(scope[0], scope[1]):
+                self._counters["stale_puts"] += 1
+                return
+            entries = self._scopes.setdefault(scope, [])
+            entries.append((_normalise(query_vector), fp, blob, time.monotonic()))
+            del entries[:-self._max_per_scope]
+            self._scopes.move_to_end(scope)
+            while len(self._scopes) > self._max_scopes:
+                self._scopes.popitem(last=False)
+
+    def invalidate(self, user_id: str | None = None, matter_id: str | None = None) -> None:
+        """Drop entries a mutation may have made stale.
+
+        user_id None   → everything (scope of the mutation unknown).
+        matter_id None → every scope of that user.
+        Otherwise that matter's scopes plus the user's unscoped ones, which
+        search across all of the user's memories.
+        """
+        with self._lock:
+            if user_id is None:
+                self._epoch += 1
+            elif matter_id is None:
+                self._user_gen[user_id] += 1
+                self._user_any_gen[user_id] += 1
+            else:
+                self._matter_gen[(user_id, matter_id)] += 1
+                self._user_any_gen[user_id] += 1
+            if user_id is None:
+                doomed = list(self._scopes)
+            else:
+                doomed = [
+                    s for s in self._scopes
+                    if s[0] == user_id and (matter_id is None or s[1] in (matter_id, ""))
+                ]
+            for scope in doomed:
+                del self._scopes[scope]
+            self._counters["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["scopes"] = len(self._scopes)
+            counters["entries"] = sum(len(e) for e in self._scopes.values())
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        return counters
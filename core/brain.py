@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
@@ -7,7 +8,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from core.auth import LOCAL_USER_ID
-from core.deps import client  # noqa: F401 — re-exported so test patches on core.brain.client still resolve
+from core.collection_manager import ensure_collections
+from core.deps import client  # also re-exported so test patches on core.brain.client still resolve
+from core.network_gateway import async_gateway, gateway
 from core.user_registry import bootstrap_admin
 from core.matter_registry import bootstrap_default_matter
 
@@ -23,6 +26,7 @@ from api.knowledge import router as knowledge_router
 from api.memory import router as memory_router
 from api.chat import router as chat_router
 from api.openai_compat import router as openai_router
+from api.stats import router as stats_router
 from api.mcp_server import mcp
 from core.scheduler import load_agent_definitions
 
@@ -34,12 +38,16 @@ _scheduler = AsyncIOScheduler()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await asyncio.to_thread(ensure_collections, client._qdrant)
     n = load_agent_definitions(_scheduler)
     _scheduler.start()
     logger.info("APScheduler started: %d agent(s) registered from YAML definitions", n)
     yield
     _scheduler.shutdown(wait=False)
     logger.info("APScheduler stopped.")
+    gateway.close()
+    await async_gateway.aclose()
+    await asyncio.to_thread(client.close)
 
 
 app = FastAPI(title="Engram OS Brain", docs_url=None, redoc_url=None, lifespan=lifespan)
@@ -76,6 +84,7 @@ app.include_router(knowledge_router)
 app.include_router(memory_router)
 app.include_router(chat_router)
 app.include_router(openai_router)
+app.include_router(stats_router)
 
 app.mount("/mcp", mcp.sse_app())
 
@@ -0,0 +1,123 @@
+"""
+core/chunking.py — Token-aware chunking for long documents.
+
+nomic-embed-text silently truncates its input, so a 50k-character PDF
+embedded as one vector is only searchable by its first page. Long texts are
+split into overlapping chunks; each chunk is stored as a child point that
+carries its parent's id, and retrieval folds child hits back into one entry
+per parent document.
+
+Token counts come from a local estimator (no model round-trip): words are
+split into pieces of at most 4 characters and each punctuation mark counts
+as one token. That tracks BPE/WordPiece counts for English prose closely and
+errs on the high side, which is the safe side for a context limit.
+
+Usage:
+    from core.chunking import chunk_text, collapse_hits
+
+    chunks = chunk_text(document)           # [] when the text fits in one
+    hits = collapse_hits(search_response.points)
+"""
+import os
+import re
+from types import SimpleNamespace
+
+CHUNK_TOKENS = int(os.getenv("INGEST_CHUNK_TOKENS", "400"))
+CHUNK_OVERLAP = int(os.getenv("INGEST_CHUNK_OVERLAP", "60"))
+
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+_SENTENCE_END = re.compile(r"[.!?;:]$")
+
+# When choosing where a chunk ends, look back at most this fraction of the
+# window for a sentence boundary before falling back to a hard cut.
+_BOUNDARY_LOOKBACK = 0.25
+
+# Payload fields a collapsed hit does not take from its parent / best hit:
+# chunk bookkeeping, the memory it rebuilds from chunks, and the parent's
+# embed_text (the whole document's retrieval text, not these chunks').
+_NOT_INHERITED = frozenset({"chunk_index", "chunk_count", "parent_id", "memory", "embed_text"})
+
+
+def token_spans(text: str) -> list[tuple[int, int]]:
+    """(start, end) character offsets of each estimated token."""
+    return [m.span() for m in _TOKEN_RE.finditer(text)]
+
+
+def count_tokens(text: str) -> int:
+    return sum(1 for _ in _TOKEN_RE.finditer(text))
+
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP) -> list[str]:
+    """Split text into overlapping chunks of at most max_tokens tokens.
+
+    Returns [] when the text already fits — callers store it as a single
+    point, exactly as before chunking existed. Chunk ends snap back to a
+    sentence boundary when one is close, so chunks rarely cut mid-sentence.
+    """
+    spans = token_spans(text)
+    if len(spans) <= max_tokens:
+        return []
+    overlap = min(overlap, max_tokens // 2)
+
+    chunks = []
+    start = 0
+    while start < len(spans):
+        end = min(start + max_tokens, len(spans))
+        if end < len(spans):
+            floor = end - int(max_tokens * _BOUNDARY_LOOKBACK)
+            for i in range(end - 1, max(floor, start + overlap), -1):
+                if _SENTENCE_END.search(text[spans[i][0]:spans[i][1]]):
+                    end = i + 1
+                    break
+        chunks.append(text[spans[start][0]:spans[end - 1][1]])
+        if end >= len(spans):
+            break
+        start = end - overlap
+    return chunks
+
+
+def collapse_hits(hits: list) -> list:
+    """Fold chunk hits into one hit per parent document, keeping score order.
+
+    A group's score is its best hit's score. Its memory text is the matched
+    chunks in document order. Those chunks stand in for the parent's full
+    text, which can be far longer than any prompt budget. A parent that
+    matched with no chunks keeps its own memory. Hits without a parent_id
+    (short docs, legacy points) pass through untouched.
+    """
+    groups: dict[str, dict] = {}
+    order: list[str] = []
+    for hit in hits:
+        payload = hit.payload or {}
+        parent_id = payload.get("parent_id")
+        key = str(parent_id or hit.id)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"best": hit, "parent": None, "chunks": []}
+            order.append(key)
+        elif hit.score > group["best"].score:
+            group["best"] = hit
+        if parent_id:
+            group["chunks"].append(hit)
+        else:
+            group["parent"] = hit
+
+    collapsed = []
+    for key in order:
+        group = groups[key]
+        if not group["chunks"]:
+            collapsed.append(group["parent"])
+            continue
+        chunks = sorted(group["chunks"], key=lambda h: h.payload.get("chunk_index", 0))
+        base = group["parent"] or group["best"]
+        # Keys, not items(): a LazyPayload then never decrypts the skipped
+        # memory / embed_text, the largest fields of a long document.
+        payload = {k: base.payload[k] for k in base.payload if k not in _NOT_INHERITED}
+        payload["memory"] = "\n…\n".join(h.payload.get("memory", "") for h in chunks)
+        payload["classification"] = group["best"].payload.get(
+            "classification", payload.get("classification", "PUBLIC")
+        )
+        collapsed.append(SimpleNamespace(id=key, score=group["best"].score, payload=payload))
+
+    collapsed.sort(key=lambda h: h.score, reverse=True)
+    return collapsed
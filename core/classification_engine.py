@@ -18,6 +18,7 @@ Usage:
         # treat as sensitive healthcare data
         ...
 """
+import functools
 import re
 from enum import IntEnum
 
@@ -88,14 +89,78 @@ _RULES: list[tuple[Classification, list[re.Pattern]]] = [
 ]
 
 
+# ── Literal prefilter ─────────────────────────────────────────────────────────
+# Every match of a level's patterns contains at least one of its triggers
+# (lowercased). Substring checks run at C speed, so levels whose triggers are
+# absent are never handed to the regex engine. Keep in step with _RULES —
+# test_classification_engine checks each pattern against its triggers.
+
+_TRIGGERS: dict[Classification, tuple[str, ...]] = {
+    Classification.PII: (*"0123456789", "@"),
+    Classification.PHI: (
+        "diagnos", "patient", "chief complaint", "assessment", "treatment plan",
+        "presenting with", "clinical", "prescri", "medication", "dosage", "mg ",
+        "drug ", "mrn", "medical record", "chart ", "date of birth",
+        "dob", "d.ob", "do.b", "d.o.b", "birthdate", "born on",
+    ),
+    Classification.PRIVILEGED: ("attorney", "privileged", "work product", "legal advice"),
+    Classification.CONFIDENTIAL: ("confidential", "proprietary", "trade secret", "not for "),
+    Classification.INTERNAL: ("internal", "do not distribute", "not for external"),
+}
+
+
+def _candidate_rules(text: str) -> tuple[int, ...]:
+    """Indices into _RULES of the levels that could match text."""
+    if not text.isascii():
+        # lower() can change lengths and case-folds differently from re.I
+        # outside ASCII, so the prefilter would not be exact.
+        return tuple(range(len(_RULES)))
+    lowered = text.lower()
+    return tuple(
+        i for i, (level, _) in enumerate(_RULES)
+        if any(trigger in lowered for trigger in _TRIGGERS[level])
+    )
+
+
+# ── Single-pass scanner ───────────────────────────────────────────────────────
+# The candidate levels' patterns are compiled into one alternation, one named
+# group per level, highest level first — at any start position the most
+# severe rule that matches there wins. Per-pattern flags become scoped inline
+# flags, e.g. (?i:...).
+
+def _scoped(pattern: re.Pattern) -> str:
+    return f"(?i:{pattern.pattern})" if pattern.flags & re.I else f"(?:{pattern.pattern})"
+
+
+@functools.lru_cache(maxsize=None)
+def _scanner(rule_indices: tuple[int, ...]) -> re.Pattern:
+    return re.compile("|".join(
+        f"(?P<{_RULES[i][0].name}>{'|'.join(_scoped(p) for p in _RULES[i][1])})"
+        for i in rule_indices
+    ))
+
+
+_RULE_INDEX: dict[str, int] = {level.name: i for i, (level, _) in enumerate(_RULES)}
+
+
 def classify(text: str) -> Classification:
     """Return the highest sensitivity Classification level detected in text.
 
-    Checks patterns from highest severity (PII) to lowest (INTERNAL).
+    Equivalent to checking each level's patterns from highest severity (PII)
+    to lowest (INTERNAL), but reads the text once: each match narrows the
+    scan to the levels above it, and a PII match ends it.
     Returns Classification.PUBLIC if no patterns match.
     Classification.RESTRICTED is never auto-assigned — it requires manual tagging.
     """
-    for level, patterns in _RULES:
-        if any(pattern.search(text) for pattern in patterns):
-            return level
-    return Classification.PUBLIC
+    candidates = _candidate_rules(text)
+    best = len(_RULES)   # index into _RULES of the best level so far; len = none
+    pos = 0
+    while active := tuple(i for i in candidates if i < best):
+        match = _scanner(active).search(text, pos)
+        if match is None:
+            break
+        best = _RULE_INDEX[match.lastgroup]
+        # Resume just after the match *start*: a more severe rule may begin
+        # inside the text this match consumed.
+        pos = match.start() + 1
+    return _RULES[best][0] if best < len(_RULES) else Classification.PUBLIC
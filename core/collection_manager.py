@@ -0,0 +1,149 @@
+"""
+core/collection_manager.py — Idempotent Qdrant collection bootstrap.
+
+Run at startup (core/brain.py lifespan) and by the doc crawler. Creates each
+collection if it is missing, then adds any missing payload indexes — safe to
+run on every boot and from several processes at once.
+
+second_brain is multi-tenant: every query filters on user_id, plus some of
+matter_id / type / classification / status / parent_id (the PLAINTEXT_KEYS
+in core/memory_client.py). Without payload indexes Qdrant evaluates those
+filters point by point, so filtered search slows down as the corpus grows.
+user_id is indexed as the tenant key (is_tenant), which keeps each user's
+points together on disk, and payload_m builds extra HNSW links within each
+tenant so a filtered search stays on the graph.
+
+Payloads live on disk — second_brain payloads are mostly ciphertext that
+is only read for the returned hits — leaving the memory limit to vectors
+and the HNSW graph.
+
+Quantization is opt-in (QDRANT_QUANTIZATION=scalar|binary). Qdrant then
+keeps a compact int8 / 1-bit copy of every vector in RAM for the HNSW walk
+and moves the original float32 vectors to disk, where they are read only to
+rescore the oversampled candidates (EncryptedMemoryClient.search). Binary
+is ~32x smaller but only holds its recall on higher-dimensional embeddings
+with generous oversampling — measure with scripts/bench_quantization.py.
+
+Existing collections keep their vector and HNSW settings; changing those
+means a reindex, which is left to an explicit migration. set_quantization
+(scripts/migrate_quantization.py) is that migration for quantization.
+"""
+import logging
+import os
+
+from qdrant_client.http import models
+
+from core.memory_client import PLAINTEXT_KEYS
+
+logger = logging.getLogger(__name__)
+
+EMBED_DIM = int(os.getenv("EMBED_DIM", "768"))   # nomic-embed-text
+_HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))
+_HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "128"))
+QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "").lower()
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+# name → keyword-indexed payload fields, and the tenant field (or None).
+COLLECTIONS: dict[str, dict] = {
+    "second_brain": {"keyword_fields": sorted(PLAINTEXT_KEYS), "tenant_field": "user_id"},
+    "doc_knowledge": {"keyword_fields": ["source", "type"], "tenant_field": None},
+}
+
+
+def quantization_config(mode: str):
+    """Qdrant quantization config for mode ("scalar", "binary", "none"/""), or None."""
+    if mode in ("", "none"):
+        return None
+    if mode == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,     # clip outliers so they don't stretch the int8 range
+                always_ram=True,
+            )
+        )
+    if mode == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    raise ValueError(f"Unknown quantization mode {mode!r}; expected one of {QUANTIZATION_MODES}")
+
+
+def _create(qdrant, name: str, spec: dict) -> None:
+    tenant = spec["tenant_field"] is not None
+    quantization = quantization_config(QUANTIZATION)
+    qdrant.create_collection(
+        collection_name=name,
+        vectors_config=models.VectorParams(
+            size=EMBED_DIM,
+            distance=models.Distance.COSINE,
+            # Quantized: originals are only read for rescoring, so keep them on disk.
+            on_disk=quantization is not None,
+        ),
+        hnsw_config=models.HnswConfigDiff(
+            m=_HNSW_M,
+            ef_construct=_HNSW_EF_CONSTRUCT,
+            payload_m=_HNSW_M if tenant else None,
+        ),
+        # Fewer, larger segments: fewer per-segment searches on a 1-CPU container.
+        optimizers_config=models.OptimizersConfigDiff(default_segment_number=2, indexing_threshold=10000),
+        on_disk_payload=True,
+        quantization_config=quantization,
+    )
+    logger.info("Created Qdrant collection %s", name)
+
+
+def _index_schema(field: str, spec: dict):
+    if field == spec["tenant_field"]:
+        return models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD, is_tenant=True)
+    return models.PayloadSchemaType.KEYWORD
+
+
+def ensure_collection(qdrant, name: str) -> None:
+    """Create collection `name` (a key of COLLECTIONS) and its payload indexes if missing."""
+    spec = COLLECTIONS[name]
+    if qdrant.collection_exists(name):
+        indexed = set((qdrant.get_collection(name).payload_schema or {}).keys())
+    else:
+        try:
+            _create(qdrant, name, spec)
+        except Exception:
+            if not qdrant.collection_exists(name):
+                raise
+            # Another process created it first.
+        indexed = set()
+
+    for field in spec["keyword_fields"]:
+        if field in indexed:
+            continue
+        qdrant.create_payload_index(
+            collection_name=name,
+            field_name=field,
+            field_schema=_index_schema(field, spec),
+            wait=True,
+        )
+        logger.info("Created payload index %s.%s", name, field)
+
+
+def ensure_collections(qdrant) -> None:
+    """ensure_collection for every managed collection. Logs failures, never raises."""
+    for name in COLLECTIONS:
+        try:
+            ensure_collection(qdrant, name)
+        except Exception as e:
+            logger.error("Could not prepare Qdrant collection %s: %s", name, e)
+
+
+def set_quantization(qdrant, name: str, mode: str) -> None:
+    """Switch an existing collection to quantization `mode` in place.
+
+    Enabling quantization also moves the original vectors to disk; "none"
+    drops the quantized copy and brings them back into RAM. Qdrant rebuilds
+    segments in the background — the collection stays searchable, and
+    reports status green again once the optimizer has finished.
+    """
+    quantization = quantization_config(mode)
+    qdrant.update_collection(
+        collection_name=name,
+        vectors_config={"": models.VectorParamsDiff(on_disk=quantization is not None)},
+        quantization_config=quantization or models.Disabled.DISABLED,
+    )
+    logger.info("Set quantization of %s to %s", name, mode or "none")
@@ -0,0 +1,100 @@
+"""
+core/context_packer.py — Fit retrieved memories into a prompt token budget.
+
+Replaces fixed character slicing of the joined context (which cut memories
+mid-sentence and spent the budget on whatever came first). Memories are
+taken in score order and included whole while they fit; a memory that would
+overflow is skipped in favour of smaller, lower-scored ones. Near-duplicates
+of an already packed memory are dropped — re-ingested or overlapping notes
+otherwise fill the prompt with the same fact several times.
+
+Budgets are in estimated tokens (core.chunking.count_tokens), per model:
+    CONTEXT_TOKEN_BUDGET=1024                          default for all models
+    CONTEXT_TOKEN_BUDGETS=llama3.1:latest=1500,phi3=600   per-model overrides
+
+Usage:
+    from core.context_packer import pack_context, budget_for
+
+    kept = pack_context([(text, score), ...], budget_for(model))
+    # → [(index, text), ...] for the entries to include, best score first;
+    #   text is the entry as-is unless the top one had to be truncated to fit
+"""
+import os
+import re
+
+from core.chunking import count_tokens, token_spans
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1024"))
+NEAR_DUPLICATE_JACCARD = 0.8
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _parse_budgets(raw: str) -> dict[str, int]:
+    budgets = {}
+    for entry in raw.split(","):
+        model, sep, value = entry.strip().rpartition("=")
+        if sep and model and value.isdigit():
+            budgets[model] = int(value)
+    return budgets
+
+
+_MODEL_BUDGETS = _parse_budgets(os.getenv("CONTEXT_TOKEN_BUDGETS", ""))
+
+
+def budget_for(model: str | None) -> int:
+    """Token budget for the context block sent to `model`."""
+    return _MODEL_BUDGETS.get(model or "", CONTEXT_TOKEN_BUDGET)
+
+
+def _shingles(text: str) -> set[tuple[str, ...]]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < 3:
+        return {tuple(words)}
+    return {tuple(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    spans = token_spans(text)
+    if len(spans) <= max_tokens:
+        return text
+    return text[:spans[max_tokens - 1][1]] + " …"
+
+
+def pack_context(
+    entries: list[tuple[str, float]],
+    budget: int,
+    separator_tokens: int = 1,
+) -> list[tuple[int, str]]:
+    """Choose which (text, score) entries go into the prompt.
+
+    Returns (index, text) pairs in score order. text is the entry unchanged,
+    except when nothing fits at all: the top entry is then truncated to the
+    budget so the model still gets the best match rather than no context.
+    """
+    packed: list[tuple[int, str]] = []
+    packed_shingles: list[set] = []
+    remaining = budget
+
+    for idx in sorted(range(len(entries)), key=lambda i: entries[i][1], reverse=True):
+        text = entries[idx][0]
+        if not text.strip():
+            continue
+        shingles = _shingles(text)
+        if any(
+            len(shingles & seen) / len(shingles | seen) >= NEAR_DUPLICATE_JACCARD
+            for seen in packed_shingles
+        ):
+            continue
+        cost = count_tokens(text) + separator_tokens
+        if cost > remaining:
+            continue
+        packed.append((idx, text))
+        packed_shingles.append(shingles)
+        remaining -= cost
+
+    if not packed and entries and budget > separator_tokens:
+        idx = max(range(len(entries)), key=lambda i: entries[i][1])
+        if entries[idx][0].strip():
+            packed.append((idx, _truncate(entries[idx][0], budget - separator_tokens)))
+    return packed
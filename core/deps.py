@@ -5,25 +5,163 @@ Initialised once at import time. Routers import from here; brain.py
 assembles them. No router should import from core.brain — that direction
 creates circular imports.
 """
+import asyncio
 import os
 
 from qdrant_client import QdrantClient
 
-from core.llm_client import LLMEngine, OllamaEngine
+from core.answer_cache import AnswerCache
+from core.embedding_cache import EmbeddingCache
+from core.llm_client import (
+    EMBED_MODEL,
+    AsyncEmbeddingCoalescer,
+    AsyncLLMEngine,
+    AsyncOllamaEngine,
+    EmbeddingCoalescer,
+    LLMEngine,
+    OllamaEngine,
+)
 from core.memory_client import EncryptedMemoryClient, load_encryption_key
-from core.network_gateway import gateway
+from core.network_gateway import async_gateway, gateway
 
 QDRANT_HOST = os.getenv("QDRANT_HOST", "qdrant")
 COLLECTION_NAME = "second_brain"
 LLM_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:latest")
+# Window for merging concurrent embed calls into one upstream request. 0 disables.
+EMBED_COALESCE_MS = float(os.getenv("EMBED_COALESCE_MS", "5"))
+# Most texts sent to the embedding model in one request, coalesced or batched.
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "32"))
+
+_ENCRYPTION_KEY = load_encryption_key()
 
 client = EncryptedMemoryClient(
     QdrantClient(host=QDRANT_HOST, port=6333),
-    load_encryption_key(),
+    _ENCRYPTION_KEY,
 )
 
 llm: LLMEngine = OllamaEngine(gateway, LLM_MODEL)
 
+_embed_coalescer = EmbeddingCoalescer(llm, window_ms=EMBED_COALESCE_MS, max_batch=EMBED_MAX_BATCH)
+
+# Async twins for routers running on the event loop (chat, OpenAI compat, agents).
+allm: AsyncLLMEngine = AsyncOllamaEngine(async_gateway, LLM_MODEL)
+
+_aembed_coalescer = AsyncEmbeddingCoalescer(allm, window_ms=EMBED_COALESCE_MS, max_batch=EMBED_MAX_BATCH)
+
+# EMBED_CACHE_DB_PATH="" keeps the cache memory-only.
+embedding_cache: EmbeddingCache | None = (
+    EmbeddingCache(
+        _ENCRYPTION_KEY,
+        db_path=os.getenv("EMBED_CACHE_DB_PATH", "data/dbs/embedding_cache.db"),
+        memory_entries=int(os.getenv("EMBED_CACHE_MEMORY_ENTRIES", "4096")),
+        max_disk_rows=int(os.getenv("EMBED_CACHE_MAX_ROWS", "200000")),
+    )
+    if os.getenv("EMBED_CACHE_ENABLED", "1") == "1"
+    else None
+)
+
+answer_cache: AnswerCache | None = (
+    AnswerCache(
+        _ENCRYPTION_KEY,
+        threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.97")),
+        ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+    )
+    if os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+    else None
+)
+if answer_cache is not None:
+    client.on_mutation(answer_cache.invalidate)
+
 
 def get_embedding(text: str) -> list[float] | None:
-    return llm.embed(text)
+    if embedding_cache is not None:
+        cached = embedding_cache.get(EMBED_MODEL, text)
+        if cached is not None:
+            return cached
+    vector = _embed_coalescer.embed(text)
+    if vector is not None and embedding_cache is not None:
+        embedding_cache.put(EMBED_MODEL, text, vector)
+    return vector
+
+
+def _embed_in_batches(texts: list[str]) -> list[list[float]] | None:
+    """embed_many in EMBED_MAX_BATCH-sized requests; None if any of them fails."""
+    vectors: list[list[float]] = []
+    for start in range(0, len(texts), EMBED_MAX_BATCH):
+        fresh = llm.embed_many(texts[start:start + EMBED_MAX_BATCH])
+        if fresh is None:
+            return None
+        vectors += fresh
+    return vectors
+
+
+async def _aembed_in_batches(texts: list[str]) -> list[list[float]] | None:
+    vectors: list[list[float]] = []
+    for start in range(0, len(texts), EMBED_MAX_BATCH):
+        fresh = await allm.embed_many(texts[start:start + EMBED_MAX_BATCH])
+        if fresh is None:
+            return None
+        vectors += fresh
+    return vectors
+
+
+def get_embeddings(texts: list[str]) -> list[list[float]] | None:
+    """Embed a known batch of texts, EMBED_MAX_BATCH per upstream request.
+
+    Cached texts are served locally; only the misses go to the model.
+    """
+    if embedding_cache is None:
+        return _embed_in_batches(texts)
+
+    vectors: list[list[float] | None] = [embedding_cache.get(EMBED_MODEL, t) for t in texts]
+    missing = [i for i, v in enumerate(vectors) if v is None]
+    if missing:
+        fresh = _embed_in_batches([texts[i] for i in missing])
+        if fresh is None:
+            return None
+        for i, vector in zip(missing, fresh):
+            vectors[i] = vector
+            embedding_cache.put(EMBED_MODEL, texts[i], vector)
+    return vectors
+
+
+def _cache_get_many(texts: list[str]) -> list[list[float] | None]:
+    return [embedding_cache.get(EMBED_MODEL, t) for t in texts]
+
+
+def _cache_put_many(texts: list[str], vectors: list[list[float]]) -> None:
+    for text, vector in zip(texts, vectors):
+        embedding_cache.put(EMBED_MODEL, text, vector)
+
+
+async def aget_embedding(text: str) -> list[float] | None:
+    """Event-loop version of get_embedding — same cache, async transport.
+
+    Cache lookups and writes (SQLite, Fernet, a thread lock) run on worker
+    threads so they never stall the loop.
+    """
+    if embedding_cache is not None:
+        cached = await asyncio.to_thread(embedding_cache.get, EMBED_MODEL, text)
+        if cached is not None:
+            return cached
+    vector = await _aembed_coalescer.embed(text)
+    if vector is not None and embedding_cache is not None:
+        await asyncio.to_thread(embedding_cache.put, EMBED_MODEL, text, vector)
+    return vector
+
+
+async def aget_embeddings(texts: list[str]) -> list[list[float]] | None:
+    """Event-loop version of get_embeddings; one worker-thread hop per cache pass."""
+    if embedding_cache is None:
+        return await _aembed_in_batches(texts)
+
+    vectors: list[list[float] | None] = await asyncio.to_thread(_cache_get_many, texts)
+    missing = [i for i, v in enumerate(vectors) if v is None]
+    if missing:
+        fresh = await _aembed_in_batches([texts[i] for i in missing])
+        if fresh is None:
+            return None
+        for i, vector in zip(missing, fresh):
+            vectors[i] = vector
+        await asyncio.to_thread(_cache_put_many, [texts[i] for i in missing], fresh)
+    return vectors
@@ -0,0 +1,189 @@
+"""
+core/embedding_cache.py — Content-addressed embedding cache.
+
+Two tiers in front of the embedding model:
+    1. In-memory LRU — bounded by entry count, lost on restart.
+    2. SQLite on disk — survives restarts, bounded by row count.
+
+Entries are keyed by (model name, SHA-256 of text), so the raw text is never
+stored. Vectors on disk are packed as float32 (what Qdrant stores anyway) and
+Fernet-encrypted with the same key as memory payloads — an embedding can leak
+a surprising amount about its source text.
+
+Usage:
+    cache = EmbeddingCache(load_encryption_key(), db_path="data/dbs/embedding_cache.db")
+    vector = cache.get(model, text)
+    if vector is None:
+        vector = llm.embed(text)
+        cache.put(model, text, vector)
+    cache.stats()  # → {"memory_hits": ..., "disk_hits": ..., "misses": ..., ...}
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+
+from cryptography.fernet import Fernet, InvalidToken
+
+logger = logging.getLogger(__name__)
+
+_PRUNE_INTERVAL = 500  # check disk row count every N writes
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier (LRU + encrypted SQLite) embedding cache. Thread-safe."""
+
+    def __init__(
+        self,
+        key: bytes,
+        db_path: str | None = None,
+        memory_entries: int = 4096,
+        max_disk_rows: int = 200_000,
+    ) -> None:
+        self._fernet = Fernet(key)
+        self._memory: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+        self._memory_entries = memory_entries
+        self._max_disk_rows = max_disk_rows
+        self._lock = threading.Lock()  # LRU tier and counters
+        self._conn_lock = threading.Lock()  # the shared SQLite connection
+        self._writes = 0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._conn: sqlite3.Connection | None = None
+        if db_path:
+            self._conn = self._open(db_path)
+
+    # ── Internal helpers ──────────────────────────────────────────────────────
+
+    @staticmethod
+    def _open(db_path: str) -> sqlite3.Connection:
+        dir_name = os.path.dirname(db_path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                model       TEXT NOT NULL,
+                text_hash   TEXT NOT NULL,
+                vector      BLOB NOT NULL,
+                created_at  TEXT NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        conn.commit()
+        return conn
+
+    def _remember(self, key: tuple[str, str], vector: list[float]) -> None:
+        """Insert into the LRU tier. Caller holds self._lock."""
+        if self._memory_entries <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def _encode(self, vector: list[float]) -> bytes:
+        return self._fernet.encrypt(array("f", vector).tobytes())
+
+    def _decode(self, blob: bytes) -> list[float]:
+        packed = array("f")
+        packed.frombytes(self._fernet.decrypt(blob))
+        return packed.tolist()
+
+    def _maybe_prune(self) -> None:
+        """Drop the oldest disk rows past max_disk_rows. Caller holds self._conn_lock."""
+        if self._writes % _PRUNE_INTERVAL != 0:
+            return
+        row_count = self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+        excess = row_count - self._max_disk_rows
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embedding_cache WHERE rowid IN "
+            "(SELECT rowid FROM embedding_cache ORDER BY rowid ASC LIMIT ?)",
+            (excess,),
+        )
+        self._conn.commit()
+
+    # ── Public interface ──────────────────────────────────────────────────────
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        """Return the cached vector for (model, text), or None on a miss."""
+        key = (model, _text_hash(text))
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return vector
+
+        # Disk read and decrypt run outside self._lock so memory hits on
+        # other threads never queue behind them.
+        vector = None
+        if self._conn is not None:
+            try:
+                with self._conn_lock:
+                    row = self._conn.execute(
+                        "SELECT vector FROM embedding_cache WHERE model = ? AND text_hash = ?",
+                        key,
+                    ).fetchone()
+                if row is not None:
+                    vector = self._decode(row[0])
+            except (sqlite3.Error, InvalidToken) as e:
+                # A rotated key or corrupt row is just a miss — re-embed and overwrite.
+                logger.warning(f"Embedding cache read failed: {e}")
+
+        with self._lock:
+            if vector is None:
+                self._counters["misses"] += 1
+                return None
+            self._remember(key, vector)
+            self._counters["disk_hits"] += 1
+            return vector
+
+    def put(self, model: str, text: str, vector: list[float]) -> None:
+        """Store a vector in both tiers. Disk failures are logged, never raised."""
+        key = (model, _text_hash(text))
+        with self._lock:
+            self._remember(key, vector)
+        if self._conn is None:
+            return
+        blob = self._encode(vector)
+        try:
+            with self._conn_lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO embedding_cache (model, text_hash, vector, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (*key, blob, str(datetime.now())),
+                )
+                self._conn.commit()
+                self._writes += 1
+                self._maybe_prune()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes, for sizing the cache."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters["memory_entries"] = len(self._memory)
+            counters["memory_capacity"] = self._memory_entries
+        counters["disk_entries"] = 0
+        if self._conn is not None:
+            with self._conn_lock:
+                counters["disk_entries"] = (
+                    self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+                )
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        counters["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return counters
@@ -1,6 +1,10 @@
+import asyncio
 import json
 import logging
-from typing import Iterator, Protocol, runtime_checkable
+import math
+import threading
+import time
+from typing import AsyncIterator, Iterator, Protocol, runtime_checkable
 
 logger = logging.getLogger(__name__)
 
@@ -8,16 +12,39 @@ logger = logging.getLogger(__name__)
 # after which the next request pays a full model reload from disk.
 KEEP_ALIVE = "30m"
 
+EMBED_MODEL = "nomic-embed-text:latest"
+
+
+def l2_normalize(vector: list[float]) -> list[float]:
+    """Scale to unit length — the form Ollama's batch /api/embed returns.
+
+    The single-text /api/embeddings endpoint returns raw vectors; embed()
+    normalizes them so a text maps to the same vector on either path.
+    """
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
 
 @runtime_checkable
 class LLMEngine(Protocol):
     """Minimal interface for LLM inference. Concrete engines swap in without touching callers."""
 
     def embed(self, text: str) -> list[float] | None: ...
+    def embed_many(self, texts: list[str]) -> list[list[float]] | None: ...
     def chat(self, messages: list[dict], model: str | None = None) -> str | None: ...
     def stream_chat(self, messages: list[dict], model: str | None = None) -> Iterator[str]: ...
 
 
+@runtime_checkable
+class AsyncLLMEngine(Protocol):
+    """Event-loop-native counterpart of LLMEngine for async routers."""
+
+    async def embed(self, text: str) -> list[float] | None: ...
+    async def embed_many(self, texts: list[str]) -> list[list[float]] | None: ...
+    async def chat(self, messages: list[dict], model: str | None = None) -> str | None: ...
+    def stream_chat(self, messages: list[dict], model: str | None = None) -> AsyncIterator[str]: ...
+
+
 class OllamaEngine:
     """LLMEngine backed by a local Ollama instance via NetworkGateway."""
 
@@ -29,14 +56,37 @@ class OllamaEngine:
         try:
             res = self._gateway.post(
                 "ollama", "/api/embeddings",
-                json={"model": "nomic-embed-text:latest", "prompt": text, "keep_alive": KEEP_ALIVE},
+                json={"model": EMBED_MODEL, "prompt": text, "keep_alive": KEEP_ALIVE},
                 timeout=30,
             )
-            return res.json()["embedding"]
+            return l2_normalize(res.json()["embedding"])
         except Exception as e:
             logger.error(f"Embedding failed: {e}")
             return None
 
+    def embed_many(self, texts: list[str]) -> list[list[float]] | None:
+        """Embed several texts in one round-trip via Ollama's batch /api/embed.
+
+        Returns vectors in input order, or None if the request fails or the
+        response does not carry exactly one vector per input.
+        """
+        if not texts:
+            return []
+        try:
+            res = self._gateway.post(
+                "ollama", "/api/embed",
+                json={"model": EMBED_MODEL, "input": texts, "keep_alive": KEEP_ALIVE},
+                timeout=30 + 2 * len(texts),
+            )
+            vectors = res.json()["embeddings"]
+            if len(vectors) != len(texts):
+                logger.error(f"Batch embedding returned {len(vectors)} vectors for {len(texts)} inputs")
+                return None
+            return vectors
+        except Exception as e:
+            logger.error(f"Batch embedding failed: {e}")
+            return None
+
     def chat(self, messages: list[dict], model: str | None = None) -> str | None:
         try:
             res = self._gateway.post(
@@ -79,3 +129,217 @@ class OllamaEngine:
         except Exception as e:
             logger.error(f"Stream chat failed: {e}")
             return
+
+
+class AsyncOllamaEngine:
+    """AsyncLLMEngine backed by a local Ollama instance via AsyncNetworkGateway.
+
+    Request payloads and failure semantics (None / empty stream, never raise)
+    match OllamaEngine exactly.
+    """
+
+    def __init__(self, gateway, default_model: str) -> None:
+        self._gateway = gateway
+        self._default_model = default_model
+
+    async def embed(self, text: str) -> list[float] | None:
+        try:
+            res = await self._gateway.post(
+                "ollama", "/api/embeddings",
+                json={"model": EMBED_MODEL, "prompt": text, "keep_alive": KEEP_ALIVE},
+                timeout=30,
+            )
+            return l2_normalize(res.json()["embedding"])
+        except Exception as e:
+            logger.error(f"Embedding failed: {e}")
+            return None
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]] | None:
+        if not texts:
+            return []
+        try:
+            res = await self._gateway.post(
+                "ollama", "/api/embed",
+                json={"model": EMBED_MODEL, "input": texts, "keep_alive": KEEP_ALIVE},
+                timeout=30 + 2 * len(texts),
+            )
+            vectors = res.json()["embeddings"]
+            if len(vectors) != len(texts):
+                logger.error(f"Batch embedding returned {len(vectors)} vectors for {len(texts)} inputs")
+                return None
+            return vectors
+        except Exception as e:
+            logger.error(f"Batch embedding failed: {e}")
+            return None
+
+    async def chat(self, messages: list[dict], model: str | None = None) -> str | None:
+        try:
+            res = await self._gateway.post(
+                "ollama", "/api/chat",
+                json={
+                    "model": model or self._default_model,
+                    "messages": messages,
+                    "stream": False,
+                    "keep_alive": KEEP_ALIVE,
+                },
+                timeout=60,
+            )
+            return res.json()["message"]["content"]
+        except Exception as e:
+            logger.error(f"Chat failed: {e}")
+            return None
+
+    async def stream_chat(self, messages: list[dict], model: str | None = None) -> AsyncIterator[str]:
+        """Yield answer tokens until Ollama reports done.
+
+        Raises if the request fails or the stream ends early, so callers can
+        tell a cut-off answer from a complete one (and never cache it).
+        """
+        done = False
+        try:
+            async with self._gateway.stream(
+                "POST", "ollama", "/api/chat",
+                json={
+                    "model": model or self._default_model,
+                    "messages": messages,
+                    "stream": True,
+                    "keep_alive": KEEP_ALIVE,
+                },
+                timeout=60,
+            ) as resp:
+                async for line in resp.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    content = chunk.get("message", {}).get("content", "")
+                    if content:
+                        yield content
+                    if chunk.get("done"):
+                        done = True
+                        break
+        except Exception as e:
+            logger.error(f"Stream chat failed: {e}")
+            raise
+        if not done:
+            logger.error("Stream chat ended before the model finished")
+            raise ConnectionError("Ollama stream ended before done")
+
+
+class _PendingEmbed:
+    __slots__ = ("text", "vector", "done")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.vector: list[float] | None = None
+        self.done = threading.Event()
+
+
+class EmbeddingCoalescer:
+    """Merges concurrent single-text embed() calls into batched embed_many() calls.
+
+    The first caller to arrive becomes the batch leader: it waits window_ms for
+    other threads to queue their texts, then sends everything pending in
+    chunks of max_batch and hands each follower its vector. A lone request
+    goes through engine.embed() unchanged, so idle traffic pays only the
+    window delay.
+
+    Both paths return unit vectors: /api/embed normalizes upstream and
+    embed() applies l2_normalize to /api/embeddings, so a text gets the same
+    vector whether or not it was coalesced.
+    """
+
+    def __init__(self, engine: LLMEngine, window_ms: float = 5.0, max_batch: int = 32) -> None:
+        self._engine = engine
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending: list[_PendingEmbed] = []
+
+    def embed(self, text: str) -> list[float] | None:
+        if self._window <= 0:
+            return self._engine.embed(text)
+
+        item = _PendingEmbed(text)
+        with self._lock:
+            self._pending.append(item)
+            is_leader = len(self._pending) == 1
+
+        if not is_leader:
+            # Leader always sets done (even on failure); the timeout only guards
+            # against a leader thread dying mid-request.
+            if not item.done.wait(timeout=120):
+                logger.error("Coalesced embedding timed out waiting for batch leader")
+            return item.vector
+
+        time.sleep(self._window)
+        with self._lock:
+            batch, self._pending = self._pending, []
+        try:
+            self._flush(batch)
+        finally:
+            for pending in batch:
+                pending.done.set()
+        return item.vector
+
+    def _flush(self, batch: list[_PendingEmbed]) -> None:
+        if len(batch) == 1:
+            batch[0].vector = self._engine.embed(batch[0].text)
+            return
+        for start in range(0, len(batch), self._max_batch):
+            chunk = batch[start:start + self._max_batch]
+            vectors = self._engine.embed_many([p.text for p in chunk])
+            if vectors is None:
+                continue
+            for pending, vector in zip(chunk, vectors):
+                pending.vector = vector
+        logger.debug(f"Coalesced {len(batch)} embedding requests")
+
+
+class AsyncEmbeddingCoalescer:
+    """asyncio counterpart of EmbeddingCoalescer for the async engine.
+
+    The first embed() in a window schedules a flush task; every caller awaits
+    its own future. The flush runs as an independent task so a cancelled
+    caller (client disconnect) never strands the rest of its batch.
+    """
+
+    def __init__(self, engine: AsyncLLMEngine, window_ms: float = 5.0, max_batch: int = 32) -> None:
+        self._engine = engine
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    async def embed(self, text: str) -> list[float] | None:
+        if self._window <= 0:
+            return await self._engine.embed(text)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if len(self._pending) == 1:
+            task = asyncio.create_task(self._flush_after_window())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return await future
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self._window)
+        batch, self._pending = self._pending, []
+        try:
+            if len(batch) == 1:
+                text, future = batch[0]
+                vector = await self._engine.embed(text)
+                if not future.done():
+                    future.set_result(vector)
+                return
+            for start in range(0, len(batch), self._max_batch):
+                chunk = batch[start:start + self._max_batch]
+                vectors = await self._engine.embed_many([text for text, _ in chunk])
+                for i, (_, future) in enumerate(chunk):
+                    if not future.done():
+                        future.set_result(vectors[i] if vectors is not None else None)
+            logger.debug(f"Coalesced {len(batch)} embedding requests")
+        finally:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
@@ -13,63 +13,111 @@ Access model:
   - Creator of a matter is automatically granted access.
   - Admin users bypass access checks (enforced in brain.py, not here).
   - grant_access is idempotent — safe to call multiple times.
+
+Caching: matter rows and ACL answers (including negatives) are cached in
+process for MATTER_CACHE_TTL seconds, so _resolve_matter on the hot path
+is two dict lookups. create_matter / grant_access / close_matter write the
+new state into the cache under the same lock that bumps _version; a read
+that started before a write sees a different version and does not store
+its (possibly stale) result.
+
+Connections come from core.sqlite_db (one per thread, reused), and the
+schema DDL runs once per DB_PATH.
 """
 import os
+import threading
+import time
 import uuid
 import sqlite3
 from datetime import datetime
 from typing import Optional
 
+from core.sqlite_db import ensure_schema, get_connection
+
 DB_PATH: str = os.getenv("MATTER_DB_PATH", "data/dbs/matter_registry.db")
 
+MATTER_CACHE_TTL: float = float(os.getenv("MATTER_CACHE_TTL", "30"))
+MATTER_CACHE_MAX_ENTRIES = 4096
+
+# Keys start with DB_PATH so a monkeypatched per-test database is isolated.
+_matter_cache: dict[tuple, tuple[float, Optional[dict]]] = {}          # (db, matter_id)
+_access_cache: dict[tuple, tuple[float, bool]] = {}                    # (db, user_id, matter_id)
+_cache_lock = threading.Lock()
+_version = 0
+_MISS = object()
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS matters (
+        id          TEXT PRIMARY KEY,
+        name        TEXT NOT NULL,
+        status      TEXT NOT NULL DEFAULT 'open',
+        created_by  TEXT NOT NULL,
+        created_at  TEXT NOT NULL,
+        closed_at   TEXT
+    );
+    CREATE TABLE IF NOT EXISTS user_matter_access (
+        user_id     TEXT NOT NULL,
+        matter_id   TEXT NOT NULL,
+        granted_by  TEXT NOT NULL,
+        granted_at  TEXT NOT NULL,
+        PRIMARY KEY (user_id, matter_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_uma_user ON user_matter_access(user_id);
+    CREATE INDEX IF NOT EXISTS idx_uma_matter ON user_matter_access(matter_id);
+    -- Prevent duplicate matter names per user. Scoped to created_by so two
+    -- different users can each have a matter named "Personal".
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_matters_name_creator ON matters(name, created_by);
+"""
+
 
 # ─── Internal helpers ─────────────────────────────────────────────────────────
 
 def _get_conn() -> sqlite3.Connection:
-    dir_name = os.path.dirname(DB_PATH)
-    if dir_name:
-        os.makedirs(dir_name, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """This thread's shared connection. Use as `with _get_conn() as conn:` —
+    the block commits (or rolls back) but leaves the connection open."""
+    return get_connection(DB_PATH)
+
+
+def _cache_read(cache: dict, key: tuple):
+    """Return the cached value or the _MISS sentinel. Caller holds _cache_lock."""
+    entry = cache.get(key)
+    if entry is None or entry[0] <= time.monotonic():
+        return _MISS
+    return entry[1]
+
+
+def _cache_store(cache: dict, key: tuple, value, seen_version: int | None = None) -> None:
+    """Store a value. Caller holds _cache_lock.
+
+    seen_version: for values read from SQLite, the _version observed before
+    the read. If a mutation happened since, the read may be stale — skip it.
+    """
+    if seen_version is not None and seen_version != _version:
+        return
+    if len(cache) >= MATTER_CACHE_MAX_ENTRIES:
+        cache.clear()  # crude bound; entries are cheap to refill
+    cache[key] = (time.monotonic() + MATTER_CACHE_TTL, value)
+
+
+def _mutated() -> None:
+    """Bump the version after a write. Caller holds _cache_lock."""
+    global _version
+    _version += 1
+
+
+def invalidate_matter_cache() -> None:
+    """Drop every cached matter and ACL entry."""
+    with _cache_lock:
+        _mutated()
+        _matter_cache.clear()
+        _access_cache.clear()
 
 
 # ─── Public API ───────────────────────────────────────────────────────────────
 
 def init_matter_db() -> None:
-    """Create tables and indexes if they don't exist."""
-    with _get_conn() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS matters (
-                id          TEXT PRIMARY KEY,
-                name        TEXT NOT NULL,
-                status      TEXT NOT NULL DEFAULT 'open',
-                created_by  TEXT NOT NULL,
-                created_at  TEXT NOT NULL,
-                closed_at   TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS user_matter_access (
-                user_id     TEXT NOT NULL,
-                matter_id   TEXT NOT NULL,
-                granted_by  TEXT NOT NULL,
-                granted_at  TEXT NOT NULL,
-                PRIMARY KEY (user_id, matter_id)
-            )
-        """)
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_uma_user ON user_matter_access(user_id)"
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_uma_matter ON user_matter_access(matter_id)"
-        )
-        # Prevent duplicate matter names per user. Scoped to created_by so two
-        # different users can each have a matter named "Personal".
-        conn.execute(
-            "CREATE UNIQUE INDEX IF NOT EXISTS idx_matters_name_creator "
-            "ON matters(name, created_by)"
-        )
+    """Create tables and indexes if they don't exist (once per DB_PATH)."""
+    ensure_schema(DB_PATH, _SCHEMA)
 
 
 def bootstrap_default_matter(admin_user_id: str) -> None:
@@ -93,6 +141,10 @@ def bootstrap_default_matter(admin_user_id: str) -> None:
                 "(user_id, matter_id, granted_by, granted_at) VALUES (?, 'default', ?, ?)",
                 (admin_user_id, admin_user_id, str(datetime.now()))
             )
+    with _cache_lock:
+        _mutated()
+        _matter_cache.pop((DB_PATH, "default"), None)
+        _access_cache.pop((DB_PATH, admin_user_id, "default"), None)
 
 
 def create_matter(name: str, created_by: str) -> str:
@@ -117,18 +169,35 @@ def create_matter(name: str, created_by: str) -> str:
             )
     except sqlite3.IntegrityError:
         raise ValueError(f"A matter named '{name}' already exists for this user.")
+    with _cache_lock:
+        _mutated()
+        _cache_store(_matter_cache, (DB_PATH, matter_id), {
+            "id": matter_id, "name": name, "status": "open",
+            "created_by": created_by, "created_at": now, "closed_at": None,
+        })
+        _cache_store(_access_cache, (DB_PATH, created_by, matter_id), True)
     return matter_id
 
 
 def get_matter(matter_id: str) -> Optional[dict]:
     """Return a matter dict or None if not found."""
+    key = (DB_PATH, matter_id)
+    with _cache_lock:
+        cached = _cache_read(_matter_cache, key)
+        seen = _version
+    if cached is not _MISS:
+        return dict(cached) if cached else None
+
     with _get_conn() as conn:
         row = conn.execute(
             "SELECT id, name, status, created_by, created_at, closed_at "
             "FROM matters WHERE id = ?",
             (matter_id,)
         ).fetchone()
-    return dict(row) if row else None
+    matter = dict(row) if row else None
+    with _cache_lock:
+        _cache_store(_matter_cache, key, matter, seen)
+    return dict(matter) if matter else None
 
 
 def list_matters_for_user(user_id: str) -> list[dict]:
@@ -148,12 +217,39 @@ def list_matters_for_user(user_id: str) -> list[dict]:
 
 def check_access(user_id: str, matter_id: str) -> bool:
     """Return True if user_id has an access row for matter_id."""
+    return check_access_many(user_id, [matter_id])[matter_id]
+
+
+def check_access_many(user_id: str, matter_ids: list[str]) -> dict[str, bool]:
+    """Access check for several matters at once → {matter_id: bool}.
+
+    Cached answers are served from memory; the rest are resolved with a
+    single query.
+    """
+    result: dict[str, bool] = {}
+    with _cache_lock:
+        for matter_id in matter_ids:
+            cached = _cache_read(_access_cache, (DB_PATH, user_id, matter_id))
+            if cached is not _MISS:
+                result[matter_id] = cached
+        seen = _version
+    missing = list(dict.fromkeys(m for m in matter_ids if m not in result))
+    if not missing:
+        return result
+
+    placeholders = ",".join("?" * len(missing))
     with _get_conn() as conn:
-        row = conn.execute(
-            "SELECT 1 FROM user_matter_access WHERE user_id = ? AND matter_id = ?",
-            (user_id, matter_id)
-        ).fetchone()
-    return row is not None
+        rows = conn.execute(
+            "SELECT matter_id FROM user_matter_access "
+            f"WHERE user_id = ? AND matter_id IN ({placeholders})",
+            (user_id, *missing)
+        ).fetchall()
+    granted = {row["matter_id"] for row in rows}
+    with _cache_lock:
+        for matter_id in missing:
+            result[matter_id] = matter_id in granted
+            _cache_store(_access_cache, (DB_PATH, user_id, matter_id), result[matter_id], seen)
+    return result
 
 
 def grant_access(matter_id: str, user_id: str, granted_by: str) -> None:
@@ -164,12 +260,24 @@ def grant_access(matter_id: str, user_id: str, granted_by: str) -> None:
             "(user_id, matter_id, granted_by, granted_at) VALUES (?, ?, ?, ?)",
             (user_id, matter_id, granted_by, str(datetime.now()))
         )
+    with _cache_lock:
+        _mutated()
+        _cache_store(_access_cache, (DB_PATH, user_id, matter_id), True)
 
 
 def close_matter(matter_id: str, closed_by: str) -> None:
     """Mark a matter as closed. Qdrant point deletion is handled by brain.py."""
+    closed_at = str(datetime.now())
     with _get_conn() as conn:
         conn.execute(
             "UPDATE matters SET status = 'closed', closed_at = ? WHERE id = ?",
-            (str(datetime.now()), matter_id)
+            (closed_at, matter_id)
         )
+    with _cache_lock:
+        _mutated()
+        cached = _cache_read(_matter_cache, (DB_PATH, matter_id))
+        if cached is _MISS or cached is None:
+            _matter_cache.pop((DB_PATH, matter_id), None)
+        else:
+            _cache_store(_matter_cache, (DB_PATH, matter_id),
+                         {**cached, "status": "closed", "closed_at": closed_at})
@@ -8,8 +8,14 @@ fields required for Qdrant filter indexes remain plaintext.
 Plaintext fields (never encrypted — required for Qdrant filtering):
     user_id, matter_id, type, classification, status
 
-All other fields (memory, embed_text, created_at, ...) are serialised to
-JSON and encrypted into a single "encrypted" field.
+All other fields are serialised to JSON and encrypted. The large text
+fields (memory, embed_text) each get their own ciphertext field
+("encrypted_memory", "encrypted_embed_text"); the rest (created_at,
+document keys, ...) share the "encrypted" field. Reads return a LazyPayload
+that decrypts each of those only when one of its fields is first read, so
+listing ids or reading "memory" never decrypts a 50k-character embed_text.
+Points written before the split (everything in "encrypted") and legacy
+plaintext points read the same way.
 
 Key resolution order:
     1. ENGRAM_ENCRYPTION_KEY env var (base64 Fernet key, 44 chars)
@@ -18,6 +24,10 @@ Key resolution order:
 import json
 import logging
 import os
+import threading
+import weakref
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 
 from cryptography.fernet import Fernet
 from qdrant_client import QdrantClient
@@ -32,10 +42,29 @@ PLAINTEXT_KEYS: frozenset[str] = frozenset({
     "type",
     "classification",
     "status",
+    "parent_id",   # links chunk points to their document; filtered on delete / listing
 })
 
+# Sensitive fields encrypted on their own, as "encrypted_<field>", so reading
+# one does not decrypt the others. Everything else shares ENCRYPTED_KEY.
+SEPARATE_FIELDS: tuple[str, ...] = ("memory", "embed_text")
+ENCRYPTED_KEY = "encrypted"
+_FIELD_BLOBS: dict[str, str] = {f: f"{ENCRYPTED_KEY}_{f}" for f in SEPARATE_FIELDS}
+_BLOB_KEYS: frozenset[str] = frozenset({ENCRYPTED_KEY, *_FIELD_BLOBS.values()})
+
 VAULT_PATH: str = os.path.expanduser("~/.engram/vault.key")
 
+# write_many tuning: points per upsert request, and the batch size below which
+# encryption stays on the caller's thread (pool hand-off costs more than it saves).
+WRITE_CHUNK_SIZE = 256
+_PARALLEL_ENCRYPT_MIN = 32
+
+# Default quantized-search oversampling for search()/search_many() when the
+# caller passes none: fetch N× the limit by quantized score, rescore those
+# with the original vectors. Unset leaves Qdrant's defaults. Ignored by
+# collections without quantization (core/collection_manager.py).
+SEARCH_OVERSAMPLING: float | None = float(os.getenv("QDRANT_OVERSAMPLING", "0")) or None
+
 
 def load_encryption_key() -> bytes:
     """Return the Fernet key to use for payload encryption.
@@ -63,6 +92,86 @@ def load_encryption_key() -> bytes:
     return key
 
 
+def _search_params(oversampling: float | None, rescore: bool | None):
+    """SearchParams for a quantized search, or None to use the collection's defaults."""
+    if oversampling is None:
+        oversampling = SEARCH_OVERSAMPLING
+    if oversampling is None and rescore is None:
+        return None
+    return models.SearchParams(
+        quantization=models.QuantizationSearchParams(oversampling=oversampling, rescore=rescore)
+    )
+
+
+class LazyPayload(Mapping):
+    """Read-only view of a stored payload that decrypts on first access.
+
+    Plaintext filter fields are readable straight away. Reading any other
+    field decrypts only the ciphertext that holds it: "memory" opens
+    "encrypted_memory", created_at opens the shared "encrypted" blob.
+    Iterating (keys(), items(), dict(payload)) opens the shared blob to learn
+    its keys, but lists separately encrypted fields without decrypting them.
+
+    Safe to read from several threads: opening a blob and listing keys
+    hold a per-payload lock, so each blob is decrypted once and iteration
+    never sees the field dict change size.
+    """
+
+    __slots__ = ("_fernet", "_fields", "_sealed", "_lock")
+
+    def __init__(self, fernet: Fernet, stored: dict) -> None:
+        self._fernet = fernet
+        self._fields = {k: v for k, v in stored.items() if k not in _BLOB_KEYS}
+        self._sealed = {k: v for k, v in stored.items() if k in _BLOB_KEYS}
+        self._lock = threading.Lock()
+
+    def _open(self, blob_key: str) -> None:
+        if blob_key not in self._sealed:
+            return
+        with self._lock:
+            ciphertext = self._sealed.get(blob_key)
+            if ciphertext is None:
+                return   # opened by another thread meanwhile
+            self._fields.update(json.loads(self._fernet.decrypt(ciphertext.encode())))
+            # Fields first, then drop the ciphertext — a lock-free reader sees one or the other.
+            del self._sealed[blob_key]
+
+    def decrypt(self, *keys: str) -> "LazyPayload":
+        """Decrypt the blobs holding keys now (e.g. on a worker thread) instead of on first read."""
+        for key in keys:
+            if key not in self._fields:
+                self._open(_FIELD_BLOBS.get(key, ENCRYPTED_KEY))
+        return self
+
+    def __getitem__(self, key: str):
+        if key not in self._fields:
+            self._open(_FIELD_BLOBS.get(key, ENCRYPTED_KEY))
+        if key not in self._fields:
+            # Written before SEPARATE_FIELDS: the shared blob holds every field.
+            self._open(ENCRYPTED_KEY)
+        return self._fields[key]
+
+    def __contains__(self, key) -> bool:
+        if key in self._fields or _FIELD_BLOBS.get(key) in self._sealed:
+            return True
+        self._open(ENCRYPTED_KEY)
+        return key in self._fields
+
+    def __iter__(self):
+        self._open(ENCRYPTED_KEY)
+        with self._lock:
+            sealed = [f for f, blob in _FIELD_BLOBS.items() if blob in self._sealed and f not in self._fields]
+            return iter([*self._fields, *sealed])
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        # Never decrypts — safe to log.
+        plain = {k: v for k, v in self._fields.items() if k in PLAINTEXT_KEYS}
+        return f"LazyPayload({plain!r}, sealed={sorted(self._sealed)!r})"
+
+
 class EncryptedMemoryClient:
     """Qdrant client wrapper that transparently encrypts/decrypts payloads.
 
@@ -74,41 +183,114 @@ class EncryptedMemoryClient:
         # Write — payload is encrypted before storage
         mem_client.write(collection, point_id, vector, payload)
 
-        # Read — payload is decrypted after retrieval
+        # Bulk write — parallel encryption, chunked upserts, per-point status
+        statuses = mem_client.write_many(collection, items)
+
+        # Read — payloads come back as LazyPayloads, decrypted on first access
         result = mem_client.search(collection, query_vector, query_filter, limit, threshold)
+
+        # React to writes/deletes (e.g. cache invalidation)
+        mem_client.on_mutation(lambda user_id, matter_id: ...)
     """
 
     def __init__(self, qdrant_client: QdrantClient, key: bytes) -> None:
         self._qdrant = qdrant_client
         self._fernet = Fernet(key)
+        self._encrypt_pool: ThreadPoolExecutor | None = None
+        self._encrypt_pool_lock = threading.Lock()
+        self._mutation_listeners: list = []
 
     # ── Internal helpers ──────────────────────────────────────────────────────
 
+    def _get_encrypt_pool(self) -> ThreadPoolExecutor:
+        with self._encrypt_pool_lock:
+            if self._encrypt_pool is None:
+                self._encrypt_pool = ThreadPoolExecutor(
+                    max_workers=min(8, os.cpu_count() or 1),
+                    thread_name_prefix="engram-encrypt",
+                )
+                # Clients built outside the app lifespan (scripts, agents)
+                # never call close(); stop the workers when they are dropped.
+                weakref.finalize(self, self._encrypt_pool.shutdown, wait=False)
+            return self._encrypt_pool
+
+    def close(self) -> None:
+        """Shut down the encrypt pool. The next write_many re-creates it lazily."""
+        with self._encrypt_pool_lock:
+            pool, self._encrypt_pool = self._encrypt_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
     def _encrypt_payload(self, payload: dict) -> dict:
-        """Split payload into plaintext filter fields + one encrypted blob."""
-        plaintext = {k: v for k, v in payload.items() if k in PLAINTEXT_KEYS}
-        sensitive = {k: v for k, v in payload.items() if k not in PLAINTEXT_KEYS}
-        if sensitive:
-            ciphertext = self._fernet.encrypt(json.dumps(sensitive).encode()).decode()
-            plaintext["encrypted"] = ciphertext
+        """Split payload into plaintext filter fields + encrypted blobs.
+
+        Each SEPARATE_FIELDS field gets its own blob; the remaining
+        sensitive fields share ENCRYPTED_KEY.
+        """
+        plaintext: dict = {}
+        blobs: dict[str, dict] = {}
+        for k, v in payload.items():
+            if k in PLAINTEXT_KEYS:
+                plaintext[k] = v
+            else:
+                blobs.setdefault(_FIELD_BLOBS.get(k, ENCRYPTED_KEY), {})[k] = v
+        for blob_key, sensitive in blobs.items():
+            plaintext[blob_key] = self._fernet.encrypt(json.dumps(sensitive).encode()).decode()
         return plaintext
 
-    def _decrypt_payload(self, payload: dict) -> dict:
-        """Decrypt the 'encrypted' field and merge back into payload.
+    def _decrypt_payload(self, payload: dict):
+        """Wrap a stored payload in a LazyPayload that decrypts on access.
 
-        If 'encrypted' is absent (legacy pre-DSE-1 record), the payload is
-        returned unchanged — no crash, no data loss.
+        If no encrypted field is present (legacy pre-DSE-1 record), the
+        payload is returned unchanged — no crash, no data loss.
         """
-        if "encrypted" not in payload:
+        if _BLOB_KEYS.isdisjoint(payload):
             return payload  # legacy unencrypted record — pass through
-        result = dict(payload)
-        ciphertext = result.pop("encrypted").encode()
-        sensitive = json.loads(self._fernet.decrypt(ciphertext))
-        result.update(sensitive)
+        return LazyPayload(self._fernet, payload)
+
+    def decrypt_payload(self, payload: dict, fields: tuple[str, ...] = ()):
+        """Decrypt a payload returned by search(..., decrypt=False).
+
+        fields are decrypted now; the rest still decrypt on first access.
+        """
+        result = self._decrypt_payload(payload)
+        if fields and isinstance(result, LazyPayload):
+            result.decrypt(*fields)
         return result
 
+    def _notify(self, user_id: str | None, matter_id: str | None) -> None:
+        for listener in self._mutation_listeners:
+            try:
+                listener(user_id, matter_id)
+            except Exception as e:
+                logger.error(f"Mutation listener failed: {e}")
+
+    @staticmethod
+    def _selector_scope(points_selector) -> tuple[str | None, str | None]:
+        """Best-effort (user_id, matter_id) from a delete filter's must clauses.
+
+        None means the selector does not pin that field (e.g. a bare id list).
+        """
+        found: dict[str, str] = {}
+        query_filter = getattr(points_selector, "filter", None)
+        for cond in getattr(query_filter, "must", None) or []:
+            key = getattr(cond, "key", None)
+            value = getattr(getattr(cond, "match", None), "value", None)
+            if key in ("user_id", "matter_id") and isinstance(value, str):
+                found[key] = value
+        user_id = found.get("user_id")
+        return user_id, found.get("matter_id") if user_id else None
+
     # ── Public interface ──────────────────────────────────────────────────────
 
+    def on_mutation(self, listener) -> None:
+        """Register listener(user_id, matter_id), called after writes and deletes.
+
+        A None argument means the mutation may have touched any value of that
+        field — listeners must treat it as a wildcard.
+        """
+        self._mutation_listeners.append(listener)
+
     def write(
         self,
         collection_name: str,
@@ -132,6 +314,73 @@ class EncryptedMemoryClient:
                 payload=stored_payload,
             )],
         )
+        self._notify(payload.get("user_id"), payload.get("matter_id", ""))
+
+    def write_many(
+        self,
+        collection_name: str,
+        items: list[dict],
+        chunk_size: int = WRITE_CHUNK_SIZE,
+        wait: bool = False,
+    ) -> list[dict]:
+        """Encrypt and upsert many points in chunked multi-point requests.
+
+        Each item carries the same fields as write():
+            {"point_id": ..., "vector": [...], "payload": {...}, "classification": "PII"}
+
+        Payloads are encrypted on a thread pool — Fernet's AES/HMAC work runs
+        in OpenSSL with the GIL released. Upserts default to wait=False, so
+        Qdrant acknowledges each chunk before indexing it.
+
+        Returns one status dict per item, in input order:
+            {"id": point_id, "status": "acknowledged" | "completed" | "error", "error"?: str}
+        A failed chunk marks all of its points as errors; other chunks proceed.
+        """
+        def encrypt(item: dict):
+            return self._encrypt_payload({**item["payload"], "classification": item["classification"]})
+
+        if len(items) >= _PARALLEL_ENCRYPT_MIN:
+            pool = self._get_encrypt_pool()
+            futures = [pool.submit(encrypt, item) for item in items]
+        else:
+            futures = None
+
+        results: list[dict] = []
+        points: list = []
+        for i, item in enumerate(items):
+            try:
+                stored_payload = futures[i].result() if futures else encrypt(item)
+            except Exception as e:
+                results.append({"id": item["point_id"], "status": "error", "error": f"encrypt: {e}"})
+                continue
+            results.append({"id": item["point_id"], "status": None})
+            points.append((len(results) - 1, models.PointStruct(
+                id=item["point_id"],
+                vector=item["vector"],
+                payload=stored_payload,
+            )))
+
+        # Mirrors Qdrant's UpdateStatus for the chosen wait mode.
+        status = "completed" if wait else "acknowledged"
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start:start + chunk_size]
+            try:
+                self._qdrant.upsert(
+                    collection_name=collection_name,
+                    points=[point for _, point in chunk],
+                    wait=wait,
+                )
+                for idx, _ in chunk:
+                    results[idx]["status"] = status
+            except Exception as e:
+                logger.error(f"Bulk upsert of {len(chunk)} points failed: {e}")
+                for idx, _ in chunk:
+                    results[idx]["status"] = "error"
+                    results[idx]["error"] = f"upsert: {e}"
+        # A failed chunk may still have partially applied — notify for all.
+        for scope in {(i["payload"].get("user_id"), i["payload"].get("matter_id", "")) for i in items}:
+            self._notify(*scope)
+        return results
 
     def search(
         self,
@@ -140,20 +389,72 @@ class EncryptedMemoryClient:
         query_filter,
         limit: int,
         score_threshold: float,
+        decrypt: bool = True,
+        oversampling: float | None = None,
+        rescore: bool | None = None,
     ):
-        """Query Qdrant and decrypt payloads in the returned hits."""
+        """Query Qdrant; returned hits carry LazyPayloads (see _decrypt_payload).
+
+        decrypt=False returns payloads as stored, for callers that decrypt
+        hits themselves with decrypt_payload (e.g. concurrently).
+
+        oversampling / rescore tune search on a quantized collection: fetch
+        oversampling × limit candidates by quantized score, then (rescore)
+        re-rank them with the original vectors.
+        """
         result = self._qdrant.query_points(
             collection_name=collection_name,
             query=query_vector,
             query_filter=query_filter,
             limit=limit,
             score_threshold=score_threshold,
+            search_params=_search_params(oversampling, rescore),
         )
-        for point in result.points:
-            if point.payload:
-                point.payload = self._decrypt_payload(point.payload)
+        if decrypt:
+            for point in result.points:
+                if point.payload:
+                    point.payload = self._decrypt_payload(point.payload)
         return result
 
+    def search_many(
+        self,
+        collection_name: str,
+        queries: list[tuple[list[float], object]],
+        limit: int,
+        score_threshold: float,
+        with_payload: bool = True,
+        oversampling: float | None = None,
+        rescore: bool | None = None,
+    ) -> list:
+        """Run several (query_vector, query_filter) searches in one query_batch_points call.
+
+        Returns one response per query, in order, with LazyPayloads.
+        oversampling / rescore apply to every query, as in search().
+        """
+        if not queries:
+            return []
+        params = _search_params(oversampling, rescore)
+        responses = self._qdrant.query_batch_points(
+            collection_name=collection_name,
+            requests=[
+                models.QueryRequest(
+                    query=vector,
+                    filter=query_filter,
+                    limit=limit,
+                    score_threshold=score_threshold,
+                    with_payload=with_payload,
+                    params=params,
+                )
+                for vector, query_filter in queries
+            ],
+        )
+        if with_payload:
+            for response in responses:
+                for point in response.points:
+                    if point.payload:
+                        point.payload = self._decrypt_payload(point.payload)
+        return responses
+
     def scroll(
         self,
         collection_name: str,
@@ -162,7 +463,7 @@ class EncryptedMemoryClient:
         offset=None,
         with_payload: bool = True,
     ) -> tuple:
-        """Scroll Qdrant and decrypt payloads when with_payload=True."""
+        """Scroll Qdrant; payloads come back as LazyPayloads when with_payload=True."""
         kwargs: dict = dict(
             collection_name=collection_name,
             scroll_filter=scroll_filter,
@@ -187,6 +488,7 @@ class EncryptedMemoryClient:
             collection_name=collection_name,
             points_selector=points_selector,
         )
+        self._notify(*self._selector_scope(points_selector))
 
     def set_payload(
         self,
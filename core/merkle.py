@@ -0,0 +1,159 @@
+"""
+core/merkle.py — Append-only Merkle tree over audit entry hashes (RFC 6962).
+
+The HMAC chain in activity_log proves the log is intact, but proving one
+entry is in it means re-walking the chain. The audit writer also maintains a
+Merkle tree whose leaves are the entries' hashes in id order, which gives:
+
+    inclusion proof    — entry i is in the tree of size n: O(log n) hashes
+    consistency proof  — the tree of size m is a prefix of the tree of size n,
+                         i.e. nothing already published was rewritten
+
+Hashing follows RFC 6962 §2.1 so standard CT tooling can check proofs:
+    leaf   = SHA256(0x00 || bytes.fromhex(entry_hash))
+    node   = SHA256(0x01 || left || right)
+    empty  = SHA256("")
+
+Storage is abstracted as get_node(level, index) → bytes, returning the root
+of the perfect subtree covering leaves [index·2^level, (index+1)·2^level).
+Only perfect subtrees are ever stored; every other hash a proof needs is
+combined from O(log n) of them.
+
+The verify_* functions use only hashlib — an auditor can run this file
+standalone against exported proofs, with no access to the log or its secret.
+"""
+import hashlib
+from typing import Callable
+
+NodeGetter = Callable[[int, int], bytes]
+
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+def leaf_hash(entry_hash_hex: str) -> bytes:
+    return hashlib.sha256(b"\x00" + bytes.fromhex(entry_hash_hex)).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _split(n: int) -> int:
+    """Largest power of two strictly less than n (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+def append_nodes(get_node: NodeGetter, start: int, leaves: list[bytes]) -> list[tuple[int, int, bytes]]:
+    """Perfect-subtree nodes created by appending `leaves` at index `start`.
+
+    Returns (level, index, hash) rows to store. get_node is only asked for
+    left siblings that already existed before this append.
+    """
+    created: dict[tuple[int, int], bytes] = {}
+    for offset, h in enumerate(leaves):
+        level, idx = 0, start + offset
+        created[(0, idx)] = h
+        while idx & 1:   # right child completes a parent
+            sibling = created.get((level, idx - 1)) or get_node(level, idx - 1)
+            h = node_hash(sibling, h)
+            level, idx = level + 1, idx >> 1
+            created[(level, idx)] = h
+    return [(level, idx, h) for (level, idx), h in created.items()]
+
+
+def subtree_hash(get_node: NodeGetter, lo: int, hi: int) -> bytes:
+    """MTH of leaves [lo, hi). Subtrees from the RFC recursion are aligned."""
+    size = hi - lo
+    if size == 0:
+        return EMPTY_ROOT
+    if size & (size - 1) == 0:
+        level = size.bit_length() - 1
+        return get_node(level, lo >> level)
+    k = _split(size)
+    return node_hash(subtree_hash(get_node, lo, lo + k), subtree_hash(get_node, lo + k, hi))
+
+
+def root(get_node: NodeGetter, size: int) -> bytes:
+    return subtree_hash(get_node, 0, size)
+
+
+def inclusion_proof(get_node: NodeGetter, index: int, size: int) -> list[bytes]:
+    """Audit path for leaf `index` in the tree of `size` leaves (RFC 6962 PATH)."""
+    if not 0 <= index < size:
+        raise ValueError(f"leaf {index} is not in a tree of size {size}")
+    proof: list[bytes] = []
+    lo, hi = 0, size
+    while hi - lo > 1:
+        k = _split(hi - lo)
+        if index < lo + k:
+            proof.append(subtree_hash(get_node, lo + k, hi))
+            hi = lo + k
+        else:
+            proof.append(subtree_hash(get_node, lo, lo + k))
+            lo = lo + k
+    return proof[::-1]
+
+
+def consistency_proof(get_node: NodeGetter, old_size: int, new_size: int) -> list[bytes]:
+    """Proof that the first old_size leaves are unchanged in new_size (RFC 6962 PROOF)."""
+    if not 0 < old_size <= new_size:
+        raise ValueError(f"no consistency proof from size {old_size} to {new_size}")
+    proof: list[bytes] = []
+    lo, hi, complete = 0, new_size, True
+    while old_size != hi:
+        k = _split(hi - lo)
+        if old_size - lo <= k:
+            proof.append(subtree_hash(get_node, lo + k, hi))
+            hi = lo + k
+        else:
+            proof.append(subtree_hash(get_node, lo, lo + k))
+            lo = lo + k
+            complete = False
+    if not complete:
+        proof.append(subtree_hash(get_node, lo, hi))
+    return proof[::-1]
+
+
+# ── Offline verification (RFC 9162 §2.1.3.2 and §2.1.4.2) ─────────────────────
+
+def verify_inclusion(leaf: bytes, index: int, size: int, proof: list[bytes], root_hash: bytes) -> bool:
+    if index >= size:
+        return False
+    fn, sn, r = index, size - 1, leaf
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            while not fn & 1 and fn != 0:
+                fn, sn = fn >> 1, sn >> 1
+        else:
+            r = node_hash(r, p)
+        fn, sn = fn >> 1, sn >> 1
+    return sn == 0 and r == root_hash
+
+
+def verify_consistency(
+    old_size: int, new_size: int, old_root: bytes, new_root: bytes, proof: list[bytes]
+) -> bool:
+    if old_size == new_size:
+        return not proof and old_root == new_root
+    if not 0 < old_size < new_size or not proof:
+        return False
+    if old_size & (old_size - 1) == 0:
+        proof = [old_root, *proof]
+    fn, sn = old_size - 1, new_size - 1
+    while fn & 1:
+        fn, sn = fn >> 1, sn >> 1
+    fr = sr = proof[0]
+    for c in proof[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr, sr = node_hash(c, fr), node_hash(c, sr)
+            while not fn & 1 and fn != 0:
+                fn, sn = fn >> 1, sn >> 1
+        else:
+            sr = node_hash(sr, c)
+        fn, sn = fn >> 1, sn >> 1
+    return fr == old_root and sr == new_root and sn == 0
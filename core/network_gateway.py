@@ -1,9 +1,18 @@
+import asyncio
 import ipaddress
 import os
 import socket
 import logging
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
 import requests
 from datetime import datetime, timezone
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
@@ -132,20 +141,27 @@ _DESTINATIONS: dict[str, callable] = {
     "crawler":      None,
 }
 
+# Default (connect, read) timeouts applied when a caller omits `timeout`. A call
+# without one would otherwise block a worker forever on a hung peer; callers
+# that really want no timeout pass timeout=None explicitly.
+_DEFAULT_TIMEOUTS: dict[str, tuple[float, float]] = {
+    "ollama":       (5, 60),
+    "brain":        (5, 10),
+    "linear":       (5, 10),
+    "jira":         (5, 10),
+    "qdrant_admin": (5, 10),
+    "crawler":      (5, 5),
+}
 
-class NetworkGateway:
-    """Central enforcement point for all outbound HTTP calls.
+# Connection pool sizing. POOL_SIZE bounds kept-alive sockets per host; set
+# GATEWAY_KEEP_ALIVE=0 to send "Connection: close" and disable reuse.
+_POOL_SIZE = int(os.getenv("GATEWAY_POOL_SIZE", "16"))
+_POOL_HOSTS = int(os.getenv("GATEWAY_POOL_HOSTS", "8"))
+_KEEP_ALIVE = os.getenv("GATEWAY_KEEP_ALIVE", "1") == "1"
 
-    All modules MUST use this class instead of calling `requests` directly.
-    Direct `import requests` is prohibited outside this module.
-
-    Usage:
-        from core.network_gateway import gateway
 
-        gateway.post("ollama", "/api/chat", json=payload, timeout=60)
-        gateway.get("brain", "/api/matters")
-        gateway.get("crawler", full_url)   # is_safe_url checked automatically
-    """
+class _GatewayBase:
+    """Allowlist resolution, default timeouts and logging shared by both gateways."""
 
     def _resolve_url(self, destination_label: str, path: str) -> str:
         if destination_label not in _DESTINATIONS:
@@ -167,10 +183,65 @@ class NetworkGateway:
         ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
         logger.info(f"[{ts}] {method.upper()} {label} {url} → {status}")
 
+    def _with_defaults(self, destination_label: str, kwargs: dict) -> dict:
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = _DEFAULT_TIMEOUTS.get(destination_label)
+        return kwargs
+
+
+class NetworkGateway(_GatewayBase):
+    """Central enforcement point for all outbound HTTP calls.
+
+    All modules MUST use this class instead of calling `requests` directly.
+    Direct `import requests` is prohibited outside this module.
+
+    Usage:
+        from core.network_gateway import gateway
+
+        gateway.post("ollama", "/api/chat", json=payload, timeout=60)
+        gateway.get("brain", "/api/matters")
+        gateway.get("crawler", full_url)   # is_safe_url checked automatically
+
+    Each destination label gets its own pooled keep-alive requests.Session,
+    created on first use. Sessions never persist cookies, so every call
+    carries exactly the headers its caller passed — same as a bare
+    requests.post.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+
+    def _session(self, destination_label: str) -> requests.Session:
+        session = self._sessions.get(destination_label)
+        if session is not None:
+            return session
+        with self._sessions_lock:
+            session = self._sessions.get(destination_label)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=_POOL_HOSTS, pool_maxsize=_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                if not _KEEP_ALIVE:
+                    session.headers["Connection"] = "close"
+                self._sessions[destination_label] = session
+        return session
+
+    def close(self) -> None:
+        """Close every pooled session. The next call re-opens lazily."""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
     def get(self, destination_label: str, path: str = "", **kwargs) -> requests.Response:
         url = self._resolve_url(destination_label, path)
         try:
-            resp = requests.get(url, **kwargs)
+            resp = self._session(destination_label).get(
+                url, **self._with_defaults(destination_label, kwargs)
+            )
             self._log("GET", destination_label, url, resp.status_code)
             return resp
         except Exception as e:
@@ -180,7 +251,9 @@ class NetworkGateway:
     def post(self, destination_label: str, path: str = "", **kwargs) -> requests.Response:
         url = self._resolve_url(destination_label, path)
         try:
-            resp = requests.post(url, **kwargs)
+            resp = self._session(destination_label).post(
+                url, **self._with_defaults(destination_label, kwargs)
+            )
             self._log("POST", destination_label, url, resp.status_code)
             return resp
         except Exception as e:
@@ -190,7 +263,9 @@ class NetworkGateway:
     def delete(self, destination_label: str, path: str = "", **kwargs) -> requests.Response:
         url = self._resolve_url(destination_label, path)
         try:
-            resp = requests.delete(url, **kwargs)
+            resp = self._session(destination_label).delete(
+                url, **self._with_defaults(destination_label, kwargs)
+            )
             self._log("DELETE", destination_label, url, resp.status_code)
             return resp
         except Exception as e:
@@ -198,5 +273,104 @@ class NetworkGateway:
             raise
 
 
-# Module-level singleton — import and use this everywhere.
+def _httpx_timeout(timeout) -> httpx.Timeout:
+    """Translate a requests-style timeout (seconds or (connect, read)) for httpx."""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+class AsyncNetworkGateway(_GatewayBase):
+    """asyncio-native twin of NetworkGateway for code running on the event loop.
+
+    Same destination allowlist, SSRF guard, default timeouts and log line as
+    the sync gateway; only the transport differs (pooled httpx.AsyncClient).
+    Clients are kept per event loop because an httpx pool cannot be shared
+    across loops. Redirects are not followed.
+
+    Usage:
+        from core.network_gateway import async_gateway
+
+        res = await async_gateway.post("ollama", "/api/chat", json=payload, timeout=60)
+        async with async_gateway.stream("POST", "ollama", "/api/chat", json=payload) as resp:
+            async for line in resp.aiter_lines():
+                ...
+    """
+
+    def __init__(self) -> None:
+        self._clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _client(self, destination_label: str) -> httpx.AsyncClient:
+        per_loop: dict[str, httpx.AsyncClient] = self._clients.setdefault(
+            asyncio.get_running_loop(), {}
+        )
+        client = per_loop.get(destination_label)
+        if client is None:
+            client = httpx.AsyncClient(limits=httpx.Limits(
+                max_connections=_POOL_SIZE * _POOL_HOSTS,
+                max_keepalive_connections=_POOL_SIZE if _KEEP_ALIVE else 0,
+            ))
+            per_loop[destination_label] = client
+        return client
+
+    async def _resolve_url_async(self, destination_label: str, path: str) -> str:
+        # The crawler SSRF guard does a blocking DNS lookup — keep it off the loop.
+        if destination_label in _DESTINATIONS and _DESTINATIONS[destination_label] is None:
+            return await asyncio.to_thread(self._resolve_url, destination_label, path)
+        return self._resolve_url(destination_label, path)
+
+    def _request_kwargs(self, destination_label: str, kwargs: dict) -> dict:
+        kwargs = self._with_defaults(destination_label, kwargs)
+        kwargs["timeout"] = _httpx_timeout(kwargs["timeout"])
+        return kwargs
+
+    async def request(
+        self, method: str, destination_label: str, path: str = "", **kwargs
+    ) -> httpx.Response:
+        url = await self._resolve_url_async(destination_label, path)
+        try:
+            resp = await self._client(destination_label).request(
+                method, url, **self._request_kwargs(destination_label, kwargs)
+            )
+            self._log(method, destination_label, url, resp.status_code)
+            return resp
+        except Exception as e:
+            self._log(method, destination_label, url, type(e).__name__)
+            raise
+
+    async def get(self, destination_label: str, path: str = "", **kwargs) -> httpx.Response:
+        return await self.request("GET", destination_label, path, **kwargs)
+
+    async def post(self, destination_label: str, path: str = "", **kwargs) -> httpx.Response:
+        return await self.request("POST", destination_label, path, **kwargs)
+
+    async def delete(self, destination_label: str, path: str = "", **kwargs) -> httpx.Response:
+        return await self.request("DELETE", destination_label, path, **kwargs)
+
+    @asynccontextmanager
+    async def stream(
+        self, method: str, destination_label: str, path: str = "", **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """Streamed request — the body is read incrementally inside the block."""
+        url = await self._resolve_url_async(destination_label, path)
+        try:
+            async with self._client(destination_label).stream(
+                method, url, **self._request_kwargs(destination_label, kwargs)
+            ) as resp:
+                self._log(method, destination_label, url, resp.status_code)
+                yield resp
+        except Exception as e:
+            self._log(method, destination_label, url, type(e).__name__)
+            raise
+
+    async def aclose(self) -> None:
+        """Close the pooled clients belonging to the running loop."""
+        per_loop = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in per_loop.values():
+            await client.aclose()
+
+
+# Module-level singletons — import and use these everywhere.
 gateway = NetworkGateway()
+async_gateway = AsyncNetworkGateway()
@@ -0,0 +1,105 @@
+"""
+core/retrieval.py — Shared retrieval and sanitization for RAG prompts.
+
+/chat and /v1/chat/completions both turn a query vector into sanitized
+memory text the same way:
+
+    search (user + matter filter) → decrypt hits → collapse chunk hits →
+    classification → sanitize_many (one placeholder numbering per prompt)
+
+Classification is read from the plaintext payload field written at ingest
+time; only legacy points without one are classified here. Decryption and
+those fallback classifications run per hit on worker threads, concurrently,
+and sanitization runs off the event loop — none of it blocks other requests.
+
+Callers keep embedding (they also need the vector for the answer cache) and
+packing (the line format is theirs).
+"""
+import asyncio
+import logging
+from collections import namedtuple
+
+from qdrant_client.http import models
+
+from core.chunking import collapse_hits
+from core.classification_engine import Classification, classify
+from core.deps import COLLECTION_NAME, client
+from core.sanitizer import sanitize_many
+
+logger = logging.getLogger(__name__)
+
+SCORE_THRESHOLD = 0.45
+
+# hits            — collapsed hits, best first, payloads decrypted
+# classifications — one Classification per hit
+# texts           — sanitized memory text per hit
+# query           — the sanitized query, or None if none was passed
+# replacements    — placeholder → original value for every text (keep local)
+RetrievedContext = namedtuple(
+    "RetrievedContext", ["hits", "classifications", "texts", "query", "replacements"]
+)
+
+
+def _stored_classification(payload: dict) -> Classification | None:
+    try:
+        return Classification[payload["classification"]]
+    except (KeyError, TypeError):
+        return None
+
+
+def _decrypt(hit):
+    if hit.payload:
+        # Only the text the prompt needs; embed_text and the rest stay sealed.
+        hit.payload = client.decrypt_payload(hit.payload, fields=("memory",))
+    return hit
+
+
+async def retrieve_context(
+    query_vector: list[float],
+    user_id: str,
+    matter_id: str | None,
+    limit: int,
+    query: str | None = None,
+) -> RetrievedContext:
+    """Search the user's memories and sanitize them for a prompt.
+
+    If query is given it is classified and sanitized in the same batch, so
+    its placeholders agree with the memories'. Raises if the search or a
+    decryption fails — callers decide whether that is fatal.
+    """
+    must = [models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id))]
+    if matter_id:
+        must.append(models.FieldCondition(key="matter_id", match=models.MatchValue(value=matter_id)))
+    # Qdrant client is sync — run the search off the event loop.
+    response = await asyncio.to_thread(
+        client.search,
+        collection_name=COLLECTION_NAME,
+        query_vector=query_vector,
+        query_filter=models.Filter(must=must),
+        limit=limit,
+        score_threshold=SCORE_THRESHOLD,
+        decrypt=False,
+    )
+    decrypted = await asyncio.gather(*(asyncio.to_thread(_decrypt, hit) for hit in response.points))
+    # Chunks of one long document come back as a single parent hit.
+    hits = collapse_hits(list(decrypted))
+    memories = [hit.payload.get("memory") or "" for hit in hits]
+
+    classifications = [_stored_classification(hit.payload) for hit in hits]
+    legacy = [i for i, c in enumerate(classifications) if c is None]
+    if legacy:
+        found = await asyncio.gather(*(asyncio.to_thread(classify, memories[i]) for i in legacy))
+        for i, classification in zip(legacy, found):
+            classifications[i] = classification
+
+    sanitized = await asyncio.to_thread(_sanitize, memories, classifications, query)
+    sanitized_query = sanitized.texts[-1] if query is not None else None
+    return RetrievedContext(
+        hits, classifications, sanitized.texts[:len(hits)], sanitized_query, sanitized.replacements
+    )
+
+
+def _sanitize(memories: list[str], classifications: list[Classification], query: str | None):
+    if query is None:
+        return sanitize_many(memories, classifications)
+    return sanitize_many([*memories, query], [*classifications, classify(query)])
@@ -19,13 +19,20 @@ Usage:
 
     # Send result.text to Ollama.
     # result.replacements stays local — never leaves the process.
+
+    # A whole prompt at once — one numbering, so placeholders never collide:
+    batch = sanitize_many([memory_a, memory_b, query], [clf_a, clf_b, clf_q])
+    # batch.texts        → sanitized strings, in input order
+    # batch.replacements → one dict covering every text
 """
+import functools
 import re
 from collections import namedtuple
 from core.classification_engine import Classification
 
 
 SanitizedText = namedtuple("SanitizedText", ["text", "replacements"])
+SanitizedBatch = namedtuple("SanitizedBatch", ["texts", "replacements"])
 
 # Minimum classification level that triggers sanitization.
 # PUBLIC and INTERNAL pass through unchanged.
@@ -41,6 +48,64 @@ _REDACT_RULES: list[tuple[str, re.Pattern]] = [
     ("PHONE",       re.compile(r'(?<!\w)(\+1[-.\s]?)?\(?\d{3}\)?[-.\s]\d{3}[-.\s]\d{4}\b')),
 ]
 
+# Characters every match of a rule contains. Texts with none of them — most
+# prose — are never handed to the regex engine, and the rest only to the
+# rules that can match.
+_DIGITS = tuple("0123456789")
+_REQUIRED_CHARS: dict[str, tuple[str, ...]] = {
+    "CREDIT_CARD": _DIGITS,
+    "SSN": _DIGITS,
+    "EMAIL": ("@",),
+    "PHONE": _DIGITS,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _redact_pattern(labels: tuple[str, ...]) -> re.Pattern:
+    """The given rules as one alternation, one named group per label, so a
+    text is redacted in a single scan. At any position the first rule in
+    _REDACT_RULES order that matches there wins."""
+    return re.compile("|".join(
+        f"(?P<{label}>{pattern.pattern})" for label, pattern in _REDACT_RULES if label in labels
+    ))
+
+
+def _candidate_labels(text: str) -> tuple[str, ...]:
+    present: dict[tuple[str, ...], bool] = {}
+    for chars in _REQUIRED_CHARS.values():
+        if chars not in present:
+            present[chars] = any(c in text for c in chars)
+    return tuple(label for label, _ in _REDACT_RULES if present[_REQUIRED_CHARS[label]])
+
+
+class _Redactor:
+    """Replacement callback for the redaction pattern's sub(), numbering placeholders
+    per label across every text it is used on. A value seen again gets the
+    placeholder it was first given."""
+
+    def __init__(self) -> None:
+        self.replacements: dict[str, str] = {}
+        self._placeholders: dict[str, str] = {}
+        self._counts: dict[str, int] = {}
+
+    def __call__(self, match: re.Match) -> str:
+        value = match.group(0)
+        placeholder = self._placeholders.get(value)
+        if placeholder is None:
+            label = match.lastgroup
+            n = self._counts.get(label, 0)
+            self._counts[label] = n + 1
+            placeholder = f"__{label}_{n}__"
+            self._placeholders[value] = placeholder
+            self.replacements[placeholder] = value
+        return placeholder
+
+    def redact(self, text: str, classification: Classification) -> str:
+        if classification < _SANITIZE_THRESHOLD:
+            return text
+        labels = _candidate_labels(text)
+        return _redact_pattern(labels).sub(self, text) if labels else text
+
 
 def sanitize(text: str, classification: Classification) -> SanitizedText:
     """Replace sensitive values in text with placeholder tokens.
@@ -53,21 +118,19 @@ def sanitize(text: str, classification: Classification) -> SanitizedText:
     If classification is below CONFIDENTIAL, returns the original text
     unchanged with an empty replacements dict — zero overhead for public data.
     """
-    if classification < _SANITIZE_THRESHOLD:
-        return SanitizedText(text=text, replacements={})
-
-    result = text
-    replacements: dict[str, str] = {}
+    redactor = _Redactor()
+    return SanitizedText(text=redactor.redact(text, classification), replacements=redactor.replacements)
 
-    for label, pattern in _REDACT_RULES:
-        counter = [0]  # mutable container — closures can't rebind plain ints
 
-        def replacer(match, _label=label, _counter=counter):
-            placeholder = f"__{_label}_{_counter[0]}__"
-            replacements[placeholder] = match.group(0)
-            _counter[0] += 1
-            return placeholder
+def sanitize_many(texts: list[str], classifications: list[Classification]) -> SanitizedBatch:
+    """Sanitize several texts destined for one prompt.
 
-        result = pattern.sub(replacer, result)
-
-    return SanitizedText(text=result, replacements=replacements)
+    Placeholders are numbered across the whole batch: __SSN_0__ means the same
+    value in every text, and one replacements dict covers them all. Each text
+    is still gated on its own classification.
+    """
+    if len(texts) != len(classifications):
+        raise ValueError("texts and classifications must have the same length")
+    redactor = _Redactor()
+    sanitized = [redactor.redact(t, c) for t, c in zip(texts, classifications)]
+    return SanitizedBatch(texts=sanitized, replacements=redactor.replacements)
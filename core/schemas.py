@@ -27,8 +27,65 @@ class IngestResponse(BaseModel):
     score: float | None = None
 
 
+class BulkIngestResult(BaseModel):
+    line: int
+    status: str
+    id: str | None = None
+    score: float | None = None
+    error: str | None = None
+
+
+class BulkIngestResponse(BaseModel):
+    results: list[BulkIngestResult]
+    counts: dict[str, int]
+
+
+class AuditLogEntry(BaseModel):
+    id: int
+    timestamp: str
+    actor: str
+    action: str
+    resource_id: str = ""
+    matter_id: str = ""
+    details: str = ""
+    entry_hash: str
+
+
+class AuditLogsResponse(BaseModel):
+    logs: list[AuditLogEntry]
+    next_before_id: int | None = None
+
+
 class AuditVerifyResponse(BaseModel):
     valid: bool
     entries_checked: int | None = None
     first_failed_id: int | None = None
+    first_failed_checkpoint: int | None = None
+    first_failed_segment: int | None = None
+    checkpoint_id: int | None = None
+    segments_checked: int | None = None
+    pruned: bool | None = None
     error: str | None = None
+
+
+class MerkleRootResponse(BaseModel):
+    tree_size: int
+    root_hash: str
+
+
+class MerkleInclusionResponse(BaseModel):
+    entry_id: int
+    leaf_index: int
+    tree_size: int
+    entry_hash: str | None = None
+    leaf_hash: str
+    proof: list[str]
+    root_hash: str
+
+
+class MerkleConsistencyResponse(BaseModel):
+    old_size: int
+    new_size: int
+    old_root: str
+    new_root: str
+    proof: list[str]
@@ -0,0 +1,84 @@
+"""
+core/sqlite_db.py — Shared SQLite access layer for the small registries.
+
+The user registry, matter registry and Gmail idempotency table used to open a
+fresh connection (and re-run their CREATE TABLE DDL) on every call. On the
+smallest endpoints that connect + DDL dominated latency.
+
+This module keeps ONE connection per (thread, database path) and reuses it:
+    - connect cost and PRAGMA setup are paid once per thread
+    - sqlite3's per-connection statement cache (cached_statements) means
+      repeated queries reuse their prepared statement instead of re-parsing
+    - connections never cross threads, so no check_same_thread games
+
+Schema DDL runs once per path per process via ensure_schema().
+
+Paths are resolved on every call, not captured at import, so tests that
+monkeypatch a module's DB_PATH get a separate connection automatically.
+
+Usage:
+    from core.sqlite_db import ensure_schema, get_connection
+
+    ensure_schema(DB_PATH, _SCHEMA)
+    with get_connection(DB_PATH) as conn:     # commits / rolls back, never closes
+        conn.execute("INSERT ...")
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",        # readers never block the writer
+    "PRAGMA synchronous=NORMAL",      # safe with WAL; fsync at checkpoint only
+    "PRAGMA busy_timeout=5000",       # wait out a concurrent writer instead of failing
+    "PRAGMA cache_size=-8000",        # 8 MB page cache per connection
+    "PRAGMA mmap_size=67108864",      # 64 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+)
+_STATEMENT_CACHE = 256
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_initialised: set[tuple[str, str]] = set()
+
+
+def get_connection(path: str) -> sqlite3.Connection:
+    """Return this thread's connection to `path`, opening it on first use.
+
+    Rows come back as sqlite3.Row (index- and name-addressable).
+    """
+    conns: dict[str, sqlite3.Connection] = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        conn = sqlite3.connect(path, cached_statements=_STATEMENT_CACHE)
+        conn.row_factory = sqlite3.Row
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        conns[path] = conn
+    return conn
+
+
+def ensure_schema(path: str, ddl: str) -> None:
+    """Run `ddl` (a script of idempotent CREATE ... IF NOT EXISTS) once per path."""
+    marker = (path, hashlib.sha256(ddl.encode()).hexdigest())
+    if marker in _initialised:
+        return
+    with _schema_lock:
+        if marker in _initialised:
+            return
+        get_connection(path).executescript(ddl)
+        _initialised.add(marker)
+
+
+def close_thread_connections() -> None:
+    """Close every connection the calling thread holds (shutdown, tests)."""
+    conns = getattr(_local, "conns", None) or {}
+    for conn in conns.values():
+        conn.close()
+    conns.clear()
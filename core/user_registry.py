@@ -6,19 +6,52 @@ to an isolated per-test path without touching the real database.
 
 Key storage: SHA256(raw_key) — the raw key is NEVER persisted. It is returned
 once on user creation and must be stored by the caller.
+
+Key lookups are cached in-process (key hash → User, including misses) for
+USER_CACHE_TTL seconds, so authenticating a request is a dict lookup.
+Every function that writes the users table invalidates the cache.
+
+Connections come from core.sqlite_db (one per thread, reused), and the
+schema DDL runs once per DB_PATH rather than on every create/list call.
 """
 import os
+import threading
+import time
 import uuid
 import hashlib
 import sqlite3
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+from core.sqlite_db import ensure_schema, get_connection
+
 # Module-level path: readable by _get_conn() dynamically so monkeypatching
 # (ur.DB_PATH = tmp_path) works correctly in tests.
 DB_PATH: str = os.getenv("USERS_DB_PATH", "data/dbs/users.db")
 
+# Bounds how long a change made outside this process (another worker, the
+# sqlite3 CLI) can go unnoticed. In-process writes invalidate immediately.
+USER_CACHE_TTL: float = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_ENTRIES = 1024
+
+# (DB_PATH, key_hash) → (expires_at, User | None). DB_PATH is part of the key
+# so a monkeypatched per-test database never sees another test's entries.
+_key_cache: OrderedDict[tuple[str, str], tuple[float, Optional["User"]]] = OrderedDict()
+_key_cache_lock = threading.Lock()
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        id            TEXT PRIMARY KEY,
+        api_key_hash  TEXT UNIQUE NOT NULL,
+        role          TEXT NOT NULL DEFAULT 'user',
+        display_name  TEXT NOT NULL DEFAULT '',
+        created_at    TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_users_api_key ON users(api_key_hash);
+"""
+
 
 @dataclass
 class User:
@@ -30,35 +63,35 @@ class User:
 # ─── Internal helpers ─────────────────────────────────────────────────────────
 
 def _get_conn() -> sqlite3.Connection:
-    dir_name = os.path.dirname(DB_PATH)
-    if dir_name:
-        os.makedirs(dir_name, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """This thread's shared connection. Use as `with _get_conn() as conn:` —
+    the block commits (or rolls back) but leaves the connection open."""
+    return get_connection(DB_PATH)
 
 
 def _hash_key(raw_key: str) -> str:
     return hashlib.sha256(raw_key.encode()).hexdigest()
 
 
+def invalidate_user_cache(user_id: str | None = None) -> None:
+    """Forget cached key lookups — for one user, or all (incl. cached misses).
+
+    Call after any write to the users table. Misses are always dropped: a
+    key that failed a moment ago may belong to the user just created.
+    """
+    with _key_cache_lock:
+        if user_id is None:
+            _key_cache.clear()
+            return
+        for cache_key, (_, user) in list(_key_cache.items()):
+            if user is None or user.id == user_id:
+                del _key_cache[cache_key]
+
+
 # ─── Public API ───────────────────────────────────────────────────────────────
 
 def init_user_db() -> None:
-    """Create the users table and index if they don't exist."""
-    with _get_conn() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id            TEXT PRIMARY KEY,
-                api_key_hash  TEXT UNIQUE NOT NULL,
-                role          TEXT NOT NULL DEFAULT 'user',
-                display_name  TEXT NOT NULL DEFAULT '',
-                created_at    TEXT NOT NULL
-            )
-        """)
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_users_api_key ON users(api_key_hash)"
-        )
+    """Create the users table and index if they don't exist (once per DB_PATH)."""
+    ensure_schema(DB_PATH, _SCHEMA)
 
 
 def bootstrap_admin(user_id: str, raw_api_key: str) -> None:
@@ -78,19 +111,32 @@ def bootstrap_admin(user_id: str, raw_api_key: str) -> None:
                 "VALUES (?, ?, 'admin', 'Admin', ?)",
                 (user_id, key_hash, str(datetime.now()))
             )
+    invalidate_user_cache(user_id)
 
 
 def get_user_by_key(raw_key: str) -> Optional[User]:
     """Look up a user by their raw API key. Returns None if not found."""
-    key_hash = _hash_key(raw_key)
+    cache_key = (DB_PATH, _hash_key(raw_key))
+    now = time.monotonic()
+    with _key_cache_lock:
+        cached = _key_cache.get(cache_key)
+        if cached is not None and cached[0] > now:
+            _key_cache.move_to_end(cache_key)
+            return cached[1]
+
     with _get_conn() as conn:
         row = conn.execute(
             "SELECT id, role, display_name FROM users WHERE api_key_hash = ?",
-            (key_hash,)
+            (cache_key[1],)
         ).fetchone()
-    if row is None:
-        return None
-    return User(id=row["id"], role=row["role"], display_name=row["display_name"])
+    user = None if row is None else User(id=row["id"], role=row["role"], display_name=row["display_name"])
+
+    with _key_cache_lock:
+        _key_cache[cache_key] = (now + USER_CACHE_TTL, user)
+        _key_cache.move_to_end(cache_key)
+        while len(_key_cache) > USER_CACHE_MAX_ENTRIES:
+            _key_cache.popitem(last=False)
+    return user
 
 
 def create_user(display_name: str, role: str = "user") -> tuple[str, str]:
@@ -107,6 +153,7 @@ def create_user(display_name: str, role: str = "user") -> tuple[str, str]:
             "VALUES (?, ?, ?, ?, ?)",
             (user_id, _hash_key(raw_key), role, display_name, str(datetime.now()))
         )
+    invalidate_user_cache(user_id)
     return user_id, raw_key
 
 
@@ -0,0 +1,138 @@
+"""
+scripts/bench_quantization.py — Recall and latency of quantized search.
+
+Loads the same synthetic embeddings into three scratch collections (no
+quantization, scalar int8, binary), computes exact top-k neighbours with a
+full scan of the unquantized one, then reports recall@k and p50/p95 search
+latency for each mode across oversampling factors, with and without
+rescoring. Needs a running Qdrant; the scratch collections are dropped at
+the end unless --keep is given.
+
+    python scripts/bench_quantization.py [--points 20000] [--queries 200] [--k 10]
+                                         [--dim 768] [--host localhost] [--keep]
+
+Vectors are drawn around a few hundred random centroids, which is closer to
+real embedding clusters than uniform noise (where every method looks bad).
+Recall on your own data will differ — rerun against a copy if it matters.
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qdrant_client import QdrantClient  # noqa: E402
+from qdrant_client.http import models  # noqa: E402
+
+from core.collection_manager import quantization_config  # noqa: E402
+
+_PREFIX = "bench_quant_"
+_MODES = ("none", "scalar", "binary")
+_OVERSAMPLING = (1.0, 2.0, 4.0)
+_UPLOAD_BATCH = 512
+
+
+def _normalize(v: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in v)) or 1.0
+    return [x / norm for x in v]
+
+
+def make_vectors(n: int, dim: int, rng: random.Random, centroids: list[list[float]]) -> list[list[float]]:
+    vectors = []
+    for _ in range(n):
+        c = rng.choice(centroids)
+        vectors.append(_normalize([x + rng.gauss(0, 0.35) for x in c]))
+    return vectors
+
+
+def _create(qdrant, name: str, dim: int, mode: str, vectors: list[list[float]]) -> None:
+    quantization = quantization_config(mode)
+    if qdrant.collection_exists(name):
+        qdrant.delete_collection(name)
+    qdrant.create_collection(
+        collection_name=name,
+        vectors_config=models.VectorParams(
+            size=dim, distance=models.Distance.COSINE, on_disk=quantization is not None
+        ),
+        quantization_config=quantization,
+    )
+    for start in range(0, len(vectors), _UPLOAD_BATCH):
+        batch = vectors[start:start + _UPLOAD_BATCH]
+        qdrant.upsert(
+            collection_name=name,
+            points=[models.PointStruct(id=start + i, vector=v) for i, v in enumerate(batch)],
+            wait=False,
+        )
+    while qdrant.get_collection(name).status != models.CollectionStatus.GREEN:
+        time.sleep(1)
+
+
+def _ids(qdrant, name: str, query: list[float], k: int, params) -> list[int]:
+    result = qdrant.query_points(collection_name=name, query=query, limit=k, search_params=params, with_payload=False)
+    return [p.id for p in result.points]
+
+
+def _run(qdrant, name: str, queries, truth, k: int, params) -> tuple[float, float, float]:
+    recalls, latencies = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = _ids(qdrant, name, query, k, params)
+        latencies.append(time.perf_counter() - start)
+        recalls.append(len(set(found) & expected) / k)
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return statistics.mean(recalls), statistics.median(latencies), p95
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--host", default=os.getenv("QDRANT_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--keep", action="store_true", help="leave the scratch collections in place")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    centroids = [_normalize([rng.gauss(0, 1) for _ in range(args.dim)]) for _ in range(256)]
+    vectors = make_vectors(args.points, args.dim, rng, centroids)
+    queries = make_vectors(args.queries, args.dim, rng, centroids)
+
+    qdrant = QdrantClient(host=args.host, port=args.port, timeout=120)
+    for mode in _MODES:
+        print(f"loading {args.points} x {args.dim} into {_PREFIX}{mode} ...")
+        _create(qdrant, _PREFIX + mode, args.dim, mode, vectors)
+
+    exact = models.SearchParams(exact=True)
+    truth = [set(_ids(qdrant, _PREFIX + "none", q, args.k, exact)) for q in queries]
+
+    print(f"\n{'mode':>7} {'oversample':>10} {'rescore':>7} {'recall@' + str(args.k):>9} {'p50 ms':>7} {'p95 ms':>7}")
+    try:
+        recall, p50, p95 = _run(qdrant, _PREFIX + "none", queries, truth, args.k, None)
+        print(f"{'none':>7} {'-':>10} {'-':>7} {recall:9.3f} {p50 * 1e3:7.2f} {p95 * 1e3:7.2f}")
+        for mode in _MODES[1:]:
+            for oversampling in _OVERSAMPLING:
+                for rescore in (False, True):
+                    params = models.SearchParams(
+                        quantization=models.QuantizationSearchParams(oversampling=oversampling, rescore=rescore)
+                    )
+                    recall, p50, p95 = _run(qdrant, _PREFIX + mode, queries, truth, args.k, params)
+                    print(
+                        f"{mode:>7} {oversampling:10.1f} {str(rescore):>7} "
+                        f"{recall:9.3f} {p50 * 1e3:7.2f} {p95 * 1e3:7.2f}"
+                    )
+    finally:
+        if not args.keep:
+            for mode in _MODES:
+                qdrant.delete_collection(_PREFIX + mode)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 #!/bin/bash
 # lint_imports.sh — Fail if any .py file outside the allowlist bypasses the NetworkGateway.
-# Checks both raw `import requests` and direct `from ollama import Client` usage.
+# Checks raw `import requests` / `import httpx` and direct `from ollama import Client` usage.
 # Run as a pre-commit check or in CI: bash scripts/lint_imports.sh
 
 set -euo pipefail
@@ -8,7 +8,7 @@ set -euo pipefail
 FAIL=0
 
 # ── Check 1: raw requests import ─────────────────────────────────────────────
-REQUESTS_VIOLATIONS=$(grep -r "import requests" --include="*.py" \
+REQUESTS_VIOLATIONS=$(grep -rE "import (requests|httpx)" --include="*.py" \
   --exclude-dir=venv \
   --exclude-dir=auth_venv \
   --exclude-dir=.git \
@@ -19,7 +19,7 @@ REQUESTS_VIOLATIONS=$(grep -r "import requests" --include="*.py" \
   || true)
 
 if [ -n "$REQUESTS_VIOLATIONS" ]; then
-  echo "❌ Direct 'import requests' found outside core/network_gateway.py:"
+  echo "❌ Direct 'import requests' / 'import httpx' found outside core/network_gateway.py:"
   echo "$REQUESTS_VIOLATIONS"
   echo "   Use 'from core.network_gateway import gateway' instead."
   echo ""
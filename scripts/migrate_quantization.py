@@ -0,0 +1,60 @@
+"""
+scripts/migrate_quantization.py — Enable, change or disable quantization on
+an existing Qdrant collection, in place.
+
+No re-upload and no downtime: Qdrant builds the quantized copy (and moves
+the original vectors to disk) segment by segment in the background while
+the collection keeps serving searches. --wait blocks until the optimizer
+reports the collection green again.
+
+    python scripts/migrate_quantization.py second_brain --mode scalar [--wait]
+    python scripts/migrate_quantization.py doc_knowledge --mode none
+
+New collections pick their mode from QDRANT_QUANTIZATION at creation; this
+is for collections created before it was set.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qdrant_client import QdrantClient  # noqa: E402
+from qdrant_client.http import models  # noqa: E402
+
+from core.collection_manager import COLLECTIONS, QUANTIZATION_MODES, set_quantization  # noqa: E402
+
+
+def _wait_until_green(qdrant, name: str, poll_seconds: float = 2.0) -> None:
+    while True:
+        info = qdrant.get_collection(name)
+        if info.status == models.CollectionStatus.GREEN:
+            return
+        print(f"  {name}: {info.status}, {info.indexed_vectors_count or 0}/{info.points_count or 0} indexed")
+        time.sleep(poll_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("collection", choices=sorted(COLLECTIONS))
+    parser.add_argument("--mode", choices=QUANTIZATION_MODES, required=True)
+    parser.add_argument("--host", default=os.getenv("QDRANT_HOST", "qdrant"))
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--wait", action="store_true", help="block until the rebuild has finished")
+    args = parser.parse_args()
+
+    qdrant = QdrantClient(host=args.host, port=args.port)
+    if not qdrant.collection_exists(args.collection):
+        raise SystemExit(f"Collection {args.collection} does not exist")
+
+    before = qdrant.get_collection(args.collection).config.quantization_config
+    set_quantization(qdrant, args.collection, args.mode)
+    print(f"{args.collection}: quantization {before or 'none'} -> {args.mode}")
+    if args.wait:
+        _wait_until_green(qdrant, args.collection)
+        print(f"{args.collection}: optimizer finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+sensors/inbox_watcher.py — Wake the ingestor when something lands in the inbox.
+
+Two implementations behind one interface:
+    InotifyWatcher  — Linux. Blocks in select() on an inotify fd, so an idle
+                      inbox costs zero wakeups and a drop is seen within ms.
+    PollingWatcher  — Everywhere else (macOS launchd installs, exotic mounts).
+                      Same behaviour as the old fixed-interval loop.
+
+Both expose:
+    wait(timeout)  → True if the inbox may have changed, False on timeout.
+    drain()        → discard queued events (after a backoff sleep, the next
+                     scan covers them anyway).
+    close()
+
+Only the inbox itself is watched (not processed/ or failed/), and only for
+events that mean "a file arrived or was written" — the ingestor moving files
+out never wakes it up.
+
+Usage:
+    watcher = make_watcher(INBOX_DIR)
+    while True:
+        scan_inbox()
+        watcher.wait(timeout=None)
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import time
+
+logger = logging.getLogger(__name__)
+
+# <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+
+class PollingWatcher:
+    """Fixed-interval fallback: every wait() sleeps, then reports a change."""
+
+    mode = "poll"
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+
+    def wait(self, timeout: float | None = None) -> bool:
+        time.sleep(self._interval if timeout is None else min(timeout, self._interval))
+        return True
+
+    def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """inotify on a single directory, via libc — no third-party dependency.
+
+    After the first event, wait() keeps reading until the directory has been
+    quiet for debounce seconds, so a burst of writes to one file (or a drop
+    of many files) produces a single wake-up rather than one per write().
+    """
+
+    mode = "inotify"
+
+    def __init__(self, path: str, debounce: float = 0.05) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(fd, os.fsencode(path), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, f"inotify_add_watch failed for {path}")
+        self._fd = fd
+        self._debounce = debounce
+
+    def _read_pending(self) -> bool:
+        got = False
+        while True:
+            try:
+                if not os.read(self._fd, 65536):
+                    return got
+                got = True
+            except BlockingIOError:
+                return got
+
+    def wait(self, timeout: float | None = None) -> bool:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        self._read_pending()
+        while select.select([self._fd], [], [], self._debounce)[0]:
+            self._read_pending()
+        return True
+
+    def drain(self) -> None:
+        self._read_pending()
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def make_watcher(path: str, mode: str = "auto", poll_interval: float = 5, debounce: float = 0.05):
+    """Return an InotifyWatcher where possible, else a PollingWatcher.
+
+    mode: "auto" (inotify, fall back to polling), "inotify" (raise if
+    unavailable) or "poll".
+    """
+    if mode != "poll":
+        try:
+            return InotifyWatcher(path, debounce=debounce)
+        except (OSError, AttributeError) as e:
+            # AttributeError: libc without inotify_* symbols (macOS, BSD).
+            if mode == "inotify":
+                raise
+            logger.info("inotify unavailable (%s) — polling every %ss", e, poll_interval)
+    return PollingWatcher(poll_interval)
@@ -4,16 +4,32 @@ import sys
 import time
 import shutil
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-from core.network_gateway import gateway
+import asyncio
 import logging
 import re
-import pypdf
-import docx
-import openpyxl
 from core.identity import get_or_create_identity
+from core.network_gateway import async_gateway
+from sensors import parsers
+from sensors.inbox_watcher import make_watcher
 
 _PDF_PARSE_TIMEOUT = int(os.getenv("PDF_PARSE_TIMEOUT", "30"))  # seconds
 
+# Pipeline sizing. PARSE_WORKERS=0 parses PDF/DOCX/XLSX in-process (threads).
+_PARSE_WORKERS = int(os.getenv("INGESTOR_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+_UPLOAD_CONCURRENCY = int(os.getenv("INGESTOR_UPLOAD_CONCURRENCY", "4"))
+_STAGE_QUEUE_SIZE = 32   # backpressure between stages — parsed text is held in memory
+_PROGRESS_INTERVAL = 5   # seconds between queue-depth log lines on long drops
+
+# "auto" = inotify where the OS supports it, else poll every BASE_SLEEP seconds.
+_WATCH_MODE = os.getenv("INGESTOR_WATCH_MODE", "auto")
+# A file is only picked up once its size and mtime hold still for this long.
+_SETTLE_SECONDS = float(os.getenv("INGESTOR_SETTLE_MS", "50")) / 1000
+# Safety-net rescan while idle in inotify mode (covers a queue overflow).
+_IDLE_RESCAN = 300
+
+BASE_SLEEP = 5
+MAX_SLEEP = 300
+
 current_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.dirname(current_dir)
 
@@ -55,15 +71,11 @@ def extract_document_keys(text: str) -> dict:
             keys[field] = match.group(1).strip()
     return keys
 
-def _parse_pdf(filepath: str, filename: str) -> str:
-    """Extract text from all pages of a PDF. Runs in a thread for timeout enforcement."""
-    reader = pypdf.PdfReader(filepath)
-    parts = [page.extract_text() or "" for page in reader.pages]
-    return f"File '{filename}': " + "\n".join(parts)
+_parse_pdf = parsers.parse_pdf  # module-level name so the inline timeout path is patchable
 
 
 def extract_text(filepath):
-    """Smart text extractor for PDF and Text files."""
+    """Smart text extractor for PDF and Text files. Inline path — no process pool."""
     filename = os.path.basename(filepath)
     ext = os.path.splitext(filename)[1].lower()
 
@@ -79,33 +91,7 @@ def extract_text(filepath):
                 logger.error(f"PDF parse timed out after {_PDF_PARSE_TIMEOUT}s: {filename}")
                 pool.shutdown(wait=False)  # don't block — thread may still be running
                 return None
-            
-        elif ext == '.docx':
-            doc = docx.Document(filepath)
-            text = "\n".join(p.text for p in doc.paragraphs if p.text.strip())
-            return f"File '{filename}': {text}"
-
-        elif ext == '.xlsx':
-            wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
-            parts = []
-            for sheet in wb.worksheets:
-                rows = []
-                for row in sheet.iter_rows():
-                    cells = [str(cell.value) for cell in row if cell.value is not None]
-                    if cells:
-                        rows.append("\t".join(cells))
-                if rows:
-                    parts.append(f"[Sheet: {sheet.title}]\n" + "\n".join(rows))
-            wb.close()
-            return f"File '{filename}':\n" + "\n\n".join(parts) if parts else None
-
-        elif ext in ['.txt', '.md', '.py', '.js', '.ts', '.csv', '.json',
-                     '.yaml', '.yml', '.html', '.xml', '.rst']:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                return f"File '{filename}': {f.read()}"
-
-        else:
-            return None
+        return parsers.parse_file(filepath)
     except Exception as e:
         logger.error(f"Failed to read {filename}: {e}")
         return None
@@ -158,55 +144,144 @@ def _quarantine(filepath: str, reason: str) -> None:
         logger.error("   Could not quarantine %s: %s", filename, e)
 
 
-def scan_inbox():
-    if not os.path.exists(INBOX_DIR):
-        logger.error("Inbox directory not found: %s", INBOX_DIR)
-        return
+def _settled_files(files: list[str]) -> list[str]:
+    """Return the files whose size and mtime did not change over _SETTLE_SECONDS.
+
+    One stat sweep, one sleep, one more sweep — a half-written drop (large
+    copy, slow network share) is left for the next wake-up instead of being
+    parsed truncated.
+    """
+    def _snapshot() -> dict:
+        seen = {}
+        for filename in files:
+            try:
+                st = os.stat(os.path.join(INBOX_DIR, filename))
+                seen[filename] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                pass  # already gone
+        return seen
+
+    before = _snapshot()
+    if _SETTLE_SECONDS > 0:
+        time.sleep(_SETTLE_SECONDS)
+    after = _snapshot()
+    settled = [f for f in files if f in after and before.get(f) == after[f]]
+    for filename in files:
+        if filename in after and filename not in settled:
+            logger.info("Still being written, will retry: %s", filename)
+    return settled
+
+
+def _inbox_files() -> list[str]:
+    return [
+        f for f in os.listdir(INBOX_DIR)
+        if not f.startswith(".") and os.path.isfile(os.path.join(INBOX_DIR, f))
+    ]
+
+
+_parse_pool: parsers.ParsePool | None = None
+
+
+def _get_parse_pool() -> parsers.ParsePool | None:
+    global _parse_pool
+    if _PARSE_WORKERS <= 0:
+        return None
+    if _parse_pool is None:
+        _parse_pool = parsers.ParsePool(_PARSE_WORKERS)
+    return _parse_pool
+
+
+class _Stage:
+    """Counters for one pipeline stage, for queue-depth / throughput logging."""
+
+    def __init__(self, name: str, queue: asyncio.Queue | None = None) -> None:
+        self.name = name
+        self.queue = queue
+        self.done = 0
+        self.started = time.monotonic()
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        depth = f", queue={self.queue.qsize()}" if self.queue is not None else ""
+        return f"{self.name}: {self.done} done{depth}, {rate:.1f}/s"
+
 
+async def _pooled_parse(pool: parsers.ParsePool, filepath: str) -> str | None:
+    """Parse in the process pool. Like extract_text, a document the parser
+    cannot read comes back as None (quarantined as "unsupported"); only a
+    timeout raises."""
     try:
-        files = [f for f in os.listdir(INBOX_DIR) if os.path.isfile(os.path.join(INBOX_DIR, f))]
+        return await pool.run(parsers.parse_file, filepath, timeout=_PDF_PARSE_TIMEOUT)
+    except parsers.ParseTimeout:
+        raise
     except Exception as e:
-        logger.error("Error reading inbox: %s", e)
-        return
+        logger.error("Failed to read %s: %s", os.path.basename(filepath), e)
+        return None
 
-    if not files:
-        return
 
-    had_error = False
-    for filename in files:
-        if filename.startswith("."):
-            continue
+async def _parse_stage(files: list[str], out: asyncio.Queue, stage: _Stage) -> None:
+    pool = _get_parse_pool()
+    slots = asyncio.Semaphore(pool.workers if pool else 4)
 
+    async def _one(filename: str) -> None:
         filepath = os.path.join(INBOX_DIR, filename)
-        size_kb = os.path.getsize(filepath) / 1024
         ext = os.path.splitext(filename)[1].lower()
-        logger.info("Detected: %s (%.1f KB, type=%s)", filename, size_kb, ext or "none")
+        async with slots:
+            try:
+                size_kb = os.path.getsize(filepath) / 1024
+            except OSError:
+                return  # removed since the scan
+            logger.info("Detected: %s (%.1f KB, type=%s)", filename, size_kb, ext or "none")
 
-        t0 = time.monotonic()
-        try:
-            content = extract_text(filepath)
-        except Exception as e:
-            logger.error("   Parse error for %s: %s", filename, e)
-            _quarantine(filepath, "parse_error")
-            continue
+            t0 = time.monotonic()
+            try:
+                if pool and ext in parsers.HEAVY_EXTENSIONS:
+                    content = await _pooled_parse(pool, filepath)
+                else:
+                    content = await asyncio.to_thread(extract_text, filepath)
+            except parsers.ParseTimeout:
+                logger.error("   Parse timed out after %ss: %s", _PDF_PARSE_TIMEOUT, filename)
+                _quarantine(filepath, "parse_timeout")
+                return
+            except Exception as e:
+                logger.error("   Parse error for %s: %s", filename, e)
+                _quarantine(filepath, "parse_error")
+                return
         parse_ms = int((time.monotonic() - t0) * 1000)
+        stage.done += 1
 
         if content is None:
             logger.warning("   Unsupported file type: %s (%.0f ms)", filename, parse_ms)
             _quarantine(filepath, "unsupported")
-            continue
+            return
 
-        logger.info("   Parsed in %d ms, %d chars", parse_ms, len(content))
+        logger.info("   Parsed %s in %d ms, %d chars", filename, parse_ms, len(content))
+        await out.put((filename, content))
+
+    await asyncio.gather(*(_one(f) for f in files))
+
+
+async def _keys_stage(inp: asyncio.Queue, out: asyncio.Queue, stage: _Stage) -> None:
+    while (item := await inp.get()) is not None:
+        filename, content = item
+        keys = extract_document_keys(content)
+        if keys:
+            logger.info("   Keys extracted for %s: %s", filename, keys)
+        else:
+            logger.warning("   No structured keys found in %s — falling back to content hash", filename)
+        stage.done += 1
+        await out.put((filename, content, keys, _build_embed_text(keys)))
 
-        try:
-            keys = extract_document_keys(content)
-            embed_text = _build_embed_text(keys)
-            if keys:
-                logger.info("   Keys extracted: %s", keys)
-            else:
-                logger.warning("   No structured keys found — falling back to content hash")
 
-            res = gateway.post("brain", "/ingest", json={
+async def _upload_stage(inp: asyncio.Queue, stage: _Stage) -> bool:
+    """Post to the Brain; True if any upload hit an API or connection error."""
+    had_error = False
+    while (item := await inp.get()) is not None:
+        filename, content, keys, embed_text = item
+        filepath = os.path.join(INBOX_DIR, filename)
+        try:
+            res = await async_gateway.post("brain", "/ingest", json={
                 "text": content,
                 "user_id": LOCAL_USER_ID,
                 "type": "file_ingest",
@@ -219,7 +294,7 @@ def scan_inbox():
                 if body.get("status") == "duplicate_skipped":
                     logger.warning("   Duplicate skipped (already stored): %s", filename)
                 else:
-                    logger.info("   Ingested as new memory (id=%s)", body.get("id", "?"))
+                    logger.info("   Ingested %s as new memory (id=%s)", filename, body.get("id", "?"))
 
                 destination = os.path.join(PROCESSED_DIR, filename)
                 if os.path.exists(destination):
@@ -228,7 +303,7 @@ def scan_inbox():
                     destination = os.path.join(PROCESSED_DIR, f"{root}_{timestamp}{ext}")
 
                 shutil.move(filepath, destination)
-                logger.info("   -> Moved to processed/")
+                logger.info("   -> Moved %s to processed/", filename)
             else:
                 logger.error("   API error %s for %s — will retry next poll", res.status_code, filename)
                 had_error = True
@@ -236,9 +311,120 @@ def scan_inbox():
         except Exception as e:
             logger.error("   Connection failed (Is the Brain online?): %s", e)
             had_error = True
-
+        stage.done += 1
     return had_error
 
+
+async def _run_pipeline(files: list[str]) -> bool:
+    """parse (process pool) → key extraction → bounded concurrent upload.
+
+    Stages are joined by bounded queues, so a slow Brain backs pressure up
+    into parsing instead of piling parsed documents up in memory.
+    """
+    uploaders = max(_UPLOAD_CONCURRENCY, 1)
+    parsed: asyncio.Queue = asyncio.Queue(_STAGE_QUEUE_SIZE)
+    keyed: asyncio.Queue = asyncio.Queue(_STAGE_QUEUE_SIZE)
+    stages = [_Stage("parse"), _Stage("keys", parsed), _Stage("upload", keyed)]
+
+    async def _parse_then_close() -> None:
+        await _parse_stage(files, parsed, stages[0])
+        await parsed.put(None)
+
+    async def _keys_then_close() -> None:
+        await _keys_stage(parsed, keyed, stages[1])
+        for _ in range(uploaders):   # one stop sentinel per upload worker
+            await keyed.put(None)
+
+    async def _progress() -> None:
+        while True:
+            await asyncio.sleep(_PROGRESS_INTERVAL)
+            logger.info("Pipeline — " + " | ".join(s.summary() for s in stages))
+
+    monitor = asyncio.create_task(_progress())
+    try:
+        results = await asyncio.gather(
+            _parse_then_close(),
+            _keys_then_close(),
+            *(_upload_stage(keyed, stages[2]) for _ in range(uploaders)),
+        )
+    finally:
+        monitor.cancel()
+        await async_gateway.aclose()
+    if len(files) > 1:
+        logger.info("Pipeline done — " + " | ".join(s.summary() for s in stages))
+    return any(results[2:])
+
+
+def scan_inbox():
+    if not os.path.exists(INBOX_DIR):
+        logger.error("Inbox directory not found: %s", INBOX_DIR)
+        return
+
+    try:
+        files = _inbox_files()
+    except Exception as e:
+        logger.error("Error reading inbox: %s", e)
+        return
+
+    if not files:
+        return
+
+    settled = _settled_files(files)
+    if not settled:
+        return False
+    return asyncio.run(_run_pipeline(settled))
+
+def _inbox_snapshot() -> dict:
+    """{filename: (size, mtime)} for the files waiting in the inbox."""
+    snapshot = {}
+    for filename in _inbox_files():
+        try:
+            st = os.stat(os.path.join(INBOX_DIR, filename))
+        except OSError:
+            continue
+        snapshot[filename] = (st.st_size, st.st_mtime_ns)
+    return snapshot
+
+
+def watch_inbox(watcher) -> None:
+    """Scan on every watcher wake-up; back off exponentially on API errors.
+
+    During a backoff the loop sleeps unconditionally — a fresh drop must not
+    cut the backoff short and hammer a Brain that is down. Files still being
+    written are retried after a short settle interval. Files left behind
+    unchanged by a scan (e.g. a quarantine move failed) are retried with an
+    exponentially growing interval instead; any change in the inbox, or a
+    watcher event, retries straight away.
+    """
+    consecutive_errors = 0
+    stuck_rounds = 0
+    last_pending: dict = {}
+    while True:
+        had_error = scan_inbox()
+        if had_error:
+            consecutive_errors += 1
+            sleep_for = min(BASE_SLEEP * (2 ** consecutive_errors), MAX_SLEEP)
+            logger.warning(f"API errors detected. Backing off for {sleep_for}s (attempt {consecutive_errors})")
+            time.sleep(sleep_for)
+            watcher.drain()
+            continue
+
+        consecutive_errors = 0
+        try:
+            pending = _inbox_snapshot()
+        except OSError:
+            pending = {}
+        if not pending:
+            stuck_rounds, timeout = 0, _IDLE_RESCAN
+        else:
+            # Unchanged since the last scan: nothing is being written, the
+            # scan just could not get rid of these files. Don't spin on them.
+            stuck_rounds = stuck_rounds + 1 if pending == last_pending else 0
+            timeout = min(max(_SETTLE_SECONDS, 0.1) * 2 ** stuck_rounds, MAX_SLEEP)
+        last_pending = pending
+        watcher.wait(timeout=timeout)
+
+
 def _handle_shutdown(sig, frame):
     logger.info(f"Received signal {sig}. File watcher shutting down cleanly.")
     sys.exit(0)
@@ -247,23 +433,17 @@ if __name__ == "__main__":
     signal.signal(signal.SIGTERM, _handle_shutdown)
     signal.signal(signal.SIGINT, _handle_shutdown)
 
+    watcher = make_watcher(INBOX_DIR, mode=_WATCH_MODE, poll_interval=BASE_SLEEP)
+
     print("------------------------------------------------")
-    logger.info(f"File Watcher Active.")
+    logger.info(f"File Watcher Active ({watcher.mode}).")
     logger.info(f"Watching: {INBOX_DIR}")
     logger.info(f"Drop files there to ingest them.")
     print("------------------------------------------------")
-    
-    BASE_SLEEP = 5
-    MAX_SLEEP = 300
-    consecutive_errors = 0
 
-    while True:
-        had_error = scan_inbox()
-        if had_error:
-            consecutive_errors += 1
-            sleep_for = min(BASE_SLEEP * (2 ** consecutive_errors), MAX_SLEEP)
-            logger.warning(f"API errors detected. Backing off for {sleep_for}s (attempt {consecutive_errors})")
-        else:
-            consecutive_errors = 0
-            sleep_for = BASE_SLEEP
-        time.sleep(sleep_for)
\ No newline at end of file
+    try:
+        watch_inbox(watcher)
+    finally:
+        watcher.close()
+        if _parse_pool is not None:
+            _parse_pool.close()
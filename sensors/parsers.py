@@ -0,0 +1,133 @@
+"""
+sensors/parsers.py — Document text extraction and the parse process pool.
+
+Kept free of network / identity imports so ParsePool workers (which import
+this module, not sensors.ingestor) start fast and carry no Brain state.
+
+parse_file() raises on a broken document and returns None for unsupported
+types; callers decide between quarantine reasons.
+
+ParsePool runs the heavy formats (PDF/DOCX/XLSX) in worker processes:
+    - real parallelism — pypdf and openpyxl are pure Python and hold the GIL
+    - real timeouts — a wedged parse is killed with its worker, not left
+      running as an orphaned thread
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import docx
+import openpyxl
+import pypdf
+
+logger = logging.getLogger(__name__)
+
+HEAVY_EXTENSIONS = {".pdf", ".docx", ".xlsx"}
+PLAIN_EXTENSIONS = {
+    ".txt", ".md", ".py", ".js", ".ts", ".csv", ".json",
+    ".yaml", ".yml", ".html", ".xml", ".rst",
+}
+
+
+class ParseTimeout(Exception):
+    """A document took longer than the parse timeout; its worker was killed."""
+
+
+def parse_pdf(filepath: str, filename: str) -> str:
+    """Extract text from all pages of a PDF."""
+    reader = pypdf.PdfReader(filepath)
+    parts = [page.extract_text() or "" for page in reader.pages]
+    return f"File '{filename}': " + "\n".join(parts)
+
+
+def parse_docx(filepath: str, filename: str) -> str:
+    doc = docx.Document(filepath)
+    text = "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+    return f"File '{filename}': {text}"
+
+
+def parse_xlsx(filepath: str, filename: str) -> str | None:
+    wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+    parts = []
+    for sheet in wb.worksheets:
+        rows = []
+        for row in sheet.iter_rows():
+            cells = [str(cell.value) for cell in row if cell.value is not None]
+            if cells:
+                rows.append("\t".join(cells))
+        if rows:
+            parts.append(f"[Sheet: {sheet.title}]\n" + "\n".join(rows))
+    wb.close()
+    return f"File '{filename}':\n" + "\n\n".join(parts) if parts else None
+
+
+def parse_plain(filepath: str, filename: str) -> str:
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        return f"File '{filename}': {f.read()}"
+
+
+_PARSERS = {".pdf": parse_pdf, ".docx": parse_docx, ".xlsx": parse_xlsx}
+
+
+def parse_file(filepath: str) -> str | None:
+    """Dispatch on extension. Raises on parse failure; None if unsupported."""
+    filename = os.path.basename(filepath)
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in _PARSERS:
+        return _PARSERS[ext](filepath, filename)
+    if ext in PLAIN_EXTENSIONS:
+        return parse_plain(filepath, filename)
+    return None
+
+
+class ParsePool:
+    """Process pool with per-document kill-on-timeout, for use from asyncio.
+
+    Callers must keep at most `workers` calls in flight (the ingestor bounds
+    this with a semaphore), so every submitted parse is actually running and
+    its timeout measures parse time, not queueing time.
+
+    On a timeout the whole executor is torn down — ProcessPoolExecutor cannot
+    kill a single task — and the other in-flight parses, which then fail with
+    BrokenProcessPool, are retried once on the fresh pool.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        if self._executor is not executor:
+            return  # another timed-out task already replaced it
+        self._executor = None
+        # No public API to kill workers before 3.14 (terminate_workers).
+        for proc in list(getattr(executor, "_processes", {}).values()):
+            proc.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn, *args, timeout: float):
+        loop = asyncio.get_running_loop()
+        for attempt in (1, 2):
+            executor = self._get_executor()
+            try:
+                return await asyncio.wait_for(loop.run_in_executor(executor, fn, *args), timeout)
+            except asyncio.TimeoutError:
+                self._recycle(executor)
+                raise ParseTimeout(f"parse exceeded {timeout}s") from None
+            except BrokenProcessPool:
+                # Collateral from another task's timeout (or a worker crash).
+                self._recycle(executor)
+                if attempt == 2:
+                    raise
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
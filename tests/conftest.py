@@ -5,6 +5,7 @@ begins, so all sys.modules entries below are in place before the first import.
 """
 import os
 import sys
+import tempfile
 from unittest.mock import MagicMock
 from fastapi import APIRouter
 
@@ -70,5 +71,18 @@ os.environ.setdefault("ENGRAM_USER_ID", "test-user-uuid-0001")
 # ── Audit log secret (required at agents.logger import time) ──────────────────
 os.environ.setdefault("AUDIT_HMAC_SECRET", "test-audit-hmac-secret-0000000000000000")
 
+# ── SQLite files written at import or by the code under test go to a scratch
+# dir, never the tracked tree's data/dbs/. ──────────────────────────────────
+_TEST_DBS_DIR = tempfile.mkdtemp(prefix="engram-test-dbs-")
+os.environ.setdefault("AUDIT_DB_PATH", os.path.join(_TEST_DBS_DIR, "agent_activity.db"))
+os.environ.setdefault("PROCESSED_EMAILS_DB_PATH", os.path.join(_TEST_DBS_DIR, "processed_emails.db"))
+
 # ── API key: empty string activates dev-mode passthrough in get_current_user ──
 os.environ.setdefault("ENGRAM_API_KEY", "")
+
+# ── Embedding cache off: tests mock the embedding transport per call, and a
+# vector cached by one test would silently skip the next test's mock. ─────────
+os.environ.setdefault("EMBED_CACHE_ENABLED", "0")
+# Same for the answer cache: a reply cached by one test would bypass the next
+# test's LLM mock.
+os.environ.setdefault("ANSWER_CACHE_ENABLED", "0")
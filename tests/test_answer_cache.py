@@ -0,0 +1,192 @@
+"""Tests for core/answer_cache.py, its invalidation hooks and /chat + /v1 cache hits."""
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from cryptography.fernet import Fernet
+from fastapi.testclient import TestClient
+
+from core.answer_cache import AnswerCache, fingerprint
+
+_SCOPE = ("user-1", "", "chat", "llama3.1:latest", "")
+
+
+@pytest.fixture()
+def cache():
+    return AnswerCache(Fernet.generate_key(), threshold=0.95, ttl_seconds=60)
+
+
+def test_similar_query_with_same_retrieval_hits(cache):
+    cache.put(_SCOPE, [1.0, 0.0], fingerprint(["a", "b"]), ["Hello", " world"])
+
+    assert cache.get(_SCOPE, [0.99, 0.05], fingerprint(["b", "a"])) == ["Hello", " world"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_different_retrieval_or_distant_query_misses(cache):
+    cache.put(_SCOPE, [1.0, 0.0], fingerprint(["a"]), ["cached"])
+
+    assert cache.get(_SCOPE, [1.0, 0.0], fingerprint(["a", "new-memory"])) is None
+    assert cache.get(_SCOPE, [0.0, 1.0], fingerprint(["a"])) is None
+    assert cache.get(("user-2", "", "chat", "llama3.1:latest", ""), [1.0, 0.0], fingerprint(["a"])) is None
+
+
+def test_entries_expire(cache, monkeypatch):
+    import core.answer_cache as ac
+    cache.put(_SCOPE, [1.0], fingerprint(["a"]), ["old"])
+    real = ac.time.monotonic
+    monkeypatch.setattr(ac.time, "monotonic", lambda: real() + 61)
+
+    assert cache.get(_SCOPE, [1.0], fingerprint(["a"])) is None
+
+
+def test_answers_are_encrypted_at_rest(cache):
+    cache.put(_SCOPE, [1.0], fingerprint(["a"]), ["secret diagnosis"])
+    blob = cache._scopes[_SCOPE][0][2]
+    assert b"secret" not in blob
+
+
+def test_invalidate_is_scoped_to_user_and_matter(cache):
+    fp = fingerprint(["a"])
+    cache.put(("u1", "m1", "chat", "m", ""), [1.0], fp, ["m1"])
+    cache.put(("u1", "m2", "chat", "m", ""), [1.0], fp, ["m2"])
+    cache.put(("u1", "", "chat", "m", ""), [1.0], fp, ["all"])
+    cache.put(("u2", "m1", "chat", "m", ""), [1.0], fp, ["other user"])
+
+    cache.invalidate("u1", "m1")
+
+    assert cache.get(("u1", "m1", "chat", "m", ""), [1.0], fp) is None
+    assert cache.get(("u1", "", "chat", "m", ""), [1.0], fp) is None   # unscoped search saw m1 too
+    assert cache.get(("u1", "m2", "chat", "m", ""), [1.0], fp) == ["m2"]
+    assert cache.get(("u2", "m1", "chat", "m", ""), [1.0], fp) == ["other user"]
+
+
+def test_put_after_an_invalidation_is_dropped(cache):
+    """An answer generated from memories that changed mid-generation is never stored."""
+    fp = fingerprint(["a"])
+    matter_scope = ("u1", "m1", "chat", "m", "")
+    unscoped = ("u1", "", "chat", "m", "")
+    before = {s: cache.generation(s[0], s[1]) for s in (matter_scope, unscoped)}
+
+    cache.invalidate("u1", "m2")        # another matter: only unscoped answers go stale
+    cache.put(matter_scope, [1.0], fp, ["fresh"], before[matter_scope])
+    cache.put(unscoped, [1.0], fp, ["stale"], before[unscoped])
+
+    assert cache.get(matter_scope, [1.0], fp) == ["fresh"]
+    assert cache.get(unscoped, [1.0], fp) is None
+    assert cache.stats()["stale_puts"] == 1
+
+    generation = cache.generation("u1", "m1")
+    cache.invalidate()
+    cache.put(matter_scope, [1.0], fp, ["stale"], generation)
+    assert cache.get(matter_scope, [1.0], fp) is None
+
+
+# ── EncryptedMemoryClient mutation hooks ──────────────────────────────────────
+
+def test_memory_client_notifies_on_write_and_scoped_delete():
+    from core.memory_client import EncryptedMemoryClient
+    client = EncryptedMemoryClient(MagicMock(), Fernet.generate_key())
+    seen = []
+    client.on_mutation(lambda user_id, matter_id: seen.append((user_id, matter_id)))
+
+    client.write("c", "p1", [0.1], {"user_id": "u1", "matter_id": "m1", "memory": "x"}, "PUBLIC")
+    selector = SimpleNamespace(filter=SimpleNamespace(must=[
+        SimpleNamespace(key="user_id", match=SimpleNamespace(value="u1")),
+    ]))
+    client.delete("c", selector)
+    client.delete("c", SimpleNamespace(points=["p1"]))
+
+    assert seen == [("u1", "m1"), ("u1", None), (None, None)]
+
+
+# ── Endpoint integration ──────────────────────────────────────────────────────
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+def _search_response():
+    response = MagicMock()
+    response.points = [SimpleNamespace(id="p1", score=0.9, payload={"memory": "fact", "classification": "PUBLIC"})]
+    return response
+
+
+@pytest.fixture()
+def live_cache(monkeypatch):
+    cache = AnswerCache(Fernet.generate_key())
+    monkeypatch.setattr("api.chat.answer_cache", cache)
+    monkeypatch.setattr("api.openai_compat.answer_cache", cache)
+    return cache
+
+
+def test_chat_second_ask_is_served_from_cache(live_cache):
+    from core.brain import app
+    client = TestClient(app)
+
+    with patch("api.chat.aget_embedding", return_value=[0.1, 0.2]), \
+         patch("core.retrieval.client.search", return_value=_search_response()), \
+         patch("api.chat.allm.chat", return_value="the answer") as llm, \
+         patch("api.chat.log_agent_action") as audit:
+        first = client.post("/chat", json={"text": "what is the fact?"})
+        second = client.post("/chat", json={"text": "what is the fact?"})
+
+    assert first.json()["reply"] == second.json()["reply"] == "the answer"
+    llm.assert_called_once()
+    assert audit.call_count == 2  # reads are audited even on a cache hit
+
+
+def test_chat_stream_is_cached_and_replayed_as_sse(live_cache):
+    from core.brain import app
+    client = TestClient(app)
+
+    with patch("api.chat.aget_embedding", return_value=[0.1, 0.2]), \
+         patch("core.retrieval.client.search", return_value=_search_response()), \
+         patch("api.chat.allm.stream_chat", return_value=_aiter(["Hi", " there"])) as llm, \
+         patch("api.chat.log_agent_action"):
+        client.post("/chat", json={"text": "hello?", "stream": True})
+        replay = client.post("/chat", json={"text": "hello?", "stream": True})
+
+    events = [json.loads(line[6:]) for line in replay.text.splitlines() if line.startswith("data: ")]
+    assert [e["delta"] for e in events if not e["done"]] == ["Hi", " there"]
+    assert events[-1]["done"] is True and events[-1]["context_used"]
+    llm.assert_called_once()
+
+
+def test_chat_stream_cut_off_midway_is_not_cached(live_cache):
+    from core.brain import app
+    client = TestClient(app)
+
+    async def cut_off(*args, **kwargs):
+        yield "Hal"
+        raise ConnectionError("Ollama stream ended before done")
+
+    with patch("api.chat.aget_embedding", return_value=[0.1, 0.2]), \
+         patch("core.retrieval.client.search", return_value=_search_response()), \
+         patch("api.chat.allm.stream_chat", side_effect=cut_off) as llm, \
+         patch("api.chat.log_agent_action"):
+        client.post("/chat", json={"text": "hello?", "stream": True})
+        client.post("/chat", json={"text": "hello?", "stream": True})
+
+    assert llm.call_count == 2
+    assert live_cache.stats()["entries"] == 0
+
+
+def test_openai_compat_hits_cache_only_for_same_conversation(live_cache):
+    from core.brain import app
+    client = TestClient(app)
+    body = {"messages": [{"role": "user", "content": "what is the fact?"}]}
+    other = {"messages": [{"role": "system", "content": "Be terse."},
+                          {"role": "user", "content": "what is the fact?"}]}
+
+    with patch("api.openai_compat.aget_embedding", return_value=[0.1, 0.2]), \
+         patch("core.retrieval.client.search", return_value=_search_response()), \
+         patch("api.openai_compat.allm.chat", return_value="v1 answer") as llm:
+        client.post("/v1/chat/completions", json=body)
+        hit = client.post("/v1/chat/completions", json=body)
+        client.post("/v1/chat/completions", json=other)
+
+    assert hit.json()["choices"][0]["message"]["content"] == "v1 answer"
+    assert llm.call_count == 2
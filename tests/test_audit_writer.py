@@ -0,0 +1,518 @@
+"""
+tests/test_audit_writer.py — Group-commit audit writes and the audit_writer
+socket protocol (agents/logger.py, audit_writer/server.py).
+"""
+import asyncio
+import json
+import shutil
+import socket
+import sqlite3
+import tempfile
+import threading
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def lg(tmp_path, monkeypatch):
+    """agents.logger in direct mode against a temp DB."""
+    import agents.logger as lg
+    monkeypatch.setattr(lg, "DB_PATH", str(tmp_path / "audit.db"))
+    monkeypatch.setattr(lg, "AUDIT_SOCKET_PATH", "")
+    monkeypatch.setattr(lg, "_FIRE_AND_FORGET", False)
+    monkeypatch.setattr(lg, "_AUDIT_SECRET", b"test-secret-for-unit-tests")
+    lg.init_db()
+    return lg
+
+
+@pytest.fixture
+def audit_server(lg, monkeypatch):
+    """A real audit_writer server on a temp Unix socket, run in a thread.
+
+    The test process then acts as a socket-mode client of itself; the server
+    side only uses the direct-mode entry points, so both can share the module.
+    """
+    from audit_writer import server
+
+    sock_dir = tempfile.mkdtemp(prefix="audit")   # AF_UNIX paths must stay short
+    path = f"{sock_dir}/a.sock"
+    ready = threading.Event()
+    running = {}
+
+    async def _serve():
+        running["loop"], running["task"] = asyncio.get_running_loop(), asyncio.current_task()
+        srv = await asyncio.start_unix_server(server.handle_connection, path=path)
+        ready.set()
+        async with srv:
+            try:
+                await srv.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    thread = threading.Thread(target=asyncio.run, args=(_serve(),), daemon=True)
+    thread.start()
+    ready.wait(5)
+    monkeypatch.setattr(lg, "AUDIT_SOCKET_PATH", path)
+    monkeypatch.setattr(lg, "_socket_client", None)
+    yield path
+    if lg._socket_client is not None:
+        lg._socket_client.close()
+    monkeypatch.setattr(lg, "AUDIT_SOCKET_PATH", "")
+    running["loop"].call_soon_threadsafe(running["task"].cancel)
+    thread.join(5)
+    shutil.rmtree(sock_dir, ignore_errors=True)
+
+
+def _rows(lg):
+    conn = sqlite3.connect(lg.DB_PATH)
+    rows = conn.execute("SELECT id, actor_id, details FROM activity_log ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+class TestGroupCommit:
+
+    def test_batch_queue_without_process_fails_at_construction(self, lg):
+        class Incomplete(lg._BatchQueue):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete(4)
+
+    def test_queued_entries_share_one_transaction_in_order(self, lg, monkeypatch):
+        """Entries queued while a commit is in flight land in one batch, chained in queue order."""
+        started, release = threading.Event(), threading.Event()
+        batches = []
+        real_commit = lg._commit_entries
+
+        def _slow_commit(entries):
+            batches.append(len(entries))
+            if len(batches) == 1:
+                started.set()
+                release.wait(5)
+            real_commit(entries)
+        monkeypatch.setattr(lg, "_commit_entries", _slow_commit)
+        monkeypatch.setattr(lg, "_FIRE_AND_FORGET", True)
+
+        lg.log_agent_action("A", "T", "row 0")
+        started.wait(5)
+        for i in range(1, 21):
+            lg.log_agent_action("A", "T", f"row {i}")
+        release.set()
+        lg.flush_audit_log()
+
+        assert batches == [1, 20]
+        assert [r[2] for r in _rows(lg)] == [f"row {i}" for i in range(21)]
+        assert lg.verify_audit_chain() == {"valid": True, "entries_checked": 21}
+
+    def test_concurrent_sync_writers_keep_chain_valid(self, lg):
+        threads = [
+            threading.Thread(target=lambda n=n: [lg.log_agent_action(f"T{n}", "X", str(i)) for i in range(10)])
+            for n in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(_rows(lg)) == 80
+        assert lg.verify_audit_chain()["valid"] is True
+
+    def test_sync_log_returns_after_commit(self, lg):
+        lg.log_agent_action("A", "B", "c", resource_id="r1", matter_id="m1")
+        assert _rows(lg) == [(1, "A", "c")]
+
+    def test_commit_failure_is_swallowed_and_next_write_succeeds(self, lg, monkeypatch):
+        real_commit = lg._commit_entries
+        calls = []
+
+        def _flaky(entries):
+            calls.append(entries)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("disk I/O error")
+            real_commit(entries)
+        monkeypatch.setattr(lg, "_commit_entries", _flaky)
+
+        lg.log_agent_action("A", "B", "lost")     # must not raise
+        lg.log_agent_action("A", "B", "kept")
+        assert [r[2] for r in _rows(lg)] == ["kept"]
+
+
+class TestSocketProtocol:
+
+    def test_log_and_verify_over_persistent_connection(self, lg, audit_server):
+        for i in range(5):
+            lg.log_agent_action("Client", "WRITE", f"e{i}", resource_id=f"r{i}")
+
+        assert lg.verify_audit_chain() == {"valid": True, "entries_checked": 5}
+        assert [r[3] for r in lg.get_recent_logs(2)] == ["e4", "e3"]
+        client = lg._get_socket_client()
+        sock = client._sock
+        lg.log_agent_action("Client", "WRITE", "again")
+        assert client._sock is sock   # same connection reused
+
+    def test_pipelined_requests_get_replies_in_order(self, lg, audit_server):
+        client = lg._get_socket_client()
+        futures = [
+            client.submit({"type": "log", "agent_name": "P", "action_type": "X", "details": str(i)})
+            for i in range(20)
+        ]
+        futures.append(client.submit({"type": "verify"}))
+
+        assert all(f.result(5) == {"ok": True} for f in futures[:-1])
+        assert futures[-1].result(5) == {"valid": True, "entries_checked": 20}
+        assert [r[2] for r in _rows(lg)] == [str(i) for i in range(20)]
+
+    def test_fire_and_forget_batches_are_forwarded(self, lg, audit_server, monkeypatch):
+        monkeypatch.setattr(lg, "_FIRE_AND_FORGET", True)
+        for i in range(30):
+            lg.log_agent_action("FF", "X", str(i))
+        lg.flush_audit_log()
+
+        assert [r[2] for r in _rows(lg)] == [str(i) for i in range(30)]
+
+    def test_shutdown_flushes_then_closes_the_connection(self, lg, audit_server, monkeypatch):
+        lg.log_agent_action("S", "X", "connected")
+        client = lg._get_socket_client()
+        sock = client._sock
+        monkeypatch.setattr(lg, "_FIRE_AND_FORGET", True)
+        lg.log_agent_action("S", "X", "last words")
+
+        lg._shutdown_audit_log()
+
+        assert [r[2] for r in _rows(lg)] == ["connected", "last words"]
+        for _ in range(100):   # the reader thread sees EOF and drops the socket
+            if client._sock is None:
+                break
+            threading.Event().wait(0.01)
+        assert client._sock is None and sock.fileno() == -1
+
+    def test_reconnects_after_connection_loss(self, lg, audit_server):
+        lg.log_agent_action("C", "X", "before")
+        client = lg._get_socket_client()
+        client._sock.shutdown(socket.SHUT_RDWR)
+
+        lg.log_agent_action("C", "X", "after")   # first send may fail; retried on a new socket
+        assert [r[2] for r in _rows(lg)][-1] == "after"
+
+    def test_legacy_one_shot_request_still_served(self, lg, audit_server):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(audit_server)
+            s.sendall(json.dumps({"type": "log", "agent_name": "Old", "action_type": "X", "details": "d"}).encode())
+            s.shutdown(socket.SHUT_WR)
+            reply = b""
+            while chunk := s.recv(4096):
+                reply += chunk
+        assert json.loads(reply) == {"ok": True}
+        assert _rows(lg) == [(1, "Old", "d")]
+
+    def test_unknown_request_type_returns_error(self, lg, audit_server):
+        reply = lg._get_socket_client().call({"type": "nope"})
+        assert "error" in reply
+
+    def test_non_object_request_does_not_stall_the_connection(self, lg, audit_server):
+        """A valid frame holding a JSON array gets an error; later pipelined requests still get replies."""
+        client = lg._get_socket_client()
+        bad = client.submit([])
+        good = client.submit({"type": "log", "agent_name": "P", "action_type": "X", "details": "after"})
+
+        assert "error" in bad.result(5)
+        assert good.result(5) == {"ok": True}
+
+    def test_legacy_invalid_json_gets_an_error_reply(self, lg, audit_server):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(audit_server)
+            s.sendall(b"{not json")
+            s.shutdown(socket.SHUT_WR)
+            reply = b""
+            while chunk := s.recv(4096):
+                reply += chunk
+        assert "error" in json.loads(reply)
+
+
+def _tamper(lg, sql, params=()):
+    conn = sqlite3.connect(lg.DB_PATH)
+    conn.execute("DROP TRIGGER IF EXISTS prevent_update")
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+class TestCheckpoints:
+
+    @pytest.fixture
+    def logged(self, lg, monkeypatch):
+        monkeypatch.setattr(lg, "_CHECKPOINT_INTERVAL", 5)
+        for i in range(12):
+            lg.log_agent_action("A", "T", str(i), resource_id=f"r{i}")
+        return lg
+
+    def test_checkpoints_written_at_interval(self, logged):
+        conn = sqlite3.connect(logged.DB_PATH)
+        ids = [r[0] for r in conn.execute("SELECT entry_id FROM audit_checkpoints ORDER BY entry_id")]
+        conn.close()
+        assert ids == [5, 10]
+
+    def test_default_verify_starts_at_newest_checkpoint(self, logged):
+        assert logged.verify_audit_chain() == {"valid": True, "entries_checked": 2, "checkpoint_id": 10}
+        assert logged.verify_audit_chain(full=True) == {"valid": True, "entries_checked": 12}
+
+    def test_full_verify_catches_tampering_behind_checkpoint(self, logged):
+        _tamper(logged, "UPDATE activity_log SET actor_id = 'Mallory' WHERE id = 3")
+
+        assert logged.verify_audit_chain()["valid"] is True
+        assert logged.verify_audit_chain(full=True) == {"valid": False, "first_failed_id": 3}
+
+    def test_checkpointed_row_is_rechecked(self, logged):
+        _tamper(logged, "UPDATE activity_log SET entry_hash = ? WHERE id = 10", ("f" * 64,))
+        assert logged.verify_audit_chain() == {"valid": False, "first_failed_id": 10}
+
+    def test_forged_checkpoint_rejected(self, logged):
+        _tamper(
+            logged,
+            "INSERT INTO audit_checkpoints (entry_id, entry_hash, created_at, signature) VALUES (12, ?, '', ?)",
+            ("a" * 64, "b" * 64),
+        )
+        assert logged.verify_audit_chain() == {"valid": False, "first_failed_checkpoint": 12}
+
+    def test_verify_endpoint_passes_full_flag(self):
+        from core.brain import app
+
+        with patch("api.audit.verify_audit_chain", return_value={"valid": True, "entries_checked": 3}) as verify:
+            resp = TestClient(app).get("/api/audit/verify?full=true")
+        assert resp.status_code == 200
+        assert resp.json()["entries_checked"] == 3
+        verify.assert_called_once_with(full=True)
+
+
+class TestMerkleProofs:
+
+    @staticmethod
+    def _inclusion_ok(proof):
+        from core import merkle
+        return merkle.verify_inclusion(
+            merkle.leaf_hash(proof["entry_hash"]), proof["leaf_index"], proof["tree_size"],
+            [bytes.fromhex(h) for h in proof["proof"]], bytes.fromhex(proof["root_hash"]),
+        )
+
+    def test_inclusion_proof_verifies_offline(self, lg):
+        for i in range(11):
+            lg.log_agent_action("A", "DELETE", str(i), resource_id=f"mem-{i}")
+
+        proof = lg.merkle_inclusion_proof(7)
+        assert proof["tree_size"] == 11 and proof["leaf_index"] == 6
+        assert len(proof["proof"]) <= 4
+        assert self._inclusion_ok(proof)
+        assert lg.merkle_root()["root_hash"] == proof["root_hash"]
+
+    def test_consistency_between_published_roots(self, lg):
+        from core import merkle
+        for i in range(5):
+            lg.log_agent_action("A", "T", str(i))
+        published = lg.merkle_root()
+        for i in range(6):
+            lg.log_agent_action("A", "T", str(i))
+
+        proof = lg.merkle_consistency_proof(published["tree_size"])
+        assert proof["old_root"] == published["root_hash"] and proof["new_size"] == 11
+        assert merkle.verify_consistency(
+            5, 11, bytes.fromhex(published["root_hash"]), bytes.fromhex(proof["new_root"]),
+            [bytes.fromhex(h) for h in proof["proof"]],
+        )
+
+    def test_backfills_log_written_before_the_tree(self, lg):
+        for i in range(6):
+            lg.log_agent_action("A", "T", str(i))
+        expected = lg.merkle_root()
+        conn = sqlite3.connect(lg.DB_PATH)
+        conn.execute("DELETE FROM audit_merkle_nodes")
+        conn.execute("DELETE FROM audit_merkle_base")
+        conn.commit()
+        conn.close()
+        lg._initialised_paths.discard(lg.DB_PATH)
+
+        lg.log_agent_action("A", "T", "6")
+        assert lg.merkle_root(6) == expected
+        assert self._inclusion_ok(lg.merkle_inclusion_proof(7))
+
+    def test_archived_entries_stay_provable(self, lg, monkeypatch):
+        monkeypatch.setattr(lg, "_ARCHIVE_INTERVAL", 5)
+        monkeypatch.setattr(lg, "_LIVE_MAX_ROWS", 4)
+        monkeypatch.setattr(lg, "_SEGMENT_ROWS", 3)
+        for i in range(10):
+            lg.log_agent_action("A", "T", str(i))
+        lg.flush_audit_log()
+
+        proof = lg.merkle_inclusion_proof(1)
+        assert proof["tree_size"] == 10 and proof["entry_hash"] is not None
+        assert self._inclusion_ok(proof)
+
+    def test_sizes_outside_tree_are_errors(self, lg):
+        lg.log_agent_action("A", "T", "x")
+        assert "error" in lg.merkle_root(5)
+        assert "error" in lg.merkle_inclusion_proof(9)
+
+    def test_served_over_socket(self, lg, audit_server):
+        for i in range(3):
+            lg.log_agent_action("S", "T", str(i))
+        proof = lg.merkle_inclusion_proof(2)
+        assert self._inclusion_ok(proof)
+
+    def test_endpoints(self, lg):
+        from core.brain import app
+        for i in range(4):
+            lg.log_agent_action("A", "T", str(i))
+        client = TestClient(app)
+
+        assert client.get("/api/audit/merkle/root").json()["tree_size"] == 4
+        assert self._inclusion_ok(client.get("/api/audit/merkle/inclusion/3").json())
+        assert client.get("/api/audit/merkle/consistency?old_size=2").json()["new_size"] == 4
+        assert client.get("/api/audit/merkle/inclusion/99").status_code == 400
+
+
+class TestSegmentArchive:
+
+    @pytest.fixture
+    def archived(self, lg, monkeypatch):
+        monkeypatch.setattr(lg, "_ARCHIVE_INTERVAL", 10)
+        monkeypatch.setattr(lg, "_LIVE_MAX_ROWS", 10)
+        monkeypatch.setattr(lg, "_SEGMENT_ROWS", 10)
+        monkeypatch.setattr(lg.audit_archive, "BLOCK_ROWS", 4)
+        for i in range(40):
+            lg.log_agent_action("A", "T", str(i), resource_id=f"r{i}")
+        lg.flush_audit_log()
+        return lg
+
+    def _segments(self, lg):
+        conn = sqlite3.connect(lg.DB_PATH)
+        rows = conn.execute("SELECT first_id, last_id, file, sha256, prev_sha256 FROM audit_segments ORDER BY first_id").fetchall()
+        conn.close()
+        return rows
+
+    def test_segments_are_hash_linked_and_read_only(self, archived):
+        import os
+        segments = self._segments(archived)
+        assert [(s[0], s[1]) for s in segments] == [(1, 10), (11, 20), (21, 30)]
+        assert segments[0][4] == "0" * 64
+        assert segments[1][4] == segments[0][3] and segments[2][4] == segments[1][3]
+        path = os.path.join(archived._archive_dir(), segments[0][2])
+        assert not os.stat(path).st_mode & 0o222
+
+    def test_reader_uses_block_index(self, archived):
+        import os
+        from agents.audit_archive import SegmentReader
+        name = self._segments(archived)[1][2]
+        with SegmentReader(os.path.join(archived._archive_dir(), name)) as seg:
+            assert len(seg.footer["blocks"]) == 3
+            assert seg.row(17)[6] == "16"
+            assert [r[0] for r in seg.rows(14, 16)] == [14, 15, 16]
+            assert seg.row(99) is None
+
+    def test_full_verify_detects_tampered_segment(self, archived):
+        import os
+        name = self._segments(archived)[1][2]
+        path = os.path.join(archived._archive_dir(), name)
+        os.chmod(path, 0o644)
+        with open(path, "r+b") as f:
+            f.seek(3)
+            byte = f.read(1)
+            f.seek(3)
+            f.write(bytes([byte[0] ^ 0xFF]))
+
+        assert archived.verify_audit_chain()["valid"] is True   # live rows untouched
+        assert archived.verify_audit_chain(full=True) == {"valid": False, "first_failed_segment": 11}
+
+    def test_missing_segment_fails_full_verify(self, archived):
+        import os
+        name = self._segments(archived)[0][2]
+        os.remove(os.path.join(archived._archive_dir(), name))
+        result = archived.verify_audit_chain(full=True)
+        assert result["valid"] is False and result["first_failed_segment"] == 1
+
+    def test_deleting_live_rows_after_segment_is_detected(self, archived):
+        _tamper(archived, "DELETE FROM activity_log WHERE id = 31")
+        assert archived.verify_audit_chain() == {"valid": False, "first_failed_id": 32}
+
+
+class TestLogQuery:
+
+    @pytest.fixture
+    def seeded(self, lg):
+        for i in range(30):
+            lg.log_agent_action(
+                f"actor{i % 3}", "READ" if i % 2 else "WRITE", f"e{i}",
+                resource_id=f"r{i % 5}", matter_id="m1" if i < 15 else "m2",
+            )
+        return lg
+
+    def test_keyset_pages_cover_matches_once_newest_first(self, seeded):
+        seen, before_id = [], None
+        while True:
+            page = seeded.query_logs({"actor_id": "actor1"}, before_id, limit=4)
+            seen += [e["details"] for e in page["logs"]]
+            before_id = page["next_before_id"]
+            if before_id is None:
+                break
+        assert seen == [f"e{i}" for i in range(28, -1, -1) if i % 3 == 1]
+
+    def test_filters_combine(self, seeded):
+        page = seeded.query_logs({"action_type": "WRITE", "matter_id": "m2", "resource_id": "r0"})
+        assert [e["details"] for e in page["logs"]] == ["e20"]
+        assert page["next_before_id"] is None
+
+    def test_time_range_is_half_open(self, seeded):
+        conn = sqlite3.connect(seeded.DB_PATH)
+        stamps = [r[0] for r in conn.execute("SELECT timestamp_wall FROM activity_log ORDER BY id")]
+        conn.close()
+        page = seeded.query_logs({"since": stamps[0], "until": "9999-12-31 00:00:00"}, limit=1000)
+        assert len(page["logs"]) == 30
+        assert seeded.query_logs({"until": stamps[0]})["logs"] == []
+
+    def test_unknown_filter_is_an_error(self, seeded):
+        assert "error" in seeded.query_logs({"details": "e1"})
+
+    def test_filtered_queries_use_composite_indexes(self, seeded):
+        conn = sqlite3.connect(seeded.DB_PATH)
+        for column in ("actor_id", "action_type", "matter_id", "resource_id"):
+            plan = " ".join(r[3] for r in conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT id FROM activity_log WHERE {column} = ? AND id < ? "
+                "ORDER BY id DESC LIMIT 10", ("x", 100),
+            ))
+            assert f"idx_activity_log_{column}" in plan and "TEMP B-TREE" not in plan
+        conn.close()
+
+    def test_archived_rows_continue_the_same_keyset(self, lg, monkeypatch):
+        monkeypatch.setattr(lg, "_ARCHIVE_INTERVAL", 10)
+        monkeypatch.setattr(lg, "_LIVE_MAX_ROWS", 10)
+        monkeypatch.setattr(lg, "_SEGMENT_ROWS", 10)
+        for i in range(30):
+            lg.log_agent_action("A", "T", f"e{i}", resource_id="odd" if i % 2 else "even")
+        lg.flush_audit_log()
+
+        assert len(lg.query_logs({"resource_id": "odd"}, limit=100)["logs"]) == 5
+        details = [e["details"] for e in lg.iter_logs({"resource_id": "odd"}, archived=True, page_size=4)]
+        assert details == [f"e{i}" for i in range(29, 0, -2)]
+
+    def test_socket_mode_matches_direct(self, seeded, audit_server):
+        seeded.log_agent_action("late", "READ", "visible")
+        page = seeded.query_logs({"actor_id": "late"})
+        assert [e["details"] for e in page["logs"]] == ["visible"]
+        assert len(list(seeded.iter_logs({"matter_id": "m1"}, page_size=4))) == 15
+
+    def test_api_pages_and_exports_ndjson(self, seeded):
+        from core.brain import app
+        client = TestClient(app)
+
+        body = client.get("/api/audit/logs?actor=actor0&limit=3").json()
+        assert [e["details"] for e in body["logs"]] == ["e27", "e24", "e21"]
+        body = client.get(f"/api/audit/logs?actor=actor0&limit=3&before_id={body['next_before_id']}").json()
+        assert body["logs"][0]["details"] == "e18"
+
+        resp = client.get("/api/audit/logs/export?matter_id=m2&since=2000-01-01T00:00:00Z")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [e["details"] for e in lines] == [f"e{i}" for i in range(29, 14, -1)]
+        assert client.get("/api/audit/logs?limit=1001").status_code == 422
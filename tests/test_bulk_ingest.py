@@ -0,0 +1,181 @@
+"""Tests for POST /api/ingest/bulk — NDJSON bulk ingestion in api/memory.py."""
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture()
+def brain_client():
+    from core.brain import app
+    return TestClient(app)
+
+
+def _ndjson(*items) -> bytes:
+    return "\n".join(json.dumps(i) if isinstance(i, dict) else i for i in items).encode()
+
+
+def _no_hits(n):
+    return [MagicMock(points=[]) for _ in range(n)]
+
+
+def _acked(collection, items, wait=False):
+    return [{"id": i["point_id"], "status": "completed" if wait else "acknowledged"} for i in items]
+
+
+def _basis(i: int, dim: int = 8) -> list[float]:
+    """Unit vector i — distinct texts must not look like near-duplicates."""
+    return [1.0 if d == i else 0.0 for d in range(dim)]
+
+
+def test_bulk_batches_embed_dedup_and_write(brain_client):
+    """One embed call, one batched dedup, one bulk write for a small body."""
+    body = _ndjson({"text": "first memory"}, {"text": "second memory"}, {"text": "a file", "type": "file_ingest"})
+
+    with patch("api.memory.aget_embeddings", return_value=[_basis(0), _basis(1), _basis(2)]) as embed, \
+         patch("api.memory.client.search_many", return_value=_no_hits(2)) as search, \
+         patch("api.memory.client.write_many", side_effect=_acked) as write, \
+         patch("api.memory.log_agent_action") as audit:
+        r = brain_client.post("/api/ingest/bulk", content=body)
+
+    assert r.status_code == 200
+    data = r.json()
+    assert [x["status"] for x in data["results"]] == ["raw_data_saved"] * 3
+    assert data["counts"] == {"raw_data_saved": 3}
+    embed.assert_called_once_with(["first memory", "second memory", "a file"])
+    # file_ingest skips semantic dedup, like /ingest
+    assert len(search.call_args.args[1]) == 2
+    items = write.call_args.args[1]
+    assert items[0]["payload"]["memory"] == "first memory"
+    assert items[0]["classification"]
+    assert audit.call_count == 3
+
+
+def test_bulk_reports_per_line_duplicates_and_errors(brain_client):
+    """Bad JSON, semantic dupes and in-body repeats are reported by line number."""
+    hit = MagicMock(id="existing-id", score=0.99)
+    body = _ndjson({"text": "already stored"}, "", "{not json", {"text": "new one"}, {"text": "new one"})
+
+    with patch("api.memory.aget_embeddings", return_value=[_basis(0), _basis(1), _basis(1)]), \
+         patch("api.memory.client.search_many",
+               return_value=[MagicMock(points=[hit]), MagicMock(points=[]), MagicMock(points=[])]), \
+         patch("api.memory.client.write_many", side_effect=_acked) as write, \
+         patch("api.memory.log_agent_action") as audit:
+        r = brain_client.post("/api/ingest/bulk", content=body)
+
+    results = r.json()["results"]
+    assert [(x["line"], x["status"]) for x in results] == [
+        (1, "duplicate_skipped"), (3, "error"), (4, "raw_data_saved"), (5, "duplicate_skipped"),
+    ]
+    assert results[0]["id"] == "existing-id"
+    assert len(write.call_args.args[1]) == 1
+    audit.assert_called_once()
+
+
+def test_bulk_embedding_failure_errors_the_batch(brain_client):
+    with patch("api.memory.aget_embeddings", return_value=None), \
+         patch("api.memory.client.write_many") as write:
+        r = brain_client.post("/api/ingest/bulk", content=_ndjson({"text": "a"}, {"text": "b"}))
+
+    assert r.json()["counts"] == {"error": 2}
+    assert r.json()["results"][0]["error"] == "Embedding failed"
+    write.assert_not_called()
+
+
+def test_bulk_unknown_matter_errors_only_that_line(brain_client):
+    with patch("api.memory.aget_embeddings", return_value=[[0.1]]), \
+         patch("api.matters.get_matter", return_value=None), \
+         patch("api.memory.client.search_many", return_value=_no_hits(1)), \
+         patch("api.memory.client.write_many", side_effect=_acked), \
+         patch("api.memory.log_agent_action"):
+        r = brain_client.post(
+            "/api/ingest/bulk",
+            content=_ndjson({"text": "ok"}, {"text": "tagged", "matter_id": "nope"}),
+        )
+
+    statuses = [x["status"] for x in r.json()["results"]]
+    assert statuses == ["raw_data_saved", "error"]
+    assert "not found" in r.json()["results"][1]["error"]
+
+
+def test_bulk_spans_multiple_batches(brain_client, monkeypatch):
+    import api.memory as memory
+    monkeypatch.setattr(memory, "BULK_BATCH_SIZE", 2)
+    body = _ndjson(*({"text": f"memory {i}"} for i in range(5)))
+
+    with patch("api.memory.aget_embeddings", side_effect=lambda texts: [_basis(int(t.split()[-1])) for t in texts]) as embed, \
+         patch("api.memory.client.search_many", side_effect=lambda c, q, **kw: _no_hits(len(q))), \
+         patch("api.memory.client.write_many", side_effect=_acked), \
+         patch("api.memory.log_agent_action"):
+        r = brain_client.post("/api/ingest/bulk", content=body)
+
+    assert embed.call_count == 3
+    assert [x["line"] for x in r.json()["results"]] == [1, 2, 3, 4, 5]
+
+
+def test_bulk_dedups_near_duplicates_within_a_batch(brain_client):
+    """Lines the dedup search cannot see yet are compared with each other, per type and matter."""
+    body = _ndjson(
+        {"text": "call the insurer"},
+        {"text": "Call the insurer."},
+        {"text": "call the insurer today", "type": "browsing_event"},
+        {"text": "a file", "type": "file_ingest"},
+        {"text": "a file copy", "type": "file_ingest"},
+    )
+    near = [0.999, 0.04] + [0.0] * 6
+
+    with patch("api.memory.aget_embeddings",
+               return_value=[_basis(0), near, _basis(0), _basis(1), _basis(1)]), \
+         patch("api.memory.client.search_many", return_value=_no_hits(3)), \
+         patch("api.memory.client.write_many", side_effect=_acked) as write, \
+         patch("api.memory.log_agent_action"):
+        r = brain_client.post("/api/ingest/bulk", content=body)
+
+    results = r.json()["results"]
+    assert [x["status"] for x in results] == [
+        "raw_data_saved", "duplicate_skipped", "raw_data_saved", "raw_data_saved", "raw_data_saved",
+    ]
+    assert results[1]["id"] == results[0]["id"] and results[1]["score"] >= 0.97
+    # Written before the next batch's dedup search runs.
+    assert write.call_args.kwargs["wait"] is True
+
+
+def test_bulk_repeated_document_key_is_an_update(brain_client):
+    """Same claim number, different text: the later line replaces the earlier one, as with /ingest."""
+    keys = {"claim_number": "CLM-1"}
+    body = _ndjson(
+        {"text": "claim opened", "document_keys": keys},
+        {"text": "claim approved", "document_keys": keys},
+    )
+
+    with patch("api.memory.aget_embeddings", return_value=[_basis(0), _basis(1)]), \
+         patch("api.memory.client.search_many", return_value=_no_hits(2)), \
+         patch("api.memory.client.write_many", side_effect=_acked) as write, \
+         patch("api.memory.log_agent_action"):
+        r = brain_client.post("/api/ingest/bulk", content=body)
+
+    results = r.json()["results"]
+    assert [x["status"] for x in results] == ["raw_data_saved", "raw_data_saved"]
+    assert results[0]["id"] == results[1]["id"]
+    assert [i["payload"]["memory"] for i in write.call_args.args[1]] == ["claim approved"]
+
+
+def test_bulk_repeated_file_ingest_writes_only_the_last_copy(brain_client, monkeypatch):
+    """An earlier copy's extra chunks must not survive next to the later copy."""
+    import api.memory as memory
+    monkeypatch.setattr(memory, "chunk_text", lambda text: ["a", "b", "c"] if text == "v1" else ["d"])
+    keys = {"reference": "DOC-9"}
+    body = _ndjson(
+        {"text": "v1", "type": "file_ingest", "document_keys": keys},
+        {"text": "v2", "type": "file_ingest", "document_keys": keys},
+    )
+
+    with patch("api.memory.aget_embeddings", return_value=[_basis(i) for i in range(6)]), \
+         patch("api.memory.client.delete"), \
+         patch("api.memory.client.write_many", side_effect=_acked) as write, \
+         patch("api.memory.log_agent_action"):
+        r = brain_client.post("/api/ingest/bulk", content=body)
+
+    assert r.json()["counts"] == {"raw_data_saved": 2}
+    assert [i["payload"]["memory"] for i in write.call_args.args[1]] == ["v2", "d"]
@@ -0,0 +1,197 @@
+"""Tests for core/chunking.py and chunked ingestion / retrieval."""
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.chunking import chunk_text, collapse_hits, count_tokens
+
+
+@pytest.fixture()
+def brain_client():
+    from core.brain import app
+    return TestClient(app)
+
+
+def _long_text(sentences: int = 200) -> str:
+    return " ".join(f"Sentence number {i} talks about claim denials." for i in range(sentences))
+
+
+def _hit(id, score, **payload):
+    return SimpleNamespace(id=id, score=score, payload=payload)
+
+
+# ── chunk_text ────────────────────────────────────────────────────────────────
+
+def test_short_text_is_not_chunked():
+    assert chunk_text("a short memory", max_tokens=50) == []
+
+
+def test_chunks_respect_budget_and_overlap():
+    text = _long_text()
+    chunks = chunk_text(text, max_tokens=100, overlap=20)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(c) <= 100 for c in chunks)
+    # Consecutive chunks share text.
+    assert chunks[0][-20:] in chunks[1] or chunks[1][:20] in chunks[0]
+    # Nothing is lost: first and last sentences both survive.
+    assert "Sentence number 0 " in chunks[0]
+    assert "Sentence number 199 " in chunks[-1]
+
+
+def test_chunks_end_on_sentence_boundaries_when_possible():
+    chunks = chunk_text(_long_text(), max_tokens=100, overlap=20)
+    assert all(c.rstrip().endswith(".") for c in chunks)
+
+
+# ── collapse_hits ─────────────────────────────────────────────────────────────
+
+def test_collapse_groups_chunks_under_parent_in_document_order():
+    hits = [
+        _hit("c2", 0.9, memory="second part", parent_id="doc", chunk_index=2, classification="PHI"),
+        _hit("solo", 0.8, memory="short memory"),
+        _hit("c0", 0.7, memory="first part", parent_id="doc", chunk_index=0, classification="PHI"),
+        _hit("doc", 0.6, memory="whole 50k document", classification="PHI"),
+    ]
+
+    collapsed = collapse_hits(hits)
+
+    assert [h.id for h in collapsed] == ["doc", "solo"]
+    assert collapsed[0].score == 0.9
+    assert collapsed[0].payload["memory"] == "first part\n…\nsecond part"
+    assert "parent_id" not in collapsed[0].payload
+    assert collapsed[1] is hits[1]
+
+
+def test_collapse_does_not_decrypt_the_parents_large_fields():
+    from core.deps import client
+    stored = client._encrypt_payload({
+        "memory": "whole 50k document", "embed_text": "whole 50k document", "created_at": "2026-01-01",
+        "classification": "PHI",
+    })
+    parent = SimpleNamespace(id="doc", score=0.6, payload=client.decrypt_payload(stored))
+    chunk = _hit("c0", 0.9, memory="first part", parent_id="doc", chunk_index=0, classification="PHI")
+
+    collapsed = collapse_hits([chunk, parent])
+
+    assert collapsed[0].payload == {"created_at": "2026-01-01", "classification": "PHI", "memory": "first part"}
+    assert sorted(parent.payload._sealed) == ["encrypted_embed_text", "encrypted_memory"]
+
+
+# ── /ingest ───────────────────────────────────────────────────────────────────
+
+def test_ingest_long_document_writes_parent_and_linked_chunks(brain_client, monkeypatch):
+    import api.memory as memory
+    monkeypatch.setattr(memory, "chunk_text", lambda text: ["chunk a", "chunk b"])
+
+    with patch("api.memory.get_embeddings", return_value=[[0.0], [0.1], [0.2]]) as embed, \
+         patch("api.memory.client.write") as write, \
+         patch("api.memory.client.delete") as delete, \
+         patch("api.memory.client.write_many", return_value=[]) as write_many, \
+         patch("api.memory.log_agent_action"):
+        r = brain_client.post("/ingest", json={"text": "long document", "type": "file_ingest"})
+
+    assert r.json()["status"] == "raw_data_saved"
+    parent_id = r.json()["id"]
+    embed.assert_called_once_with(["long document", "chunk a", "chunk b"])
+    assert write.call_args.kwargs["payload"]["memory"] == "long document"
+    delete.assert_called_once()  # stale children from a previous version
+    children = write_many.call_args.args[1]
+    assert [c["payload"]["memory"] for c in children] == ["chunk a", "chunk b"]
+    assert {c["payload"]["parent_id"] for c in children} == {parent_id}
+    assert {c["classification"] for c in children} == {write.call_args.kwargs["classification"]}
+
+
+def test_ingest_fails_when_a_chunk_write_fails(brain_client, monkeypatch):
+    import api.memory as memory
+    monkeypatch.setattr(memory, "chunk_text", lambda text: ["chunk a", "chunk b"])
+
+    with patch("api.memory.get_embeddings", return_value=[[0.0], [0.1], [0.2]]), \
+         patch("api.memory.client.write"), \
+         patch("api.memory.client.delete"), \
+         patch("api.memory.client.write_many", return_value=[
+             {"id": "a", "status": "completed"},
+             {"id": "b", "status": "error", "error": "qdrant down"},
+         ]) as write_many, \
+         patch("api.memory.log_agent_action") as audit:
+        r = brain_client.post("/ingest", json={"text": "long document", "type": "file_ingest"})
+
+    assert r.status_code == 500
+    assert write_many.call_args.kwargs["wait"] is True
+    audit.assert_not_called()
+
+
+def test_bulk_ingest_embeds_chunks_in_the_same_batch(brain_client, monkeypatch):
+    import api.memory as memory
+    monkeypatch.setattr(memory, "chunk_text", lambda text: ["x", "y"] if text == "long" else [])
+    body = b'{"text": "long", "type": "file_ingest"}\n{"text": "short", "type": "file_ingest"}'
+
+    with patch("api.memory.aget_embeddings", return_value=[[1.0], [1.1], [1.2], [2.0]]) as embed, \
+         patch("api.memory.client.delete"), \
+         patch("api.memory.client.write_many",
+               side_effect=lambda c, items, **kw: [{"id": i["point_id"], "status": "completed"} for i in items]
+               ) as write_many, \
+         patch("api.memory.log_agent_action") as audit:
+        r = brain_client.post("/api/ingest/bulk", content=body)
+
+    embed.assert_called_once_with(["long", "x", "y", "short"])
+    items = write_many.call_args.args[1]
+    assert [i["vector"] for i in items] == [[1.0], [1.1], [1.2], [2.0]]
+    assert r.json()["counts"] == {"raw_data_saved": 2}
+    assert audit.call_count == 2  # one WRITE per document, not per chunk
+
+
+def test_reingest_below_chunk_size_drops_old_chunks(brain_client, monkeypatch):
+    """A document that shrank below INGEST_CHUNK_TOKENS must not keep its previous chunks."""
+    import api.memory as memory
+    monkeypatch.setattr(memory, "chunk_text", lambda text: [])
+
+    with patch("api.memory.get_embedding", return_value=[0.0]), \
+         patch("api.memory.client.write"), \
+         patch("api.memory.client.delete") as delete, \
+         patch("api.memory.client.write_many") as write_many, \
+         patch("api.memory.log_agent_action"):
+        r = brain_client.post("/ingest", json={"text": "now short", "type": "file_ingest"})
+
+    assert r.json()["status"] == "raw_data_saved"
+    delete.assert_called_once()
+    assert memory.models.MatchAny.call_args.kwargs["any"] == [r.json()["id"]]
+    write_many.assert_not_called()
+
+
+def test_bulk_reingest_drops_old_chunks_of_every_parent(brain_client, monkeypatch):
+    import api.memory as memory
+    monkeypatch.setattr(memory, "chunk_text", lambda text: ["x", "y"] if text == "long" else [])
+    body = b'{"text": "long", "type": "file_ingest"}\n{"text": "short", "type": "file_ingest"}'
+
+    with patch("api.memory.aget_embeddings", return_value=[[1.0], [1.1], [1.2], [2.0]]), \
+         patch("api.memory.client.delete") as delete, \
+         patch("api.memory.client.write_many",
+               side_effect=lambda c, items, **kw: [{"id": i["point_id"], "status": "completed"} for i in items]), \
+         patch("api.memory.log_agent_action"):
+        r = brain_client.post("/api/ingest/bulk", content=body)
+
+    delete.assert_called_once()
+    assert memory.models.MatchAny.call_args.kwargs["any"] == [res["id"] for res in r.json()["results"]]
+
+
+# ── /chat retrieval ───────────────────────────────────────────────────────────
+
+def test_chat_context_collapses_chunks_to_parent(brain_client):
+    response = MagicMock()
+    response.points = [
+        _hit("c1", 0.9, memory="denied CO-97", parent_id="doc", chunk_index=1, classification="PUBLIC"),
+        _hit("c0", 0.8, memory="Aetna letter", parent_id="doc", chunk_index=0, classification="PUBLIC"),
+    ]
+
+    with patch("api.chat.aget_embedding", return_value=[0.1]), \
+         patch("core.retrieval.client.search", return_value=response), \
+         patch("api.chat.allm.chat", return_value="ok"), \
+         patch("api.chat.log_agent_action"):
+        r = brain_client.post("/chat", json={"text": "what happened with aetna?"})
+
+    sources = r.json()["context_used"]
+    assert len(sources) == 1
+    assert sources[0]["memory"] == "Aetna letter\n…\ndenied CO-97"
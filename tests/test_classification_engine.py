@@ -16,9 +16,13 @@ Covers:
 12. Plain text defaults to PUBLIC
 13. Highest severity wins when multiple patterns match (SSN in a medical context → PII not PHI)
 14. Classification enum is ordered correctly (PUBLIC is lowest, RESTRICTED is highest)
+15. Single-pass scan agrees with checking each level's patterns in turn
+16. Every rule match contains one of its level's prefilter triggers
 """
+import random
+
 import pytest
-from core.classification_engine import classify, Classification
+from core.classification_engine import _RULES, _TRIGGERS, classify, Classification
 
 
 # ─── Test 1-4: PII patterns ───────────────────────────────────────────────────
@@ -131,3 +135,61 @@ def test_classification_enum_ordering():
         assert ordered[i] < ordered[i + 1], (
             f"{ordered[i]} should be less than {ordered[i + 1]}"
         )
+
+
+# ─── Test 15: Single-pass scan matches the per-level reference ───────────────
+
+def _classify_per_level(text: str) -> Classification:
+    for level, patterns in _RULES:
+        if any(pattern.search(text) for pattern in patterns):
+            return level
+    return Classification.PUBLIC
+
+
+def test_pii_starting_inside_a_lower_match_is_found():
+    """The scan resumes after a match's start, not its end."""
+    assert classify("See work product.notes@firm.com") == Classification.PII
+    assert classify("Ref: d.o.b.1@clinic.org") == Classification.PII
+
+
+_FRAGMENTS = [
+    "the quarterly report", "patient presents with", "123-45-6789", "4111 1111 1111 1111",
+    "jane@example.com", "(555) 867-5309", "+1 555 867 5309", "MRN", "dob", "D.O.B.", "d.ob",
+    "attorney-client", "Attorney's eyes only", "work product", "legal advice", "privileged communication",
+    "confidential", "trade secret", "internal use only", "Not for external use", "do not distribute",
+    "prescribed", "mg twice", "drug regimen", "chart no.", "medical record #", "born on", "birthdate",
+    "not for release", "555-0100", "assessment@x.io", "-", ".", " ", "\n",
+]
+
+
+def _random_texts(seed: int, n: int = 300):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield "".join(rng.choice(_FRAGMENTS) for _ in range(rng.randint(0, 12)))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_single_pass_agrees_with_per_level_search(seed):
+    for text in _random_texts(seed):
+        assert classify(text) == _classify_per_level(text), text
+
+
+def test_non_ascii_text_skips_the_prefilter():
+    """U+0130 matches "i" under re.I but lowercases to two characters."""
+    text = "\u0130nternal use only"
+    assert classify(text) == _classify_per_level(text) == Classification.INTERNAL
+
+
+# ─── Test 16: Prefilter triggers cover every rule ─────────────────────────────
+
+def test_triggers_cover_every_level():
+    assert set(_TRIGGERS) == {level for level, _ in _RULES}
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_every_match_contains_a_trigger(seed):
+    for text in _random_texts(seed):
+        for level, patterns in _RULES:
+            for pattern in patterns:
+                for m in pattern.finditer(text):
+                    assert any(t in m.group().lower() for t in _TRIGGERS[level]), (level, m.group())
@@ -0,0 +1,114 @@
+"""Tests for core/collection_manager.py — idempotent collection + payload index bootstrap."""
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from core import collection_manager as cm
+from core.memory_client import PLAINTEXT_KEYS
+
+
+def _qdrant(exists: bool, indexed=()):
+    qdrant = MagicMock()
+    qdrant.collection_exists.return_value = exists
+    qdrant.get_collection.return_value = SimpleNamespace(payload_schema={f: object() for f in indexed})
+    return qdrant
+
+
+def _indexed_fields(qdrant):
+    return {c.kwargs["field_name"]: c.kwargs["field_schema"] for c in qdrant.create_payload_index.call_args_list}
+
+
+def test_missing_collection_is_created_with_tuning_and_all_indexes():
+    qdrant = _qdrant(exists=False)
+    cm.ensure_collection(qdrant, "second_brain")
+
+    kwargs = qdrant.create_collection.call_args.kwargs
+    assert kwargs["collection_name"] == "second_brain"
+    assert kwargs["on_disk_payload"] is True
+    assert "hnsw_config" in kwargs and "optimizers_config" in kwargs
+    assert set(_indexed_fields(qdrant)) == set(PLAINTEXT_KEYS)
+
+
+def test_user_id_is_the_tenant_index():
+    qdrant = _qdrant(exists=False)
+    cm.ensure_collection(qdrant, "second_brain")
+
+    fields = _indexed_fields(qdrant)
+    assert fields["user_id"] is not fields["matter_id"]
+    assert cm.models.KeywordIndexParams.call_args.kwargs["is_tenant"] is True
+
+
+def test_existing_collection_only_gains_missing_indexes():
+    qdrant = _qdrant(exists=True, indexed=PLAINTEXT_KEYS - {"status"})
+    cm.ensure_collection(qdrant, "second_brain")
+
+    qdrant.create_collection.assert_not_called()
+    assert set(_indexed_fields(qdrant)) == {"status"}
+
+
+def test_fully_prepared_collection_is_untouched():
+    qdrant = _qdrant(exists=True, indexed=["source", "type"])
+    cm.ensure_collection(qdrant, "doc_knowledge")
+
+    qdrant.create_collection.assert_not_called()
+    qdrant.create_payload_index.assert_not_called()
+
+
+def test_losing_a_creation_race_is_not_an_error():
+    qdrant = _qdrant(exists=False)
+    qdrant.collection_exists.side_effect = [False, True]
+    qdrant.create_collection.side_effect = RuntimeError("already exists")
+
+    cm.ensure_collection(qdrant, "doc_knowledge")
+    assert set(_indexed_fields(qdrant)) == {"source", "type"}
+
+
+def test_ensure_collections_continues_past_a_failure():
+    qdrant = _qdrant(exists=False)
+    qdrant.create_collection.side_effect = [RuntimeError("qdrant down"), None]
+    qdrant.collection_exists.return_value = False
+
+    cm.ensure_collections(qdrant)   # must not raise
+    assert qdrant.create_collection.call_count == 2
+    assert set(_indexed_fields(qdrant)) == {"source", "type"}
+
+
+def test_quantization_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(cm, "QUANTIZATION", "")
+    qdrant = _qdrant(exists=False)
+    cm.ensure_collection(qdrant, "second_brain")
+
+    assert qdrant.create_collection.call_args.kwargs["quantization_config"] is None
+    assert cm.models.VectorParams.call_args.kwargs["on_disk"] is False
+
+
+def test_quantized_collection_keeps_originals_on_disk(monkeypatch):
+    monkeypatch.setattr(cm, "QUANTIZATION", "scalar")
+    qdrant = _qdrant(exists=False)
+    cm.ensure_collection(qdrant, "second_brain")
+
+    kwargs = qdrant.create_collection.call_args.kwargs
+    assert kwargs["quantization_config"] is cm.models.ScalarQuantization.return_value
+    assert cm.models.ScalarQuantizationConfig.call_args.kwargs["always_ram"] is True
+    assert cm.models.VectorParams.call_args.kwargs["on_disk"] is True
+
+
+def test_unknown_quantization_mode_is_rejected():
+    with pytest.raises(ValueError, match="int4"):
+        cm.quantization_config("int4")
+
+
+def test_set_quantization_converts_in_place():
+    qdrant = MagicMock()
+    cm.set_quantization(qdrant, "doc_knowledge", "binary")
+    kwargs = qdrant.update_collection.call_args.kwargs
+    assert kwargs["quantization_config"] is cm.models.BinaryQuantization.return_value
+    assert cm.models.VectorParamsDiff.call_args.kwargs["on_disk"] is True
+
+    cm.set_quantization(qdrant, "doc_knowledge", "none")
+    kwargs = qdrant.update_collection.call_args.kwargs
+    assert kwargs["quantization_config"] is cm.models.Disabled.DISABLED
+    assert cm.models.VectorParamsDiff.call_args.kwargs["on_disk"] is False
+    qdrant.recreate_collection.assert_not_called()
+    qdrant.delete_collection.assert_not_called()
@@ -0,0 +1,74 @@
+"""Tests for core/context_packer.py and its use in /chat."""
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from core.chunking import count_tokens
+from core.context_packer import _parse_budgets, budget_for, pack_context
+
+
+def test_packs_by_score_until_budget_and_keeps_memories_whole():
+    entries = [
+        ("low score but short", 0.50),
+        ("the best match " * 10, 0.95),
+        ("second best match " * 10, 0.90),
+    ]
+    budget = count_tokens(entries[1][0]) + 1 + count_tokens(entries[0][0]) + 1
+
+    packed = pack_context(entries, budget)
+
+    # 0.90 does not fit after 0.95; the short low-scored one still does.
+    assert [idx for idx, _ in packed] == [1, 0]
+    assert all(text == entries[idx][0] for idx, text in packed)
+
+
+def test_near_duplicates_are_dropped():
+    entries = [
+        ("Aetna denied claim 2024-001 with code CO-97 on March 3", 0.9),
+        ("Aetna denied claim 2024-001 with code CO-97 on March 3.", 0.89),
+        ("Patient follow-up scheduled for April", 0.6),
+    ]
+
+    packed = pack_context(entries, budget=1000)
+
+    assert [idx for idx, _ in packed] == [0, 2]
+
+
+def test_oversized_top_memory_is_truncated_rather_than_dropped():
+    entries = [("word " * 500, 0.9)]
+
+    packed = pack_context(entries, budget=50)
+
+    assert len(packed) == 1
+    assert count_tokens(packed[0][1]) <= 50
+
+
+def test_per_model_budgets(monkeypatch):
+    import core.context_packer as cp
+    monkeypatch.setattr(cp, "_MODEL_BUDGETS", _parse_budgets("llama3.1:latest=1500, phi3=600, junk"))
+
+    assert budget_for("phi3") == 600
+    assert budget_for("llama3.1:latest") == 1500
+    assert budget_for("other") == cp.CONTEXT_TOKEN_BUDGET
+
+
+def test_chat_sources_list_only_packed_memories(monkeypatch):
+    import core.context_packer as cp
+    from core.brain import app
+    monkeypatch.setattr(cp, "CONTEXT_TOKEN_BUDGET", 40)
+    response = MagicMock()
+    response.points = [
+        SimpleNamespace(id="a", score=0.9, payload={"memory": "short fact about the budget", "classification": "PUBLIC"}),
+        SimpleNamespace(id="b", score=0.8, payload={"memory": "long " * 200, "classification": "PUBLIC"}),
+    ]
+
+    with patch("api.chat.aget_embedding", return_value=[0.1]), \
+         patch("core.retrieval.client.search", return_value=response), \
+         patch("api.chat.allm.chat", return_value="ok") as chat, \
+         patch("api.chat.log_agent_action"):
+        r = TestClient(app).post("/chat", json={"text": "budget?"})
+
+    assert [s["memory"] for s in r.json()["context_used"]] == ["short fact about the budget"]
+    system_prompt = chat.call_args.kwargs["messages"][0]["content"]
+    assert "long long" not in system_prompt
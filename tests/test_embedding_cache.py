@@ -0,0 +1,218 @@
+"""Tests for core/embedding_cache.py and the cached get_embedding(s) path in core/deps.py."""
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+from cryptography.fernet import Fernet
+
+from core.embedding_cache import EmbeddingCache
+
+_MODEL = "nomic-embed-text:latest"
+
+
+@pytest.fixture()
+def key():
+    return Fernet.generate_key()
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    return str(tmp_path / "embedding_cache.db")
+
+
+def test_miss_then_memory_hit(key, db_path):
+    cache = EmbeddingCache(key, db_path=db_path)
+
+    assert cache.get(_MODEL, "hello") is None
+    cache.put(_MODEL, "hello", [0.5, 0.25])
+
+    assert cache.get(_MODEL, "hello") == [0.5, 0.25]
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_disk_tier_survives_restart(key, db_path):
+    EmbeddingCache(key, db_path=db_path).put(_MODEL, "persist me", [0.5, 0.25])
+
+    reopened = EmbeddingCache(key, db_path=db_path)
+
+    assert reopened.get(_MODEL, "persist me") == [0.5, 0.25]
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_key_includes_model_name(key, db_path):
+    cache = EmbeddingCache(key, db_path=db_path)
+    cache.put(_MODEL, "same text", [1.0])
+
+    assert cache.get("other-embedder:latest", "same text") is None
+
+
+def test_disk_rows_are_encrypted_and_hashed(key, db_path):
+    EmbeddingCache(key, db_path=db_path).put(_MODEL, "secret diagnosis", [0.5])
+
+    conn = sqlite3.connect(db_path)
+    text_hash, blob = conn.execute("SELECT text_hash, vector FROM embedding_cache").fetchone()
+    conn.close()
+
+    assert "secret" not in text_hash
+    assert Fernet(key).decrypt(blob)  # decryptable with the vault key
+    with pytest.raises(Exception):
+        Fernet(Fernet.generate_key()).decrypt(blob)
+
+
+def test_wrong_key_is_a_miss_not_an_error(key, db_path):
+    EmbeddingCache(key, db_path=db_path).put(_MODEL, "rotated", [0.5])
+
+    rotated = EmbeddingCache(Fernet.generate_key(), db_path=db_path)
+
+    assert rotated.get(_MODEL, "rotated") is None
+    assert rotated.stats()["misses"] == 1
+
+
+def test_memory_hit_does_not_wait_on_a_disk_read(key, db_path):
+    """A slow disk read + decrypt must not hold the lock memory hits need."""
+    import threading
+
+    EmbeddingCache(key, db_path=db_path).put(_MODEL, "on disk", [0.5])
+    cache = EmbeddingCache(key, db_path=db_path)
+    cache.put(_MODEL, "in memory", [1.0])
+
+    decoding, release = threading.Event(), threading.Event()
+    real_decode = cache._decode
+
+    def slow_decode(blob):
+        decoding.set()
+        release.wait(5)
+        return real_decode(blob)
+
+    cache._decode = slow_decode
+    reader = threading.Thread(target=cache.get, args=(_MODEL, "on disk"))
+    reader.start()
+    try:
+        assert decoding.wait(5)
+        hit = []
+        other = threading.Thread(target=lambda: hit.append(cache.get(_MODEL, "in memory")))
+        other.start()
+        other.join(1)
+        assert hit == [[1.0]]
+    finally:
+        release.set()
+        reader.join()
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_memory_tier_evicts_least_recently_used(key):
+    cache = EmbeddingCache(key, db_path=None, memory_entries=2)
+    cache.put(_MODEL, "a", [1.0])
+    cache.put(_MODEL, "b", [2.0])
+    cache.get(_MODEL, "a")          # a is now most recent
+    cache.put(_MODEL, "c", [3.0])   # evicts b
+
+    assert cache.get(_MODEL, "b") is None
+    assert cache.get(_MODEL, "a") == [1.0]
+    assert cache.stats()["memory_entries"] == 2
+
+
+def test_disk_tier_pruned_to_max_rows(key, db_path, monkeypatch):
+    import core.embedding_cache as ec
+    monkeypatch.setattr(ec, "_PRUNE_INTERVAL", 1)
+    cache = EmbeddingCache(key, db_path=db_path, memory_entries=0, max_disk_rows=3)
+
+    for i in range(5):
+        cache.put(_MODEL, f"text-{i}", [float(i)])
+
+    assert cache.stats()["disk_entries"] == 3
+    assert cache.get(_MODEL, "text-0") is None
+    assert cache.get(_MODEL, "text-4") == [4.0]
+
+
+# ── core.deps integration ─────────────────────────────────────────────────────
+
+def test_get_embedding_serves_repeat_from_cache(key, monkeypatch):
+    import core.deps as deps
+    coalescer = MagicMock()
+    coalescer.embed.return_value = [0.5]
+    monkeypatch.setattr(deps, "embedding_cache", EmbeddingCache(key))
+    monkeypatch.setattr(deps, "_embed_coalescer", coalescer)
+
+    assert deps.get_embedding("repeat question") == [0.5]
+    assert deps.get_embedding("repeat question") == [0.5]
+    coalescer.embed.assert_called_once_with("repeat question")
+
+
+def test_get_embeddings_only_sends_misses(key, monkeypatch):
+    import core.deps as deps
+    cache = EmbeddingCache(key)
+    cache.put(deps.EMBED_MODEL, "known", [1.0])
+    llm = MagicMock()
+    llm.embed_many.return_value = [[2.0], [3.0]]
+    monkeypatch.setattr(deps, "embedding_cache", cache)
+    monkeypatch.setattr(deps, "llm", llm)
+
+    result = deps.get_embeddings(["new-a", "known", "new-b"])
+
+    assert result == [[2.0], [1.0], [3.0]]
+    llm.embed_many.assert_called_once_with(["new-a", "new-b"])
+    assert cache.get(deps.EMBED_MODEL, "new-b") == [3.0]
+
+
+def test_embeddings_go_upstream_in_bounded_batches(key, monkeypatch):
+    import asyncio
+    from unittest.mock import AsyncMock
+
+    import core.deps as deps
+    monkeypatch.setattr(deps, "EMBED_MAX_BATCH", 2)
+    monkeypatch.setattr(deps, "embedding_cache", None)
+    llm, allm = MagicMock(), MagicMock()
+    llm.embed_many.side_effect = lambda texts: [[float(t)] for t in texts]
+    allm.embed_many = AsyncMock(side_effect=lambda texts: [[float(t)] for t in texts])
+    monkeypatch.setattr(deps, "llm", llm)
+    monkeypatch.setattr(deps, "allm", allm)
+
+    assert deps.get_embeddings(["1", "2", "3", "4", "5"]) == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert [c.args[0] for c in llm.embed_many.call_args_list] == [["1", "2"], ["3", "4"], ["5"]]
+    assert asyncio.run(deps.aget_embeddings(["1", "2", "3"])) == [[1.0], [2.0], [3.0]]
+    assert allm.embed_many.await_count == 2
+
+    llm.embed_many.side_effect = [[[1.0], [2.0]], None]
+    assert deps.get_embeddings(["1", "2", "3"]) is None
+
+
+def test_async_embeddings_touch_the_cache_off_the_event_loop(key, monkeypatch):
+    """SQLite + Fernet + the cache lock must never run on the loop thread."""
+    import asyncio
+    import threading
+    from unittest.mock import AsyncMock
+
+    import core.deps as deps
+
+    loop_thread = threading.get_ident()
+    touched: list[int] = []
+
+    class SpyCache(EmbeddingCache):
+        def get(self, *args):
+            touched.append(threading.get_ident())
+            return super().get(*args)
+
+        def put(self, *args):
+            touched.append(threading.get_ident())
+            super().put(*args)
+
+    cache = SpyCache(key)
+    cache.put(deps.EMBED_MODEL, "known", [1.0])
+    touched.clear()
+    allm = MagicMock()
+    allm.embed_many = AsyncMock(return_value=[[2.0]])
+    coalescer = MagicMock()
+    coalescer.embed = AsyncMock(return_value=[3.0])
+    monkeypatch.setattr(deps, "embedding_cache", cache)
+    monkeypatch.setattr(deps, "allm", allm)
+    monkeypatch.setattr(deps, "_aembed_coalescer", coalescer)
+
+    async def run():
+        return await deps.aget_embeddings(["known", "new"]), await deps.aget_embedding("other")
+
+    assert asyncio.run(run()) == ([[1.0], [2.0]], [3.0])
+    assert len(touched) == 5 and loop_thread not in touched
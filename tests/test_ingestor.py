@@ -7,6 +7,9 @@ Covers:
 - Parse exception → quarantine (failed/) with _parse_error suffix
 - Successful ingest → file moves to processed/
 - API error → file stays in inbox/ for retry
+- Half-written files are skipped until their size settles
+- inotify watcher wake-ups, polling fallback and backoff in watch_inbox
+- Parse process pool: heavy formats parsed in workers, kill-on-timeout
 """
 import os
 import sys
@@ -29,6 +32,15 @@ if "openpyxl" not in sys.modules:
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
 
+@pytest.fixture(autouse=True)
+def _inline_parsing():
+    """Parse in-process so tests that patch extract_text / openpyxl see their
+    patches. Pool tests re-patch _PARSE_WORKERS themselves."""
+    from sensors import ingestor
+    with patch.object(ingestor, "_PARSE_WORKERS", 0):
+        yield
+
+
 def _make_inbox(tmp_path: Path):
     inbox = tmp_path / "inbox"
     inbox.mkdir()
@@ -153,7 +165,7 @@ def test_api_error_leaves_file_in_inbox(tmp_path):
         patch.object(ingestor, "INBOX_DIR", str(inbox)),
         patch.object(ingestor, "PROCESSED_DIR", str(processed)),
         patch.object(ingestor, "FAILED_DIR", str(failed)),
-        patch.object(ingestor.gateway, "post", return_value=mock_resp),
+        patch.object(ingestor.async_gateway, "post", return_value=mock_resp),
     ):
         ingestor.scan_inbox()
 
@@ -178,9 +190,209 @@ def test_successful_ingest_moves_to_processed(tmp_path):
         patch.object(ingestor, "INBOX_DIR", str(inbox)),
         patch.object(ingestor, "PROCESSED_DIR", str(processed)),
         patch.object(ingestor, "FAILED_DIR", str(failed)),
-        patch.object(ingestor.gateway, "post", return_value=mock_resp),
+        patch.object(ingestor.async_gateway, "post", return_value=mock_resp),
     ):
         ingestor.scan_inbox()
 
     assert not f.exists()
     assert (processed / "report.txt").exists()
+
+
+# ── Settle check: half-written files wait for the next wake-up ────────────────
+
+def test_file_still_growing_is_left_for_next_scan(tmp_path):
+    """A file whose size changes during the settle window is not ingested yet."""
+    inbox, processed, failed = _make_inbox(tmp_path)
+    growing = inbox / "upload.txt"
+    growing.write_text("partial")
+
+    def _writer_still_going(_seconds):
+        with open(growing, "a") as fh:
+            fh.write(" more bytes")
+
+    from sensors import ingestor
+    with (
+        patch.object(ingestor, "INBOX_DIR", str(inbox)),
+        patch.object(ingestor, "PROCESSED_DIR", str(processed)),
+        patch.object(ingestor, "FAILED_DIR", str(failed)),
+        patch.object(ingestor.time, "sleep", side_effect=_writer_still_going),
+        patch.object(ingestor.async_gateway, "post") as post,
+    ):
+        ingestor.scan_inbox()
+
+    post.assert_not_called()
+    assert growing.exists()
+
+
+# ── Watchers ──────────────────────────────────────────────────────────────────
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_watcher_wakes_on_drop_and_times_out_when_idle(tmp_path):
+    from sensors.inbox_watcher import InotifyWatcher
+    watcher = InotifyWatcher(str(tmp_path), debounce=0.01)
+    try:
+        assert watcher.wait(timeout=0.01) is False
+        (tmp_path / "drop.txt").write_text("hello")
+        assert watcher.wait(timeout=1) is True
+        assert watcher.wait(timeout=0.01) is False  # burst collapsed into one wake-up
+    finally:
+        watcher.close()
+
+
+def test_make_watcher_falls_back_to_polling(tmp_path):
+    from sensors import inbox_watcher
+    with patch.object(inbox_watcher, "InotifyWatcher", side_effect=OSError("no inotify")):
+        watcher = inbox_watcher.make_watcher(str(tmp_path), mode="auto", poll_interval=5)
+    assert watcher.mode == "poll"
+
+    with patch.object(inbox_watcher, "InotifyWatcher", side_effect=OSError("no inotify")):
+        with pytest.raises(OSError):
+            inbox_watcher.make_watcher(str(tmp_path), mode="inotify")
+
+
+def test_watch_inbox_backs_off_without_waiting_on_events(tmp_path):
+    """On API errors the loop sleeps the full backoff; watcher events can't cut it short."""
+    from sensors import ingestor
+    watcher = MagicMock()
+    sleeps = []
+
+    def _sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            raise KeyboardInterrupt
+
+    with (
+        patch.object(ingestor, "scan_inbox", return_value=True),
+        patch.object(ingestor.time, "sleep", side_effect=_sleep),
+        pytest.raises(KeyboardInterrupt),
+    ):
+        ingestor.watch_inbox(watcher)
+
+    assert sleeps == [ingestor.BASE_SLEEP * 2, ingestor.BASE_SLEEP * 4]
+    watcher.wait.assert_not_called()
+    watcher.drain.assert_called_once()
+
+
+# ── Pipeline: process-pool parsing ────────────────────────────────────────────
+
+def test_pipeline_parses_docx_in_worker_and_uploads(tmp_path):
+    import docx
+    inbox, processed, failed = _make_inbox(tmp_path)
+    document = docx.Document()
+    document.add_paragraph("Claim number: 2024-AET-777")
+    document.save(str(inbox / "letter.docx"))
+    (inbox / "note.txt").write_text("plain note")
+
+    mock_resp = MagicMock()
+    mock_resp.status_code = 200
+    mock_resp.json.return_value = {"status": "raw_data_saved", "id": "abc"}
+
+    from sensors import ingestor
+    with (
+        patch.object(ingestor, "INBOX_DIR", str(inbox)),
+        patch.object(ingestor, "PROCESSED_DIR", str(processed)),
+        patch.object(ingestor, "FAILED_DIR", str(failed)),
+        patch.object(ingestor, "_PARSE_WORKERS", 1),
+        patch.object(ingestor, "_parse_pool", None),
+        patch.object(ingestor.async_gateway, "post", return_value=mock_resp) as post,
+    ):
+        try:
+            had_error = ingestor.scan_inbox()
+        finally:
+            if ingestor._parse_pool is not None:
+                ingestor._parse_pool.close()
+
+    assert had_error is False
+    assert sorted(p.name for p in processed.iterdir()) == ["letter.docx", "note.txt"]
+    sent = {c.kwargs["json"]["document_keys"].get("claim_number") for c in post.call_args_list}
+    assert "2024-AET-777" in sent
+
+
+def test_broken_document_in_pool_is_quarantined_as_unsupported(tmp_path):
+    """Same reason as the inline path, where extract_text turns parser errors into None."""
+    inbox, processed, failed = _make_inbox(tmp_path)
+    (inbox / "broken.docx").write_bytes(b"not a zip archive")
+
+    from sensors import ingestor
+    with (
+        patch.object(ingestor, "INBOX_DIR", str(inbox)),
+        patch.object(ingestor, "PROCESSED_DIR", str(processed)),
+        patch.object(ingestor, "FAILED_DIR", str(failed)),
+        patch.object(ingestor, "_PARSE_WORKERS", 1),
+        patch.object(ingestor, "_parse_pool", None),
+        patch.object(ingestor.async_gateway, "post") as post,
+    ):
+        try:
+            ingestor.scan_inbox()
+        finally:
+            if ingestor._parse_pool is not None:
+                ingestor._parse_pool.close()
+
+    post.assert_not_called()
+    assert [p.name for p in failed.iterdir()] == ["broken_unsupported.docx"]
+
+
+def test_zero_upload_concurrency_still_finishes(tmp_path):
+    """INGESTOR_UPLOAD_CONCURRENCY=0 runs one uploader — and it must get its stop sentinel."""
+    import asyncio
+    inbox, processed, failed = _make_inbox(tmp_path)
+    (inbox / "note.txt").write_text("plain note")
+
+    mock_resp = MagicMock()
+    mock_resp.status_code = 200
+    mock_resp.json.return_value = {"status": "raw_data_saved", "id": "abc"}
+
+    from sensors import ingestor
+    with (
+        patch.object(ingestor, "INBOX_DIR", str(inbox)),
+        patch.object(ingestor, "PROCESSED_DIR", str(processed)),
+        patch.object(ingestor, "FAILED_DIR", str(failed)),
+        patch.object(ingestor, "_UPLOAD_CONCURRENCY", 0),
+        patch.object(ingestor.async_gateway, "post", return_value=mock_resp),
+    ):
+        had_error = asyncio.run(asyncio.wait_for(ingestor._run_pipeline(["note.txt"]), timeout=5))
+
+    assert had_error is False
+    assert [p.name for p in processed.iterdir()] == ["note.txt"]
+
+
+def test_parse_pool_kills_wedged_worker_and_recovers():
+    import asyncio
+    import time as _time
+    from sensors.parsers import ParsePool, ParseTimeout
+
+    pool = ParsePool(workers=1)
+
+    async def _run():
+        with pytest.raises(ParseTimeout):
+            await pool.run(_time.sleep, 30, timeout=0.5)
+        # Fresh executor after the kill — the next parse still works.
+        return await pool.run(len, "four", timeout=10)
+
+    try:
+        t0 = _time.monotonic()
+        assert asyncio.run(_run()) == 4
+        assert _time.monotonic() - t0 < 10
+    finally:
+        pool.close()
+
+
+def test_watch_inbox_backs_off_on_files_it_cannot_clear(tmp_path):
+    """A file a scan leaves behind unchanged is retried at a growing interval, not every 100 ms."""
+    inbox, processed, failed = _make_inbox(tmp_path)
+    (inbox / "stuck.txt").write_text("quarantine move keeps failing")
+
+    from sensors import ingestor
+    watcher = MagicMock()
+    watcher.wait.side_effect = [False] * 4 + [KeyboardInterrupt]
+
+    with (
+        patch.object(ingestor, "INBOX_DIR", str(inbox)),
+        patch.object(ingestor, "scan_inbox", return_value=False),
+        patch.object(ingestor, "_SETTLE_SECONDS", 0.05),
+        pytest.raises(KeyboardInterrupt),
+    ):
+        ingestor.watch_inbox(watcher)
+
+    timeouts = [c.kwargs["timeout"] for c in watcher.wait.call_args_list]
+    assert timeouts == [0.1, 0.2, 0.4, 0.8, 1.6]
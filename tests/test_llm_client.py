@@ -1,7 +1,19 @@
 """Tests for core/llm_client.py — OllamaEngine + LLMEngine Protocol."""
-from unittest.mock import MagicMock
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
 
-from core.llm_client import LLMEngine, OllamaEngine
+import pytest
+
+from core.llm_client import (
+    AsyncEmbeddingCoalescer,
+    AsyncLLMEngine,
+    AsyncOllamaEngine,
+    EmbeddingCoalescer,
+    LLMEngine,
+    OllamaEngine,
+)
 
 
 def _make_engine():
@@ -22,7 +34,8 @@ def test_embed_returns_vector_on_success():
 
     result = engine.embed("hello world")
 
-    assert result == [0.1, 0.2, 0.3]
+    # Unit length, like the batch /api/embed endpoint returns.
+    assert result == pytest.approx([0.1 / 0.374166, 0.2 / 0.374166, 0.3 / 0.374166], rel=1e-5)
     gw.post.assert_called_once()
     call_json = gw.post.call_args.kwargs["json"]
     assert call_json["model"] == "nomic-embed-text:latest"
@@ -85,3 +98,245 @@ def test_chat_returns_none_on_connection_error():
     gw.post.side_effect = ConnectionError("refused")
 
     assert engine.chat([{"role": "user", "content": "hi"}]) is None
+
+
+# ── Batch embedding ───────────────────────────────────────────────────────────
+
+def test_embed_many_posts_input_array_to_batch_endpoint():
+    engine, gw = _make_engine()
+    resp = MagicMock()
+    resp.json.return_value = {"embeddings": [[0.1], [0.2]]}
+    gw.post.return_value = resp
+
+    result = engine.embed_many(["a", "b"])
+
+    assert result == [[0.1], [0.2]]
+    assert gw.post.call_args.args[1] == "/api/embed"
+    assert gw.post.call_args.kwargs["json"]["input"] == ["a", "b"]
+
+
+def test_embed_many_empty_input_skips_request():
+    engine, gw = _make_engine()
+
+    assert engine.embed_many([]) == []
+    gw.post.assert_not_called()
+
+
+def test_embed_many_returns_none_on_count_mismatch():
+    engine, gw = _make_engine()
+    resp = MagicMock()
+    resp.json.return_value = {"embeddings": [[0.1]]}
+    gw.post.return_value = resp
+
+    assert engine.embed_many(["a", "b"]) is None
+
+
+def test_embed_many_returns_none_on_connection_error():
+    engine, gw = _make_engine()
+    gw.post.side_effect = ConnectionError("refused")
+
+    assert engine.embed_many(["a"]) is None
+
+
+# ── EmbeddingCoalescer ────────────────────────────────────────────────────────
+
+def test_coalescer_single_call_uses_plain_embed():
+    engine = MagicMock()
+    engine.embed.return_value = [0.5]
+    coalescer = EmbeddingCoalescer(engine, window_ms=1)
+
+    assert coalescer.embed("solo") == [0.5]
+    engine.embed.assert_called_once_with("solo")
+    engine.embed_many.assert_not_called()
+
+
+def test_coalescer_merges_concurrent_calls_into_one_batch():
+    engine = MagicMock()
+    engine.embed_many.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    coalescer = EmbeddingCoalescer(engine, window_ms=200)
+
+    texts = ["a", "bb", "ccc", "dddd"]
+    results: dict[str, list[float] | None] = {}
+    barrier = threading.Barrier(len(texts))
+
+    def worker(text):
+        barrier.wait()
+        results[text] = coalescer.embed(text)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in texts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {t: [float(len(t))] for t in texts}
+    engine.embed_many.assert_called_once()
+    assert sorted(engine.embed_many.call_args.args[0]) == sorted(texts)
+    engine.embed.assert_not_called()
+
+
+def test_coalescer_batch_failure_returns_none_to_every_caller():
+    engine = MagicMock()
+    engine.embed_many.return_value = None
+    coalescer = EmbeddingCoalescer(engine, window_ms=200)
+
+    results = []
+    barrier = threading.Barrier(3)
+
+    def worker(text):
+        barrier.wait()
+        results.append(coalescer.embed(text))
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in ("x", "y", "z")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [None, None, None]
+
+
+def test_coalescer_zero_window_passes_through():
+    engine = MagicMock()
+    engine.embed.return_value = [1.0]
+    coalescer = EmbeddingCoalescer(engine, window_ms=0)
+
+    assert coalescer.embed("direct") == [1.0]
+    engine.embed.assert_called_once_with("direct")
+
+
+# ── AsyncOllamaEngine ─────────────────────────────────────────────────────────
+
+def _make_async_engine():
+    gw = MagicMock()
+    gw.post = AsyncMock()
+    return AsyncOllamaEngine(gw, default_model="llama3.1:latest"), gw
+
+
+def test_async_engine_satisfies_protocol():
+    engine, _ = _make_async_engine()
+    assert isinstance(engine, AsyncLLMEngine)
+
+
+def test_async_embed_returns_vector_on_success():
+    engine, gw = _make_async_engine()
+    resp = MagicMock()
+    resp.json.return_value = {"embedding": [3.0, 4.0]}
+    gw.post.return_value = resp
+
+    assert asyncio.run(engine.embed("hello")) == [0.6, 0.8]
+    assert gw.post.call_args.kwargs["json"]["prompt"] == "hello"
+
+
+def test_async_chat_returns_none_on_connection_error():
+    engine, gw = _make_async_engine()
+    gw.post.side_effect = ConnectionError("refused")
+
+    assert asyncio.run(engine.chat([{"role": "user", "content": "hi"}])) is None
+
+
+def test_async_stream_chat_yields_tokens_until_done():
+    engine, gw = _make_async_engine()
+    lines = [
+        '{"message": {"content": "Hel"}}',
+        "",
+        '{"message": {"content": "lo"}}',
+        '{"message": {"content": ""}, "done": true}',
+        '{"message": {"content": "ignored"}}',
+    ]
+
+    async def aiter_lines():
+        for line in lines:
+            yield line
+
+    @asynccontextmanager
+    async def fake_stream(*args, **kwargs):
+        resp = MagicMock()
+        resp.aiter_lines = aiter_lines
+        yield resp
+
+    gw.stream = fake_stream
+
+    async def collect():
+        return [t async for t in engine.stream_chat([{"role": "user", "content": "hi"}])]
+
+    assert asyncio.run(collect()) == ["Hel", "lo"]
+
+
+def test_async_stream_chat_raises_on_transport_errors():
+    """A failed stream must not look like a finished one — callers cache finished answers."""
+    engine, gw = _make_async_engine()
+
+    @asynccontextmanager
+    async def broken_stream(*args, **kwargs):
+        raise ConnectionError("refused")
+        yield  # pragma: no cover
+
+    gw.stream = broken_stream
+
+    async def collect():
+        return [t async for t in engine.stream_chat([{"role": "user", "content": "hi"}])]
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(collect())
+
+
+def test_async_stream_chat_raises_when_cut_off_before_done():
+    engine, gw = _make_async_engine()
+
+    async def aiter_lines():
+        yield '{"message": {"content": "Hel"}}'
+
+    @asynccontextmanager
+    async def fake_stream(*args, **kwargs):
+        resp = MagicMock()
+        resp.aiter_lines = aiter_lines
+        yield resp
+
+    gw.stream = fake_stream
+    seen = []
+
+    async def collect():
+        async for t in engine.stream_chat([{"role": "user", "content": "hi"}]):
+            seen.append(t)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(collect())
+    assert seen == ["Hel"]
+
+
+# ── AsyncEmbeddingCoalescer ───────────────────────────────────────────────────
+
+def test_async_coalescer_merges_concurrent_calls():
+    engine = MagicMock()
+    engine.embed = AsyncMock()
+    engine.embed_many = AsyncMock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+    coalescer = AsyncEmbeddingCoalescer(engine, window_ms=20)
+
+    async def run():
+        return await asyncio.gather(*(coalescer.embed(t) for t in ["a", "bb", "ccc"]))
+
+    assert asyncio.run(run()) == [[1.0], [2.0], [3.0]]
+    engine.embed_many.assert_awaited_once()
+    engine.embed.assert_not_awaited()
+
+
+def test_async_coalescer_single_call_uses_plain_embed():
+    engine = MagicMock()
+    engine.embed = AsyncMock(return_value=[0.5])
+    engine.embed_many = AsyncMock()
+    coalescer = AsyncEmbeddingCoalescer(engine, window_ms=1)
+
+    assert asyncio.run(coalescer.embed("solo")) == [0.5]
+    engine.embed_many.assert_not_awaited()
+
+
+def test_async_coalescer_failure_resolves_every_caller_to_none():
+    engine = MagicMock()
+    engine.embed_many = AsyncMock(side_effect=RuntimeError("boom"))
+    coalescer = AsyncEmbeddingCoalescer(engine, window_ms=5)
+
+    async def run():
+        return await asyncio.gather(coalescer.embed("x"), coalescer.embed("y"))
+
+    assert asyncio.run(run()) == [None, None]
@@ -8,6 +8,7 @@ Covers:
 4. Legacy compat: points with no "encrypted" field returned as-is
 5. Key loading from ENGRAM_ENCRYPTION_KEY env var
 6. Key loading auto-generates vault.key when env var is absent
+7. Lazy, per-field-group decryption of read payloads
 """
 import json
 import os
@@ -265,3 +266,219 @@ def test_scroll_skips_decryption_when_no_payload():
 
     # Just verifies no exception raised and result is passed through
     assert len(results) == 1
+
+
+# ─── Test 9: write_many() chunks, encrypts and reports per-point status ──────
+
+def _bulk_items(n: int) -> list[dict]:
+    return [
+        {
+            "point_id": f"pt-{i:03d}",
+            "vector": [0.1] * 4,
+            "payload": {**SAMPLE_PAYLOAD, "memory": f"memory {i}"},
+            "classification": "PHI",
+        }
+        for i in range(n)
+    ]
+
+
+def test_write_many_chunks_upserts_without_waiting():
+    """write_many() sends ceil(n / chunk_size) upserts, each with wait=False."""
+    client, mock_qdrant = make_client()
+
+    with patch("core.memory_client.models.PointStruct", FakePointStruct):
+        results = client.write_many("second_brain", _bulk_items(50), chunk_size=20)
+
+    assert mock_qdrant.upsert.call_count == 3
+    assert [len(c.kwargs["points"]) for c in mock_qdrant.upsert.call_args_list] == [20, 20, 10]
+    assert all(c.kwargs["wait"] is False for c in mock_qdrant.upsert.call_args_list)
+    assert [r["id"] for r in results] == [f"pt-{i:03d}" for i in range(50)]
+    assert all(r["status"] == "acknowledged" for r in results)
+
+
+def test_write_many_payloads_round_trip_through_decrypt():
+    """Parallel-encrypted payloads decrypt to the original, with classification set."""
+    client, mock_qdrant = make_client()
+
+    with patch("core.memory_client.models.PointStruct", FakePointStruct):
+        client.write_many("second_brain", _bulk_items(40))
+
+    stored = mock_qdrant.upsert.call_args.kwargs["points"]
+    assert "memory" not in stored[7].payload
+    assert stored[7].payload["classification"] == "PHI"
+    recovered = client._decrypt_payload(dict(stored[7].payload))
+    assert recovered["memory"] == "memory 7"
+
+
+def test_write_many_failed_chunk_marks_only_its_points():
+    """An upsert failure errors its own chunk; other chunks still succeed."""
+    client, mock_qdrant = make_client()
+    mock_qdrant.upsert.side_effect = [None, RuntimeError("qdrant down"), None]
+
+    with patch("core.memory_client.models.PointStruct", FakePointStruct):
+        results = client.write_many("second_brain", _bulk_items(6), chunk_size=2)
+
+    assert [r["status"] for r in results] == [
+        "acknowledged", "acknowledged", "error", "error", "acknowledged", "acknowledged",
+    ]
+    assert "qdrant down" in results[2]["error"]
+
+
+def test_write_many_unserialisable_payload_fails_alone():
+    """A payload that cannot be encrypted is reported and skipped, not fatal."""
+    client, mock_qdrant = make_client()
+    items = _bulk_items(3)
+    items[1]["payload"]["memory"] = object()
+
+    with patch("core.memory_client.models.PointStruct", FakePointStruct):
+        results = client.write_many("second_brain", items)
+
+    assert [r["status"] for r in results] == ["acknowledged", "error", "acknowledged"]
+    assert len(mock_qdrant.upsert.call_args.kwargs["points"]) == 2
+
+
+def test_write_many_shares_one_encrypt_pool_across_threads():
+    """Concurrent first calls create a single pool; close() shuts it down."""
+    from concurrent.futures import ThreadPoolExecutor
+    client, _ = make_client()
+    created = []
+
+    class CountingPool(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            super().__init__(*args, **kwargs)
+
+    with patch("core.memory_client.models.PointStruct", FakePointStruct), \
+         patch("core.memory_client.ThreadPoolExecutor", CountingPool), \
+         ThreadPoolExecutor(max_workers=8) as callers:
+        list(callers.map(lambda _: client.write_many("second_brain", _bulk_items(40)), range(8)))
+
+    assert len(created) == 1
+    client.close()
+    assert client._encrypt_pool is None
+    assert created[0]._shutdown
+
+
+def test_search_many_issues_one_batch_call_and_decrypts():
+    """search_many() sends every query in one query_batch_points call."""
+    client, mock_qdrant = make_client()
+    encrypted = client._encrypt_payload({"memory": "batched", "user_id": "u1"})
+    point = MagicMock()
+    point.payload = encrypted
+    mock_qdrant.query_batch_points.return_value = [MagicMock(points=[point]), MagicMock(points=[])]
+
+    responses = client.search_many("second_brain", [([0.1], None), ([0.2], None)], limit=1, score_threshold=0.9)
+
+    mock_qdrant.query_batch_points.assert_called_once()
+    assert len(mock_qdrant.query_batch_points.call_args.kwargs["requests"]) == 2
+    assert responses[0].points[0].payload["memory"] == "batched"
+    assert client.search_many("second_brain", [], limit=1, score_threshold=0.9) == []
+
+
+def test_search_passes_quantization_params_only_when_asked():
+    """oversampling / rescore become SearchParams; without them Qdrant's defaults apply."""
+    client, mock_qdrant = make_client()
+    mock_qdrant.query_points.return_value = MagicMock(points=[])
+
+    with patch("core.memory_client.SEARCH_OVERSAMPLING", None):
+        client.search("second_brain", [0.1], None, limit=5, score_threshold=0.4)
+    assert mock_qdrant.query_points.call_args.kwargs["search_params"] is None
+
+    with patch("core.memory_client.models.QuantizationSearchParams", dict), \
+         patch("core.memory_client.models.SearchParams", dict):
+        client.search("second_brain", [0.1], None, limit=5, score_threshold=0.4,
+                      oversampling=3.0, rescore=True)
+    params = mock_qdrant.query_points.call_args.kwargs["search_params"]
+    assert params == {"quantization": {"oversampling": 3.0, "rescore": True}}
+
+
+# ─── Lazy, per-field-group decryption ─────────────────────────────────────────
+
+LARGE_PAYLOAD = {
+    **SAMPLE_PAYLOAD,
+    "embed_text": "x" * 50_000,
+    "claim_number": "CLM-1",
+}
+
+
+def _lazy_search(client, mock_qdrant, payload):
+    """Search returning one stored point; client._fernet.decrypt is spied on."""
+    point = MagicMock()
+    point.payload = client._encrypt_payload(payload)
+    mock_qdrant.query_points.return_value = MagicMock(points=[point])
+    client._fernet = MagicMock(wraps=client._fernet)
+    return client.search("second_brain", [0.1], None, limit=1, score_threshold=0.0).points[0].payload
+
+
+def test_large_fields_are_encrypted_separately():
+    client, _ = make_client()
+    stored = client._encrypt_payload(LARGE_PAYLOAD)
+
+    assert set(stored) == {
+        "user_id", "matter_id", "type", "status",
+        "encrypted", "encrypted_memory", "encrypted_embed_text",
+    }
+    assert all("CLM-1" not in v and "Patient X" not in v for k, v in stored.items() if k.startswith("encrypted"))
+
+
+def test_search_decrypts_nothing_until_a_field_is_read():
+    client, mock_qdrant = make_client()
+    payload = _lazy_search(client, mock_qdrant, LARGE_PAYLOAD)
+
+    assert payload["user_id"] == "user-abc"
+    client._fernet.decrypt.assert_not_called()
+
+    assert payload["memory"] == "Patient X has diagnosis Y"
+    assert client._fernet.decrypt.call_count == 1
+
+
+def test_listing_keys_does_not_decrypt_large_fields():
+    client, mock_qdrant = make_client()
+    payload = _lazy_search(client, mock_qdrant, LARGE_PAYLOAD)
+
+    assert set(payload) == set(LARGE_PAYLOAD)
+    assert "embed_text" in payload
+    assert client._fernet.decrypt.call_count == 1      # the shared blob only
+    assert dict(payload) == LARGE_PAYLOAD               # reading values opens the rest
+
+
+def test_single_blob_points_still_read_lazily():
+    """Points written before the split keep every sensitive field in "encrypted"."""
+    client, mock_qdrant = make_client()
+    legacy = {"user_id": "u1", "encrypted": client._fernet.encrypt(
+        json.dumps({"memory": "old", "embed_text": "old embed"}).encode()).decode()}
+    mock_qdrant.query_points.return_value = MagicMock(points=[MagicMock(payload=legacy)])
+
+    payload = client.search("second_brain", [0.1], None, limit=1, score_threshold=0.0).points[0].payload
+
+    assert payload["memory"] == "old"
+    assert payload.get("missing") is None
+    assert dict(payload) == {"user_id": "u1", "memory": "old", "embed_text": "old embed"}
+
+
+def test_decrypt_payload_projects_fields_eagerly():
+    client, _ = make_client()
+    client._fernet = MagicMock(wraps=client._fernet)
+    payload = client.decrypt_payload(client._encrypt_payload(LARGE_PAYLOAD), fields=("memory",))
+
+    assert client._fernet.decrypt.call_count == 1
+    assert payload["memory"] == "Patient X has diagnosis Y"
+    assert client._fernet.decrypt.call_count == 1
+    assert "Patient X" not in repr(payload)
+
+
+def test_lazy_payload_is_safe_to_read_from_several_threads():
+    """Concurrent reads and iteration: no 'dict changed size', each blob decrypted once."""
+    from concurrent.futures import ThreadPoolExecutor
+    key = Fernet.generate_key()
+    client, _ = make_client(key)
+    stored = client._encrypt_payload(LARGE_PAYLOAD)
+
+    for _ in range(20):
+        client._fernet = MagicMock(wraps=Fernet(key))
+        payload = client.decrypt_payload(dict(stored))
+        readers = [lambda: payload["memory"], lambda: payload["embed_text"], lambda: sorted(payload)] * 4
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda read: read(), readers))
+        assert dict(payload) == LARGE_PAYLOAD
+        assert client._fernet.decrypt.call_count == 3
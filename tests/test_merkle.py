@@ -0,0 +1,85 @@
+"""
+tests/test_merkle.py — RFC 6962 Merkle tree helpers (core/merkle.py).
+"""
+import hashlib
+
+import pytest
+
+from core import merkle
+
+
+def _leaves(n):
+    return [merkle.leaf_hash(hashlib.sha256(str(i).encode()).hexdigest()) for i in range(n)]
+
+
+def _reference_root(leaves):
+    """Direct recursive MTH from RFC 6962 §2.1."""
+    if not leaves:
+        return merkle.EMPTY_ROOT
+    if len(leaves) == 1:
+        return leaves[0]
+    k = 1 << ((len(leaves) - 1).bit_length() - 1)
+    return merkle.node_hash(_reference_root(leaves[:k]), _reference_root(leaves[k:]))
+
+
+def _store(leaves, batch=3):
+    nodes = {}
+    for start in range(0, len(leaves), batch):
+        for level, idx, h in merkle.append_nodes(lambda l, i: nodes[(l, i)], start, leaves[start:start + batch]):
+            nodes[(level, idx)] = h
+    return lambda level, idx: nodes[(level, idx)]
+
+
+def test_incremental_roots_match_reference():
+    leaves = _leaves(37)
+    get_node = _store(leaves)
+    for size in range(38):
+        assert merkle.root(get_node, size) == _reference_root(leaves[:size])
+
+
+def test_rfc6962_empty_and_single_leaf():
+    assert merkle.EMPTY_ROOT.hex() == "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+    leaf = merkle.leaf_hash("00" * 32)
+    assert merkle.root(_store([leaf]), 1) == leaf
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 8, 13, 32])
+def test_every_inclusion_proof_verifies(size):
+    leaves = _leaves(size)
+    get_node = _store(leaves)
+    root = merkle.root(get_node, size)
+    for index in range(size):
+        proof = merkle.inclusion_proof(get_node, index, size)
+        assert len(proof) <= size.bit_length()
+        assert merkle.verify_inclusion(leaves[index], index, size, proof, root)
+        if size > 1:
+            assert not merkle.verify_inclusion(leaves[(index + 1) % size], index, size, proof, root)
+
+
+@pytest.mark.parametrize("new_size", [2, 5, 8, 11, 16])
+def test_every_consistency_proof_verifies(new_size):
+    leaves = _leaves(new_size)
+    get_node = _store(leaves)
+    new_root = merkle.root(get_node, new_size)
+    for old_size in range(1, new_size + 1):
+        proof = merkle.consistency_proof(get_node, old_size, new_size)
+        old_root = merkle.root(get_node, old_size)
+        assert merkle.verify_consistency(old_size, new_size, old_root, new_root, proof)
+
+
+def test_consistency_fails_for_rewritten_history():
+    leaves = _leaves(9)
+    rewritten = list(leaves)
+    rewritten[2] = merkle.leaf_hash("ff" * 32)
+    old = _store(leaves)
+    new = _store(rewritten)
+    proof = merkle.consistency_proof(new, 4, 9)
+    assert not merkle.verify_consistency(4, 9, merkle.root(old, 4), merkle.root(new, 9), proof)
+
+
+def test_out_of_range_requests_rejected():
+    get_node = _store(_leaves(4))
+    with pytest.raises(ValueError):
+        merkle.inclusion_proof(get_node, 4, 4)
+    with pytest.raises(ValueError):
+        merkle.consistency_proof(get_node, 0, 4)
@@ -97,6 +97,38 @@ class TestUserRegistry:
     def test_get_user_by_id_missing_returns_none(self, registry):
         assert registry.get_user_by_id("no-such-id") is None
 
+    def test_key_lookup_is_cached(self, registry, monkeypatch):
+        """A repeated key lookup is served from memory, not SQLite."""
+        _, raw_key = registry.create_user("Eve")
+        assert registry.get_user_by_key(raw_key).display_name == "Eve"
+
+        def _no_db():
+            raise AssertionError("hit SQLite on a cached key")
+        monkeypatch.setattr(registry, "_get_conn", _no_db)
+
+        assert registry.get_user_by_key(raw_key).display_name == "Eve"
+
+    def test_cached_miss_cleared_when_user_created(self, registry, monkeypatch):
+        """A key cached as unknown resolves once the user behind it is created."""
+        monkeypatch.setattr(registry.uuid, "uuid4", MagicMock(side_effect=[
+            MagicMock(__str__=lambda _: "uid-1"), MagicMock(hex="a" * 32), MagicMock(hex="b" * 32),
+        ]))
+        assert registry.get_user_by_key("a" * 32 + "b" * 32) is None
+
+        registry.create_user("Frank")
+
+        assert registry.get_user_by_key("a" * 32 + "b" * 32).id == "uid-1"
+
+    def test_key_cache_entries_expire(self, registry, monkeypatch):
+        """Out-of-process edits show up once the TTL lapses."""
+        monkeypatch.setattr(registry, "USER_CACHE_TTL", 0)
+        _, raw_key = registry.create_user("Gina")
+        registry.get_user_by_key(raw_key)
+        with registry._get_conn() as conn:
+            conn.execute("UPDATE users SET display_name = 'Gina B'")
+
+        assert registry.get_user_by_key(raw_key).display_name == "Gina B"
+
 
 # ─── MUA-1: API auth behaviour ────────────────────────────────────────────────
 
@@ -112,7 +144,7 @@ class TestAuthBehavior:
         no_match = MagicMock()
         no_match.points = []
 
-        with patch("core.network_gateway.requests.post", side_effect=[embed_mock, ollama_mock]), \
+        with patch("core.network_gateway.httpx.AsyncClient.request", side_effect=[embed_mock, ollama_mock]), \
              patch("core.brain.client._qdrant.query_points", return_value=no_match):
             resp = brain_client.post("/chat", json={"text": "hello"})
 
@@ -228,6 +260,50 @@ class TestMatterRegistry:
         id2 = matter_reg.create_matter("Project X", created_by="u2")
         assert id1 != id2
 
+    def test_matter_and_acl_reads_are_cached(self, matter_reg, monkeypatch):
+        """After create_matter, lookups never touch SQLite."""
+        mid = matter_reg.create_matter("Cached", created_by="u1")
+        monkeypatch.setattr(matter_reg, "_get_conn", MagicMock(side_effect=AssertionError("hit SQLite")))
+
+        assert matter_reg.get_matter(mid)["status"] == "open"
+        assert matter_reg.check_access("u1", mid) is True
+
+    def test_cached_denial_flips_on_grant_and_close_updates_status(self, matter_reg):
+        mid = matter_reg.create_matter("Case Gamma", created_by="u1")
+        assert matter_reg.get_matter(mid)["status"] == "open"
+        assert matter_reg.check_access("u2", mid) is False   # negative is cached
+
+        matter_reg.grant_access(mid, "u2", granted_by="u1")
+        matter_reg.close_matter(mid, closed_by="u1")
+
+        assert matter_reg.check_access("u2", mid) is True
+        assert matter_reg.get_matter(mid)["status"] == "closed"
+
+    def test_check_access_many_uses_one_query_for_misses(self, matter_reg, monkeypatch):
+        a = matter_reg.create_matter("A", created_by="u1")
+        b = matter_reg.create_matter("B", created_by="u2")
+        matter_reg.invalidate_matter_cache()
+        real_conn = matter_reg._get_conn
+        opened = MagicMock(side_effect=real_conn)
+        monkeypatch.setattr(matter_reg, "_get_conn", opened)
+
+        result = matter_reg.check_access_many("u1", [a, b, "ghost"])
+
+        assert result == {a: True, b: False, "ghost": False}
+        assert opened.call_count == 1
+        assert matter_reg.check_access_many("u1", [a, b]) == {a: True, b: False}
+        assert opened.call_count == 1
+
+    def test_read_started_before_a_write_is_not_cached(self, matter_reg):
+        """A SQLite result fetched under an older _version is discarded."""
+        with matter_reg._cache_lock:
+            seen = matter_reg._version
+        matter_reg.grant_access("m-race", "u2", granted_by="u1")  # bumps _version
+        with matter_reg._cache_lock:
+            matter_reg._cache_store(matter_reg._access_cache, (matter_reg.DB_PATH, "u2", "m-race"), False, seen)
+
+        assert matter_reg.check_access("u2", "m-race") is True
+
 
 # ─── MUA-2: Matter access enforcement (via brain routes) ─────────────────────
 
@@ -241,7 +317,7 @@ class TestMatterEnforcement:
         no_match = MagicMock()
         no_match.points = []
 
-        with patch("core.network_gateway.requests.post", return_value=embed_mock), \
+        with patch("core.network_gateway.requests.Session.post", return_value=embed_mock), \
              patch("core.brain.client._qdrant.query_points", return_value=no_match), \
              patch("core.brain.client._qdrant.upsert"):
             resp = brain_client.post("/ingest", json={"text": "legacy data"})
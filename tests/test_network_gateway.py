@@ -1,10 +1,11 @@
-"""Tests for core/network_gateway.py — SSRF guard coverage (IPv4 + IPv6)."""
+"""Tests for core/network_gateway.py — SSRF guard coverage (IPv4 + IPv6) and pooled sessions."""
+import asyncio
 import socket
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
-from core.network_gateway import is_safe_url
+from core.network_gateway import AsyncNetworkGateway, NetworkGateway, is_safe_url
 
 
 def _make_resolver(ip: str):
@@ -113,3 +114,120 @@ class TestUnresolvableHostname:
         """A hostname that neither resolves nor is a valid IP literal is blocked."""
         with patch("core.network_gateway.socket.gethostbyname", side_effect=_fail_resolver):
             assert not is_safe_url("http://this.host.does.not.exist.invalid/")
+
+
+class TestPooledSessions:
+    def _ok(self):
+        resp = MagicMock()
+        resp.status_code = 200
+        return resp
+
+    def test_same_label_reuses_one_session(self):
+        gw = NetworkGateway()
+        assert gw._session("ollama") is gw._session("ollama")
+
+    def test_each_label_gets_its_own_session(self):
+        gw = NetworkGateway()
+        assert gw._session("ollama") is not gw._session("brain")
+
+    def test_default_timeout_applied_when_caller_omits_it(self):
+        gw = NetworkGateway()
+        with patch("core.network_gateway.requests.Session.post", return_value=self._ok()) as mock_post:
+            gw.post("ollama", "/api/chat", json={})
+        assert mock_post.call_args.kwargs["timeout"] == (5, 60)
+
+    def test_explicit_timeout_is_preserved(self):
+        gw = NetworkGateway()
+        with patch("core.network_gateway.requests.Session.get", return_value=self._ok()) as mock_get:
+            gw.get("brain", "/api/matters", timeout=3)
+        assert mock_get.call_args.kwargs["timeout"] == 3
+
+    def test_explicit_none_timeout_is_preserved(self):
+        gw = NetworkGateway()
+        with patch("core.network_gateway.requests.Session.post", return_value=self._ok()) as mock_post:
+            gw.post("ollama", "/api/pull", json={}, timeout=None)
+        assert mock_post.call_args.kwargs["timeout"] is None
+
+    def test_unknown_label_rejected_before_any_session(self):
+        gw = NetworkGateway()
+        with pytest.raises(ValueError):
+            gw.post("evil", "/x")
+        assert gw._sessions == {}
+
+    def test_crawler_ssrf_guard_still_enforced(self):
+        gw = NetworkGateway()
+        with patch("core.network_gateway.requests.Session.get") as mock_get:
+            with pytest.raises(PermissionError):
+                gw.get("crawler", "http://169.254.169.254/latest/meta-data/")
+        mock_get.assert_not_called()
+
+    def test_sessions_never_store_cookies(self):
+        import requests
+        gw = NetworkGateway()
+        session = gw._session("crawler")
+        request = requests.Request("GET", "https://example.com/").prepare()
+        session.cookies.extract_cookies(
+            _FakeResponse({"Set-Cookie": "tracker=1; Path=/"}),
+            requests.cookies.MockRequest(request),
+        )
+        assert len(session.cookies) == 0
+
+    def test_close_drops_sessions(self):
+        gw = NetworkGateway()
+        gw._session("ollama")
+        gw.close()
+        assert gw._sessions == {}
+
+
+class TestAsyncGateway:
+    def _ok(self):
+        resp = MagicMock()
+        resp.status_code = 200
+        return resp
+
+    def test_post_resolves_allowlisted_url_and_applies_default_timeout(self, monkeypatch):
+        monkeypatch.setenv("OLLAMA_HOST", "http://ollama.test:11434")
+        gw = AsyncNetworkGateway()
+        with patch("core.network_gateway.httpx.AsyncClient.request", return_value=self._ok()) as mock_req:
+            asyncio.run(gw.post("ollama", "/api/chat", json={}))
+        method, url = mock_req.call_args.args
+        assert (method, url) == ("POST", "http://ollama.test:11434/api/chat")
+        timeout = mock_req.call_args.kwargs["timeout"]
+        assert (timeout.connect, timeout.read) == (5, 60)
+
+    def test_unknown_label_rejected(self):
+        gw = AsyncNetworkGateway()
+        with pytest.raises(ValueError):
+            asyncio.run(gw.get("evil", "/x"))
+
+    def test_crawler_ssrf_guard_still_enforced(self):
+        gw = AsyncNetworkGateway()
+        with patch("core.network_gateway.httpx.AsyncClient.request") as mock_req:
+            with pytest.raises(PermissionError):
+                asyncio.run(gw.get("crawler", "http://169.254.169.254/latest/meta-data/"))
+        mock_req.assert_not_called()
+
+    def test_client_reused_within_one_loop(self):
+        gw = AsyncNetworkGateway()
+
+        async def run():
+            first = gw._client("ollama")
+            same = gw._client("ollama")
+            await gw.aclose()
+            return first is same
+
+        assert asyncio.run(run())
+
+
+class _FakeResponse:
+    """Minimal stand-in for the response object cookiejar reads Set-Cookie from."""
+
+    def __init__(self, headers):
+        self._headers = headers
+
+    def info(self):
+        return self
+
+    def get_all(self, name, default=None):
+        value = self._headers.get(name)
+        return [value] if value is not None else (default or [])
@@ -19,6 +19,11 @@ def _no_match():
     m.points = []
     return m
 
+async def _aiter(items):
+    """Async-iterator stand-in for AsyncOllamaEngine.stream_chat."""
+    for item in items:
+        yield item
+
 
 def _one_hit(text: str, classification: str = "INTERNAL"):
     point = MagicMock()
@@ -33,9 +38,9 @@ def _one_hit(text: str, classification: str = "INTERNAL"):
 
 def test_chat_completions_non_streaming_format(brain_client):
     """Non-streaming response matches OpenAI response shape exactly."""
-    with patch("api.openai_compat.get_embedding", return_value=_FAKE_VEC), \
-         patch("api.openai_compat.client.search", return_value=_no_match()), \
-         patch("api.openai_compat.llm.chat", return_value="Hello!"):
+    with patch("api.openai_compat.aget_embedding", return_value=_FAKE_VEC), \
+         patch("core.retrieval.client.search", return_value=_no_match()), \
+         patch("api.openai_compat.allm.chat", return_value="Hello!"):
         resp = brain_client.post("/v1/chat/completions", json={
             "messages": [{"role": "user", "content": "Hi"}],
         })
@@ -54,9 +59,9 @@ def test_chat_completions_non_streaming_format(brain_client):
 def test_chat_completions_streaming_format(brain_client):
     """Streaming response uses OpenAI chunk format and terminates with [DONE]."""
     tokens = ["The", " sky", " is", " blue."]
-    with patch("api.openai_compat.get_embedding", return_value=_FAKE_VEC), \
-         patch("api.openai_compat.client.search", return_value=_no_match()), \
-         patch("api.openai_compat.llm.stream_chat", return_value=iter(tokens)):
+    with patch("api.openai_compat.aget_embedding", return_value=_FAKE_VEC), \
+         patch("core.retrieval.client.search", return_value=_no_match()), \
+         patch("api.openai_compat.allm.stream_chat", return_value=_aiter(tokens)):
         resp = brain_client.post("/v1/chat/completions", json={
             "messages": [{"role": "user", "content": "What colour is the sky?"}],
             "stream": True,
@@ -85,9 +90,9 @@ def test_chat_completions_rag_context_injected(brain_client):
         captured["messages"] = messages
         return "Answer."
 
-    with patch("api.openai_compat.get_embedding", return_value=_FAKE_VEC), \
-         patch("api.openai_compat.client.search", return_value=_one_hit("Client meeting Thursday")), \
-         patch("api.openai_compat.llm.chat", side_effect=fake_chat):
+    with patch("api.openai_compat.aget_embedding", return_value=_FAKE_VEC), \
+         patch("core.retrieval.client.search", return_value=_one_hit("Client meeting Thursday")), \
+         patch("api.openai_compat.allm.chat", side_effect=fake_chat):
         brain_client.post("/v1/chat/completions", json={
             "messages": [{"role": "user", "content": "What's on Thursday?"}],
         })
@@ -105,9 +110,9 @@ def test_chat_completions_augments_existing_system_message(brain_client):
         captured["messages"] = messages
         return "Answer."
 
-    with patch("api.openai_compat.get_embedding", return_value=_FAKE_VEC), \
-         patch("api.openai_compat.client.search", return_value=_one_hit("Deposition at 2pm")), \
-         patch("api.openai_compat.llm.chat", side_effect=fake_chat):
+    with patch("api.openai_compat.aget_embedding", return_value=_FAKE_VEC), \
+         patch("core.retrieval.client.search", return_value=_one_hit("Deposition at 2pm")), \
+         patch("api.openai_compat.allm.chat", side_effect=fake_chat):
         brain_client.post("/v1/chat/completions", json={
             "messages": [
                 {"role": "system", "content": "You are a legal assistant."},
@@ -124,8 +129,8 @@ def test_chat_completions_augments_existing_system_message(brain_client):
 
 def test_chat_completions_proceeds_without_rag(brain_client):
     """Embedding failure is non-fatal — LLM still called, no system message injected."""
-    with patch("api.openai_compat.get_embedding", return_value=None), \
-         patch("api.openai_compat.llm.chat", return_value="No context.") as mock_chat:
+    with patch("api.openai_compat.aget_embedding", return_value=None), \
+         patch("api.openai_compat.allm.chat", return_value="No context.") as mock_chat:
         resp = brain_client.post("/v1/chat/completions", json={
             "messages": [{"role": "user", "content": "Hello"}],
         })
@@ -141,8 +146,8 @@ def test_chat_completions_proceeds_without_rag(brain_client):
 
 def test_embeddings_single_string(brain_client):
     """Single string input returns one embedding at index 0."""
-    vec = [0.5] * 768
-    with patch("api.openai_compat.get_embedding", return_value=vec):
+    vec = [0.6, 0.8] + [0.0] * 766
+    with patch("api.openai_compat.aget_embedding", return_value=vec):
         resp = brain_client.post("/v1/embeddings", json={"input": "hello world"})
 
     assert resp.status_code == 200
@@ -156,8 +161,8 @@ def test_embeddings_single_string(brain_client):
 
 def test_embeddings_list_input(brain_client):
     """List of strings returns one embedding per input, in order."""
-    vec = [0.1] * 768
-    with patch("api.openai_compat.get_embedding", return_value=vec):
+    vecs = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+    with patch("api.openai_compat.aget_embeddings", return_value=vecs) as mock_batch:
         resp = brain_client.post("/v1/embeddings", json={
             "input": ["first", "second", "third"],
         })
@@ -166,11 +171,31 @@ def test_embeddings_list_input(brain_client):
     body = resp.json()
     assert len(body["data"]) == 3
     assert [d["index"] for d in body["data"]] == [0, 1, 2]
+    assert [d["embedding"] for d in body["data"]] == vecs
+    mock_batch.assert_called_once_with(["first", "second", "third"])
+
+
+def test_embeddings_same_text_same_vector_on_either_path(brain_client):
+    """A single string and a one-item list must come back identical (unit length)."""
+    with patch("api.openai_compat.aget_embedding", return_value=[3.0, 4.0]), \
+         patch("api.openai_compat.aget_embeddings", return_value=[[0.6, 0.8]]):
+        single = brain_client.post("/v1/embeddings", json={"input": "same"}).json()
+        batch = brain_client.post("/v1/embeddings", json={"input": ["same"]}).json()
+
+    assert single["data"][0]["embedding"] == batch["data"][0]["embedding"] == [0.6, 0.8]
+
+
+def test_embeddings_list_input_batch_failure_returns_500(brain_client):
+    """A failed batch embedding call propagates as HTTP 500."""
+    with patch("api.openai_compat.aget_embeddings", return_value=None):
+        resp = brain_client.post("/v1/embeddings", json={"input": ["a", "b"]})
+
+    assert resp.status_code == 500
 
 
 def test_embeddings_failure_returns_500(brain_client):
     """get_embedding returning None propagates as HTTP 500."""
-    with patch("api.openai_compat.get_embedding", return_value=None):
+    with patch("api.openai_compat.aget_embedding", return_value=None):
         resp = brain_client.post("/v1/embeddings", json={"input": "fail this"})
 
     assert resp.status_code == 500
@@ -1,7 +1,7 @@
 """Tests for Phase 3 architectural quality changes.
 
 Covers:
-- Audit log TTL pruning (_maybe_prune, verify_audit_chain with pruned boundary)
+- Audit log rollover (_maybe_archive, verify_audit_chain across archived segments)
 - git_automator _extract_commit_msg (DEAD-2 replacement)
 """
 import os
@@ -31,6 +31,7 @@ def _insert_n_rows(lg, n: int) -> None:
     """Insert n minimal audit rows directly via log_agent_action."""
     for i in range(n):
         lg.log_agent_action("TestAgent", "TEST", f"row {i}")
+    lg.flush_audit_log()   # rollover runs on the writer thread after each batch
 
 
 class TestAuditLogTTL:
@@ -56,8 +57,8 @@ class TestAuditLogTTL:
             conn.execute("UPDATE activity_log SET details = 'tampered' WHERE id = 1")
         conn.close()
 
-    def test_maybe_prune_does_not_fire_below_threshold(self, patched_logger):
-        """Prune should not delete rows when count is well below 50K."""
+    def test_archive_does_not_fire_below_threshold(self, patched_logger):
+        """Rollover should not move rows when count is well below 50K."""
         lg = patched_logger
         _insert_n_rows(lg, 10)
         conn = sqlite3.connect(lg.DB_PATH)
@@ -65,21 +66,25 @@ class TestAuditLogTTL:
         conn.close()
         assert count == 10
 
-    def test_maybe_prune_fires_on_interval(self, patched_logger, monkeypatch):
-        """When count exceeds _PRUNE_MAX_ROWS, excess rows are deleted."""
+    def test_archive_fires_on_interval(self, patched_logger, monkeypatch):
+        """Past the live bound, the oldest rows move into a segment file."""
         lg = patched_logger
         # Lower the thresholds to something testable without inserting 50K rows.
-        monkeypatch.setattr(lg, "_PRUNE_INTERVAL", 5)
-        monkeypatch.setattr(lg, "_PRUNE_MAX_ROWS", 8)
+        monkeypatch.setattr(lg, "_ARCHIVE_INTERVAL", 5)
+        monkeypatch.setattr(lg, "_LIVE_MAX_ROWS", 8)
+        monkeypatch.setattr(lg, "_SEGMENT_ROWS", 2)
 
-        # Insert 10 rows — prune fires on the 10th (10 % 5 == 0) and should
-        # trim back to 8 rows.
+        # Insert 10 rows — rollover fires on the 10th (10 % 5 == 0) and moves
+        # ids 1-2 into a segment, leaving 8 live rows.
         _insert_n_rows(lg, 10)
 
         conn = sqlite3.connect(lg.DB_PATH)
         count = conn.execute("SELECT COUNT(*) FROM activity_log").fetchone()[0]
+        segments = conn.execute("SELECT first_id, last_id, file FROM audit_segments").fetchall()
         conn.close()
         assert count == 8
+        assert [(s[0], s[1]) for s in segments] == [(1, 2)]
+        assert os.path.exists(os.path.join(lg._archive_dir(), segments[0][2]))
 
     def test_verify_chain_valid_for_full_log(self, patched_logger):
         """Chain verification must pass for a clean unmodified log."""
@@ -90,18 +95,20 @@ class TestAuditLogTTL:
         assert result["entries_checked"] == 5
         assert "pruned" not in result
 
-    def test_verify_chain_valid_after_prune(self, patched_logger, monkeypatch):
-        """Chain verification must pass for a pruned log and set pruned=True."""
+    def test_verify_chain_covers_archived_segments(self, patched_logger, monkeypatch):
+        """Archived history stays verifiable: full verification walks the segments."""
         lg = patched_logger
-        monkeypatch.setattr(lg, "_PRUNE_INTERVAL", 5)
-        monkeypatch.setattr(lg, "_PRUNE_MAX_ROWS", 8)
+        monkeypatch.setattr(lg, "_ARCHIVE_INTERVAL", 5)
+        monkeypatch.setattr(lg, "_LIVE_MAX_ROWS", 8)
+        monkeypatch.setattr(lg, "_SEGMENT_ROWS", 2)
 
-        _insert_n_rows(lg, 10)  # prune fires, trimming oldest rows
+        _insert_n_rows(lg, 10)
 
         result = lg.verify_audit_chain()
         assert result["valid"] is True
-        assert result.get("pruned") is True
-        assert result["entries_checked"] == 8
+        assert result["entries_checked"] == 8   # live rows, anchored on the segment head
+        full = lg.verify_audit_chain(full=True)
+        assert full == {"valid": True, "entries_checked": 10, "segments_checked": 1}
 
 
 # ─── _extract_commit_msg (DEAD-2) ────────────────────────────────────────────
@@ -0,0 +1,91 @@
+"""Tests for core/retrieval.py — the retrieval + sanitize pipeline behind /chat and /v1."""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from core import retrieval
+from core.classification_engine import Classification, classify
+
+
+def _hit(id, score, **payload):
+    return SimpleNamespace(id=id, score=score, payload=payload)
+
+
+def _response(*hits):
+    response = MagicMock()
+    response.points = list(hits)
+    return response
+
+
+def _retrieve(*hits, query=None):
+    with patch("core.retrieval.client.search", return_value=_response(*hits)) as search:
+        result = asyncio.run(retrieval.retrieve_context([0.1], "u1", "m1", limit=5, query=query))
+    return result, search
+
+
+def test_stored_classification_is_trusted():
+    with patch("core.retrieval.classify", wraps=classify) as spy:
+        result, _ = _retrieve(
+            _hit("a", 0.9, memory="SSN 123-45-6789", classification="PII"),
+            _hit("b", 0.8, memory="call 555-123-4567", classification="PUBLIC"),
+        )
+    spy.assert_not_called()
+    assert result.classifications == [Classification.PII, Classification.PUBLIC]
+    assert result.texts == ["SSN __SSN_0__", "call 555-123-4567"]
+
+
+def test_only_legacy_points_are_classified():
+    with patch("core.retrieval.classify", wraps=classify) as spy:
+        result, _ = _retrieve(
+            _hit("a", 0.9, memory="plain note", classification="INTERNAL"),
+            _hit("b", 0.8, memory="mail jane@clinic.com"),
+            _hit("c", 0.7, memory="ssn 123-45-6789", classification="bogus"),
+        )
+    assert sorted(c.args[0] for c in spy.call_args_list) == ["mail jane@clinic.com", "ssn 123-45-6789"]
+    assert result.texts == ["plain note", "mail __EMAIL_0__", "ssn __SSN_0__"]
+
+
+def test_query_shares_the_memories_placeholder_numbering():
+    result, _ = _retrieve(
+        _hit("a", 0.9, memory="SSN 123-45-6789", classification="PII"),
+        query="Whose SSN is 123-45-6789? And 987-65-4321?",
+    )
+    assert result.query == "Whose SSN is __SSN_0__? And __SSN_1__?"
+    assert result.replacements == {"__SSN_0__": "123-45-6789", "__SSN_1__": "987-65-4321"}
+
+
+def test_hits_are_searched_raw_and_decrypted_here():
+    from core.deps import client
+    stored = client._encrypt_payload({"memory": "secret plan", "user_id": "u1", "classification": "PUBLIC"})
+    assert "memory" not in stored
+
+    result, search = _retrieve(_hit("a", 0.9, **stored))
+
+    assert search.call_args.kwargs["decrypt"] is False
+    assert result.hits[0].payload["memory"] == "secret plan"
+    assert result.texts == ["secret plan"]
+
+
+def test_v1_uses_stored_classification():
+    """A PII-tagged memory is redacted even though its text alone would not classify that high."""
+    from core.brain import app
+    captured = {}
+
+    async def fake_chat(messages, model=None):
+        captured["messages"] = messages
+        return "ok"
+
+    hit = _hit("a", 0.9, memory="Badge 555-123-4567", classification="PII")
+    with patch("api.openai_compat.aget_embedding", return_value=[0.1]), \
+         patch("core.retrieval.client.search", return_value=_response(hit)), \
+         patch("core.retrieval.classify", side_effect=AssertionError("reclassified")), \
+         patch("api.openai_compat.allm.chat", side_effect=fake_chat):
+        resp = TestClient(app).post("/v1/chat/completions", json={
+            "messages": [{"role": "user", "content": "badge?"}],
+        })
+
+    assert resp.status_code == 200
+    system = next(m["content"] for m in captured["messages"] if m["role"] == "system")
+    assert "__PHONE_0__" in system and "555-123-4567" not in system
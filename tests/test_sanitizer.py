@@ -16,9 +16,12 @@ Covers:
 12. Plain text with no patterns → text unchanged, replacements empty
 13. Empty string → SanitizedText("", {}) — no crash
 14. Replacement tokens are not themselves present in the sanitized text as raw values
+15. sanitize_many numbers placeholders across the whole batch
+16. sanitize_many gates each text on its own classification
+17. A repeated value reuses its placeholder
 """
 import pytest
-from core.sanitizer import sanitize, SanitizedText
+from core.sanitizer import sanitize, sanitize_many, SanitizedBatch, SanitizedText
 from core.classification_engine import Classification
 
 
@@ -138,3 +141,38 @@ def test_return_type_is_sanitized_text_namedtuple():
     assert isinstance(result, SanitizedText)
     assert hasattr(result, "text")
     assert hasattr(result, "replacements")
+
+
+# ─── Test 15–17: Batch sanitization ──────────────────────────────────────────
+
+def test_batch_numbering_is_shared_across_texts():
+    batch = sanitize_many(
+        ["SSN 123-45-6789", "SSN 987-65-4321, mail a@b.com", "Is 123-45-6789 on file?"],
+        [Classification.PII, Classification.PII, Classification.PII],
+    )
+    assert isinstance(batch, SanitizedBatch)
+    assert batch.texts == ["SSN __SSN_0__", "SSN __SSN_1__, mail __EMAIL_0__", "Is __SSN_0__ on file?"]
+    assert batch.replacements == {
+        "__SSN_0__": "123-45-6789", "__SSN_1__": "987-65-4321", "__EMAIL_0__": "a@b.com",
+    }
+
+
+def test_batch_gates_each_text_on_its_classification():
+    batch = sanitize_many(["call 555-123-4567", "call 555-123-4567"], [Classification.PUBLIC, Classification.PHI])
+    assert batch.texts == ["call 555-123-4567", "call __PHONE_0__"]
+
+
+def test_batch_length_mismatch_is_rejected():
+    with pytest.raises(ValueError):
+        sanitize_many(["a", "b"], [Classification.PII])
+
+
+def test_repeated_value_reuses_placeholder():
+    result = sanitize("jane@clinic.com wrote to jane@clinic.com", Classification.PII)
+    assert result.text == "__EMAIL_0__ wrote to __EMAIL_0__"
+    assert result.replacements == {"__EMAIL_0__": "jane@clinic.com"}
+
+
+def test_card_wins_over_ssn_and_phone_inside_it():
+    result = sanitize("Card 4111 1111 1111 1111 and +1 555 123 4567", Classification.PII)
+    assert result.text == "Card __CREDIT_CARD_0__ and __PHONE_0__"
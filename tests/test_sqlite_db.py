@@ -0,0 +1,62 @@
+"""
+tests/test_sqlite_db.py — Shared SQLite access layer (core/sqlite_db.py).
+"""
+import threading
+
+from core import sqlite_db
+
+
+def test_connection_is_reused_per_thread_and_path(tmp_path):
+    path = str(tmp_path / "a.db")
+    conn = sqlite_db.get_connection(path)
+    assert sqlite_db.get_connection(path) is conn
+    assert sqlite_db.get_connection(str(tmp_path / "b.db")) is not conn
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(sqlite_db.get_connection(path)))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+
+
+def test_pragmas_applied(tmp_path):
+    conn = sqlite_db.get_connection(str(tmp_path / "sub" / "p.db"))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1   # NORMAL
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -8000
+
+
+def test_with_block_commits_without_closing(tmp_path):
+    path = str(tmp_path / "c.db")
+    sqlite_db.ensure_schema(path, "CREATE TABLE IF NOT EXISTS t (x INTEGER);")
+    with sqlite_db.get_connection(path) as conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    # Visible from another thread's connection, so it was committed.
+    rows = []
+    t = threading.Thread(target=lambda: rows.extend(
+        sqlite_db.get_connection(path).execute("SELECT x FROM t").fetchall()
+    ))
+    t.start()
+    t.join()
+    assert [r["x"] for r in rows] == [1]
+    assert sqlite_db.get_connection(path).execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+
+def test_schema_runs_once_per_path(tmp_path):
+    path = str(tmp_path / "d.db")
+    ddl = "CREATE TABLE runs (x INTEGER);"   # not idempotent — would fail if re-run
+    sqlite_db.ensure_schema(path, ddl)
+    sqlite_db.ensure_schema(path, ddl)
+
+    sqlite_db.ensure_schema(str(tmp_path / "e.db"), ddl)
+    assert sqlite_db.get_connection(str(tmp_path / "e.db")).execute(
+        "SELECT COUNT(*) FROM runs"
+    ).fetchone()[0] == 0
+
+
+def test_close_thread_connections(tmp_path):
+    path = str(tmp_path / "f.db")
+    conn = sqlite_db.get_connection(path)
+    sqlite_db.close_thread_connections()
+    assert sqlite_db.get_connection(path) is not conn
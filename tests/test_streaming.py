@@ -23,6 +23,11 @@ def _no_match():
     m.points = []
     return m
 
+async def _aiter(items):
+    """Async-iterator stand-in for AsyncOllamaEngine.stream_chat."""
+    for item in items:
+        yield item
+
 
 def _fake_vec():
     return [0.1] * 768
@@ -32,9 +37,9 @@ def _fake_vec():
 
 def test_stream_returns_event_stream_content_type(brain_client):
     """`stream: true` → Content-Type is text/event-stream."""
-    with patch("api.chat.get_embedding", return_value=_fake_vec()), \
-         patch("api.chat.client.search", return_value=_no_match()), \
-         patch("api.chat.llm.stream_chat", return_value=iter(["Hi", " there"])):
+    with patch("api.chat.aget_embedding", return_value=_fake_vec()), \
+         patch("core.retrieval.client.search", return_value=_no_match()), \
+         patch("api.chat.allm.stream_chat", return_value=_aiter(["Hi", " there"])):
         resp = brain_client.post("/chat", json={"text": "hello", "stream": True})
 
     assert resp.status_code == 200
@@ -44,9 +49,9 @@ def test_stream_returns_event_stream_content_type(brain_client):
 def test_stream_events_contain_delta_tokens(brain_client):
     """Each non-final SSE event carries a non-empty delta."""
     tokens = ["The", " answer", " is", " 42."]
-    with patch("api.chat.get_embedding", return_value=_fake_vec()), \
-         patch("api.chat.client.search", return_value=_no_match()), \
-         patch("api.chat.llm.stream_chat", return_value=iter(tokens)):
+    with patch("api.chat.aget_embedding", return_value=_fake_vec()), \
+         patch("core.retrieval.client.search", return_value=_no_match()), \
+         patch("api.chat.allm.stream_chat", return_value=_aiter(tokens)):
         resp = brain_client.post("/chat", json={"text": "what?", "stream": True})
 
     events = _parse_sse(resp.text)
@@ -57,9 +62,9 @@ def test_stream_events_contain_delta_tokens(brain_client):
 
 def test_stream_final_event_has_done_true_and_context_used(brain_client):
     """The last SSE event has `done: true` and a `context_used` list."""
-    with patch("api.chat.get_embedding", return_value=_fake_vec()), \
-         patch("api.chat.client.search", return_value=_no_match()), \
-         patch("api.chat.llm.stream_chat", return_value=iter(["ok"])):
+    with patch("api.chat.aget_embedding", return_value=_fake_vec()), \
+         patch("core.retrieval.client.search", return_value=_no_match()), \
+         patch("api.chat.allm.stream_chat", return_value=_aiter(["ok"])):
         resp = brain_client.post("/chat", json={"text": "ping", "stream": True})
 
     events = _parse_sse(resp.text)
@@ -73,9 +78,9 @@ def test_stream_false_returns_json_reply(brain_client):
     ollama_resp = MagicMock()
     ollama_resp.json.return_value = {"message": {"content": "pong"}}
 
-    with patch("api.chat.get_embedding", return_value=_fake_vec()), \
-         patch("api.chat.client.search", return_value=_no_match()), \
-         patch("core.network_gateway.requests.post", return_value=ollama_resp):
+    with patch("api.chat.aget_embedding", return_value=_fake_vec()), \
+         patch("core.retrieval.client.search", return_value=_no_match()), \
+         patch("core.network_gateway.httpx.AsyncClient.request", return_value=ollama_resp):
         resp = brain_client.post("/chat", json={"text": "ping"})
 
     assert resp.status_code == 200
@@ -1,12 +1,14 @@
 import logging
 import os
 import time
+from core.collection_manager import ensure_collection
+from core.llm_client import OllamaEngine
 from core.network_gateway import gateway
 from bs4 import BeautifulSoup
 from collections import deque
 from urllib.parse import urljoin, urlparse
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import PointStruct
 import uuid
 
 _MAX_RETRIES = 3
@@ -20,17 +22,9 @@ QDRANT_HOST = os.getenv("QDRANT_HOST", "qdrant")
 DOC_COLLECTION = "doc_knowledge"
 
 qdrant_docs = QdrantClient(host=QDRANT_HOST, port=6333)
+_engine = OllamaEngine(gateway, LLM_MODEL)
 
-
-def _ensure_doc_collection():
-    if not qdrant_docs.collection_exists(DOC_COLLECTION):
-        qdrant_docs.create_collection(
-            collection_name=DOC_COLLECTION,
-            vectors_config=VectorParams(size=768, distance=Distance.COSINE),
-        )
-
-
-_ensure_doc_collection()
+ensure_collection(qdrant_docs, DOC_COLLECTION)
 
 class DocSpider:
     def __init__(self, base_url, max_pages=20):
@@ -104,13 +98,15 @@ class DocSpider:
                 pages_crawled += 1
 
                 # --- INTELLIGENT PARSING ---
+                # Blocks are collected per page and embedded in one batch.
+                blocks: list[tuple[str, str]] = []
 
                 # 1. Extract Code Blocks (High Value)
                 code_blocks = soup.find_all('pre')
                 for code in code_blocks:
                     code_text = code.get_text()
                     if len(code_text) > 20:
-                        self.save_knowledge(code_text, current_url, type="code")
+                        blocks.append((code_text, "code"))
 
                 # 2. Extract Prose (Paragraphs)
                 paragraphs = soup.find_all('p')
@@ -120,9 +116,11 @@ class DocSpider:
                     if len(text) > 50:
                         buffer += text + " "
                         if len(buffer) > 500:
-                            self.save_knowledge(buffer, current_url, type="text")
+                            blocks.append((buffer, "text"))
                             buffer = ""
 
+                self.save_knowledge_many(blocks, current_url)
+
                 # 3. Find new links — is_valid_url checks queued, not visited,
                 #    so each URL is enqueued at most once.
                 for link in soup.find_all('a', href=True):
@@ -138,23 +136,27 @@ class DocSpider:
 
     def save_knowledge(self, content, source_url, type="text"):
         """Vectorize and store in Qdrant doc_knowledge collection"""
-        try:
-            res = gateway.post("ollama", "/api/embeddings", json={
-                "model": "nomic-embed-text:latest",
-                "prompt": content
-            }, timeout=30)
-            vector = res.json()["embedding"]
-        except Exception as e:
-            logger.error(f"Embedding failed for {source_url}: {e}")
+        self.save_knowledge_many([(content, type)], source_url)
+
+    def save_knowledge_many(self, blocks: list[tuple[str, str]], source_url: str) -> None:
+        """Vectorize (content, type) blocks in one embedding call and upsert together."""
+        if not blocks:
+            return
+        vectors = _engine.embed_many([content for content, _ in blocks])
+        if vectors is None:
+            logger.error(f"Embedding failed for {source_url}")
             return
 
         qdrant_docs.upsert(
             collection_name=DOC_COLLECTION,
-            points=[PointStruct(
-                id=str(uuid.uuid4()),
-                vector=vector,
-                payload={"content": content, "source": source_url, "type": type},
-            )]
+            points=[
+                PointStruct(
+                    id=str(uuid.uuid4()),
+                    vector=vector,
+                    payload={"content": content, "source": source_url, "type": type},
+                )
+                for (content, type), vector in zip(blocks, vectors)
+            ],
         )
 
 # -- Standalone Test --